@@ -0,0 +1,102 @@
+"""Header emission benchmark for very wide linear models.
+
+Compares, on a synthetic multiclass model:
+
+* ``legacy``: per-element f-string formatting, one joined string, one write
+  (how headers were produced before ``src.converter.cformat``)
+* ``string``: ``convert_to_c`` (chunked formatting) then one write
+* ``stream``: ``write_c``, tables formatted chunk by chunk straight to the file
+
+and reports wall time, peak traced Python memory and output size::
+
+    python benchmarks/header_emit.py --features 200000 --classes 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.converter.linear import LinearConverter  # noqa: E402
+from src.converter.cformat import CTable  # noqa: E402
+
+
+class _WideModel:
+    """Just the fitted attributes LinearConverter reads."""
+
+    def __init__(self, n_features: int, n_classes: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.coef_ = rng.normal(size=(n_classes, n_features))
+        self.intercept_ = rng.normal(size=n_classes)
+
+
+def _legacy_text(converter: LinearConverter) -> str:
+    def fmt(part):
+        if isinstance(part, CTable):
+            values = ", ".join(f"{float(v):.10f}f" for v in part.values)
+            return f"static const {part.ctype} {part.name}[{part.size}] = {{ {values} }};"
+        return part
+    return "\n".join(fmt(p) for p in converter.emit_parts())
+
+
+def _measure(fn, path: str) -> dict:
+    # timed and traced separately: tracemalloc slows allocation-heavy code several-fold
+    start = time.perf_counter()
+    fn(path)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 2 ** 20, 1),
+            "size_mb": round(os.path.getsize(path) / 2 ** 20, 1)}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark string vs streaming header emission")
+    parser.add_argument("--features", type=int, default=100_000)
+    parser.add_argument("--classes", type=int, default=20)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    converter = LinearConverter()
+    converter.model = _WideModel(args.features, args.classes)
+
+    def legacy(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_legacy_text(converter))
+
+    def string(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(converter.convert_to_c())
+
+    def stream(path):
+        with open(path, "w", encoding="utf-8") as f:
+            converter.write_c(f)
+
+    results = {"features": args.features, "classes": args.classes}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for name, fn in (("legacy", legacy), ("string", string), ("stream", stream)):
+            paths[name] = os.path.join(tmp, f"{name}.h")
+            results[name] = _measure(fn, paths[name])
+        with open(paths["legacy"], "rb") as a, open(paths["stream"], "rb") as b:
+            results["identical"] = a.read() == b.read()
+
+    for name in ("legacy", "string", "stream"):
+        r = results[name]
+        print(f"{name:<7} {r['seconds']:7.3f} s   peak {r['peak_mb']:8.1f} MiB   {r['size_mb']:.1f} MiB written")
+    print(f"identical output: {results['identical']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cold-start benchmark for the CLI.
+
+Runs each probe in a fresh interpreter (so nothing is cached in-process) and
+reports the median wall time plus the heavy modules it pulled in::
+
+    python benchmarks/import_time.py --runs 10 --json startup.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must stay out of the startup path
+HEAVY_MODULES = ("sklearn", "scipy", "joblib", "structlog")
+
+PROBES = {
+    "python": "pass",
+    "import src.main": "import src.main",
+    "model2c --help": "import sys; sys.argv = ['model2c', '--help']\n"
+                      "from src.main import cli_entry\n"
+                      "try:\n    cli_entry()\nexcept SystemExit:\n    pass",
+}
+
+_REPORT_MODULES = ("\nimport sys\nprint('\\nHEAVY:' + ','.join(sorted({m.split('.')[0] for m in sys.modules} & set(%r))))"
+                   % (HEAVY_MODULES,))
+
+
+def run_probe(code: str, runs: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    times = []
+    heavy = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code + _REPORT_MODULES], capture_output=True, text=True,
+                              env=env, cwd=REPO_ROOT)
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr)
+        heavy = proc.stdout.rsplit("HEAVY:", 1)[-1].strip()
+    return {"median_seconds": round(statistics.median(times), 4), "min_seconds": round(min(times), 4),
+            "runs": runs, "heavy_modules": [m for m in heavy.split(",") if m]}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per probe")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {name: run_probe(code, args.runs) for name, code in PROBES.items()}
+    for name, r in results.items():
+        print(f"{name:<18} median {r['median_seconds'] * 1000:8.1f} ms   heavy: {', '.join(r['heavy_modules']) or '-'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
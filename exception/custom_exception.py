@@ -6,13 +6,22 @@ logger = CustomLogger().get_logger(__file__)
 
 class CustomException(Exception):
     """Custom exception for Document Portal"""
-    def __init__(self,error_message,error_details:sys):
+    def __init__(self,error_message,error_details:sys=None):
         
-        _,_,exc_tb=error_details.exc_info()
-        self.file_name=exc_tb.tb_frame.f_code.co_filename
-        self.lineno=exc_tb.tb_lineno
+        super().__init__(str(error_message))
+        exc_info = error_details.exc_info() if error_details is not None else (None, None, None)
+        _,_,exc_tb=exc_info
         self.error_message=str(error_message)
-        self.traceback_str = ''.join(traceback.format_exception(*error_details.exc_info())) 
+        if exc_tb is not None:
+            self.file_name=exc_tb.tb_frame.f_code.co_filename
+            self.lineno=exc_tb.tb_lineno
+            self.traceback_str = ''.join(traceback.format_exception(*exc_info))
+        else:
+            # raised outside an ``except`` block: point at the caller instead
+            frame = sys._getframe(1)
+            self.file_name=frame.f_code.co_filename
+            self.lineno=frame.f_lineno
+            self.traceback_str = ""
         
     def __str__(self):
        return f"""
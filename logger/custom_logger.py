@@ -1,48 +1,168 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
-import structlog # type: ignore
+
+# Environment defaults for configure_logging(); configure_logging() writes the resolved values back so worker
+# processes (fork or spawn) log the same way as their parent.
+ENV_LEVEL = "AUTOEDGE_LOG_LEVEL"
+ENV_FILE = "AUTOEDGE_LOG_FILE"     # path of the log file, or "" / "0" to disable file logging
+ENV_QUEUE = "AUTOEDGE_LOG_QUEUE"   # "1": hand records to a background thread instead of writing inline
+
+_lock = threading.RLock()
+_state = {"options": None, "handlers": [], "listener": None, "structlog": False}
+
+
+class _DeferredFileHandler(logging.FileHandler):
+    """FileHandler that creates its directory and file on the first record, not at construction."""
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def _default_log_file(log_dir="logs"):
+    log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+    return os.path.join(os.getcwd(), log_dir, log_file)
+
+
+def _teardown():
+    listener = _state["listener"]
+    if listener is not None:
+        listener.stop()
+        _state["listener"] = None
+    root = logging.getLogger()
+    for handler in _state["handlers"]:
+        root.removeHandler(handler)
+        handler.close()
+    _state["handlers"] = []
+
+
+def configure_logging(level=None, log_file=None, use_queue=None, force=False):
+    """Process-wide logging setup; repeated calls with the same options are no-ops.
+
+    ``level``: name or number (default ``$AUTOEDGE_LOG_LEVEL`` or INFO).
+    ``log_file``: path, ``False`` to log to the console only, or ``None`` for
+    ``$AUTOEDGE_LOG_FILE`` / a timestamped file under ``./logs``.
+    ``use_queue``: route records through a ``QueueHandler`` so the caller never
+    blocks on console/file I/O; a ``QueueListener`` thread does the writing.
+    """
+    if level is None:
+        level = os.environ.get(ENV_LEVEL, "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    if log_file is None:
+        log_file = os.environ.get(ENV_FILE)
+        if log_file is None:
+            log_file = _default_log_file()
+    if log_file in (False, "", "0"):
+        log_file = ""
+    if use_queue is None:
+        use_queue = os.environ.get(ENV_QUEUE, "0") == "1"
+    options = (level, log_file, bool(use_queue))
+
+    with _lock:
+        if _state["options"] == options and not force:
+            return
+        _teardown()
+
+        formatter = logging.Formatter("%(message)s")
+        targets = [logging.StreamHandler()]
+        if log_file:
+            targets.append(_DeferredFileHandler(log_file))
+        for handler in targets:
+            handler.setLevel(level)
+            handler.setFormatter(formatter)
+
+        if use_queue:
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, *targets, respect_handler_level=True)
+            listener.start()
+            _state["listener"] = listener
+            installed = [logging.handlers.QueueHandler(records)]
+        else:
+            installed = targets
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        for handler in installed:
+            root.addHandler(handler)
+        # targets are owned by the listener in queue mode; close them all on teardown either way
+        _state["handlers"] = installed + ([] if installed is targets else targets)
+        _state["options"] = options
+
+        os.environ[ENV_LEVEL] = logging.getLevelName(level)
+        os.environ[ENV_FILE] = log_file
+        os.environ[ENV_QUEUE] = "1" if use_queue else "0"
+
+        if not _state["structlog"]:
+            _configure_structlog()
+            _state["structlog"] = True
+
+
+def _configure_structlog():
+    import structlog # type: ignore
+
+    structlog.configure(
+        processors=[
+            # drop records below the stdlib level before any formatting work
+            structlog.stdlib.filter_by_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True, key="timestamp"),
+            structlog.processors.add_log_level,
+            structlog.processors.EventRenamer(to= "event"),
+            structlog.processors.JSONRenderer()
+        ],
+        logger_factory= structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use= True
+    )
+
+
+def _after_fork_in_child():
+    # a forked child inherits the QueueHandler but not the listener thread: rebuild with the same options
+    if _state["options"] is not None:
+        level, log_file, use_queue = _state["options"]
+        _state["listener"] = None
+        configure_logging(level, log_file or False, use_queue, force=True)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(_teardown)
+
+
+class _LazyLogger:
+    """Stand-in returned by ``get_logger``; structlog is imported and logging set up on the first call."""
+
+    def __init__(self, name):
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, attr):
+        if self._logger is None:
+            import structlog # type: ignore
+
+            configure_logging()
+            self._logger = structlog.get_logger(self._name)
+        return getattr(self._logger, attr)
+
 
 class CustomLogger:
     def __init__(self, log_dir="logs"):
         self.logs_dir = os.path.join(os.getcwd(),log_dir)
-        os.makedirs(self.logs_dir,exist_ok=True)
-        
-        log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-        self.log_file_path = os.path.join(self.logs_dir,log_file)
-        
+
     def get_logger(self,name=__file__):
-        logger_name = os.path.basename(name)
-        
-        file_handler = logging.FileHandler(self.log_file_path)
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(logging.Formatter("%(message)s"))
-        
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter("%(message)s"))
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(message)s",
-            handlers=[file_handler,console_handler]
-            )
-        
-        # Configure Struct Log
-        structlog.configure(
-            processors=[
-                structlog.processors.TimeStamper(fmt="iso", utc=True, key="timestamp"),
-                structlog.processors.add_log_level,
-                structlog.processors.EventRenamer(to= "event"),
-                structlog.processors.JSONRenderer()
-            ],
-            logger_factory= structlog.stdlib.LoggerFactory(),
-            cache_logger_on_first_use= True
-        )
-        
-        return structlog.get_logger(logger_name)
-    
+        # cheap enough for module scope: no handlers, no structlog import, no logs/ until something is logged
+        return _LazyLogger(os.path.basename(name))
+
 if __name__ == "__main__":
     logger = CustomLogger()
     logger = logger.get_logger(__file__)
-    logger.info("Custom Logger Initiated Again")
\ No newline at end of file
+    logger.info("Custom Logger Initiated Again")
@@ -0,0 +1,198 @@
+import os
+import re
+import json
+import shutil
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Optional, Sequence
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.validators.c_harness import find_c_compiler
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_OPT_LEVELS = ("-O0", "-O2", "-O3", "-Os")
+DEFAULT_ROWS = 1024
+
+# the driver times whole passes over ROWS distinct rows, doubling the pass count until a trial
+# lasts MIN_NS, and prints the best of TRIALS trials as one JSON line
+_DRIVER_TEMPLATE = """#define _POSIX_C_SOURCE 199309L
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include "model.h"
+
+#define N_FEATURES {n_features}
+#define ROWS {rows}
+#define MIN_NS {min_ns:.1f}
+#define TRIALS {trials}
+
+#if defined(__GNUC__)
+#define CLOBBER() __asm__ volatile("" ::: "memory")
+#else
+#define CLOBBER() ((void)0)
+#endif
+
+static double now_ns(void) {{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec * 1e9 + (double)ts.tv_nsec;
+}}
+
+static volatile float sink;
+
+static void single_pass(const float *X) {{
+    float acc = 0.0f;
+    for (int r = 0; r < ROWS; ++r) acc += (float){func_name}(X + (long)r * N_FEATURES, N_FEATURES);
+    sink = acc;
+}}
+{batch_pass}
+static double time_pass(void (*pass)(const float *), const float *X) {{
+    double best = -1.0;
+    long reps = 1;
+    for (int t = 0; t < TRIALS; ++t) {{
+        for (;;) {{
+            double start = now_ns();
+            for (long i = 0; i < reps; ++i) {{
+                pass(X);
+                CLOBBER();
+            }}
+            double elapsed = now_ns() - start;
+            if (elapsed >= MIN_NS) {{
+                double per_row = elapsed / ((double)reps * ROWS);
+                if (best < 0.0 || per_row < best) best = per_row;
+                break;
+            }}
+            reps *= 2;
+        }}
+    }}
+    return best;
+}}
+
+int main(void) {{
+    float *X = (float *)malloc(sizeof(float) * (size_t)ROWS * N_FEATURES);
+    if (X == NULL) return 1;
+    unsigned int state = 2463534242u;
+    for (long i = 0; i < (long)ROWS * N_FEATURES; ++i) {{
+        state ^= state << 13; state ^= state >> 17; state ^= state << 5;
+        X[i] = (float)(state % 4001u) / 1000.0f - 2.0f;
+    }}
+    double single_ns = time_pass(single_pass, X);
+    printf("{{\\"single_ns\\": %.3f", single_ns);
+{batch_main}    printf("}}\\n");
+    free(X);
+    return 0;
+}}
+"""
+
+_BATCH_PASS = """
+static {out_t} batch_out[ROWS];
+
+static void batch_pass(const float *X) {{
+    {func_name}_batch(X, ROWS, batch_out);
+    sink = (float)batch_out[ROWS - 1];
+}}
+"""
+
+_BATCH_MAIN = """    printf(", \\"batch_ns\\": %.3f", time_pass(batch_pass, X));
+"""
+
+
+def infer_n_features(c_code: str, func_name: str = "predict_model") -> int:
+    """Input width of a generated header, read from its batch stride or its per-feature tables."""
+    stride = re.search(rf"{re.escape(func_name)}\(X \+ r \* (\d+), \d+\)", c_code) or \
+        re.search(r"const float \*x = X \+ r \* (\d+);", c_code)
+    if stride:
+        return int(stride.group(1))
+    # compiled pipelines read the raw row; their estimator tables have the preprocessed width
+    pre = re.search(r"^/\* preprocessing \(.*\) compiled to \d+ stage\(s\), (\d+) -> \d+ values per row \*/",
+                    c_code, re.MULTILINE)
+    if pre:
+        return int(pre.group(1))
+    for table in ("SCALER_MEAN", "SCALER_MIN", "INPUT_INV_SCALE", "WEIGHTS", "W_0"):
+        m = re.search(rf"^static const \w+ {table}\[(\d+)\]", c_code, re.MULTILINE)
+        if m:
+            return int(m.group(1))
+    # sparse and tree headers only read the features they index: the largest index bounds the width
+    for table in ("WEIGHT_INDEX", "W_COL_INDEX", "NODE_FEATURE"):
+        m = re.search(rf"^static const \w+ {table}\[\d+\] = \{{ ([^}}]*) \}};", c_code, re.MULTILINE)
+        if m:
+            return max(int(v) for v in m.group(1).split(",")) + 1
+    raise CustomException("Cannot infer the number of input features from the header; pass n_features", None)
+
+
+def generate_driver(c_code: str, func_name: str = "predict_model", n_features: Optional[int] = None,
+                    rows: int = DEFAULT_ROWS, min_seconds: float = 0.05, trials: int = 3) -> str:
+    """C source of a stand-alone timing driver that includes the header as ``model.h``.
+
+    Times ``func_name`` row by row and, if the header has one,
+    ``<func_name>_batch`` over the same ``rows`` pseudo-random rows, and
+    prints ``{"single_ns": ..., "batch_ns": ...}`` (ns per inference).
+    """
+    if n_features is None:
+        n_features = infer_n_features(c_code, func_name)
+    batch = re.search(rf"^static inline void {re.escape(func_name)}_batch\(const float \*X, int n_rows, (\w+) \*out\)",
+                      c_code, re.MULTILINE)
+    batch_pass = _BATCH_PASS.format(out_t=batch.group(1), func_name=func_name) if batch else ""
+    return _DRIVER_TEMPLATE.format(n_features=n_features, rows=rows, min_ns=min_seconds * 1e9, trials=trials,
+                                   func_name=func_name, batch_pass=batch_pass,
+                                   batch_main=_BATCH_MAIN if batch else "")
+
+
+def compiler_version(compiler: str) -> str:
+    try:
+        proc = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=30)
+        return (proc.stdout or proc.stderr).splitlines()[0].strip()
+    except (OSError, IndexError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def benchmark_header(c_code: str, func_name: str = "predict_model", n_features: Optional[int] = None,
+                     opt_levels: Sequence[str] = DEFAULT_OPT_LEVELS, compiler: Optional[str] = None,
+                     cflags: Sequence[str] = (), runner: Sequence[str] = (), rows: int = DEFAULT_ROWS,
+                     min_seconds: float = 0.05, trials: int = 3) -> List[Dict[str, Any]]:
+    """Compile the timing driver once per optimization level and run it.
+
+    ``compiler``/``cflags`` select a cross toolchain (e.g. ``aarch64-linux-gnu-gcc``
+    with ``-static``) and ``runner`` the command prefix that executes its
+    binaries (e.g. ``["qemu-aarch64"]``); numbers under an emulator only
+    compare converter versions with each other. One result per level:
+    ``single_ns``, ``batch_ns`` (when the header has a batch entry point),
+    rows/second throughput and binary size.
+    """
+    compiler = compiler or find_c_compiler()
+    if compiler is None:
+        raise CustomException("No C compiler found (set $CC or install cc)", None)
+    driver = generate_driver(c_code, func_name, n_features, rows, min_seconds, trials)
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="autoedge_bench_")
+    try:
+        with open(os.path.join(workdir, "model.h"), "w", encoding="utf-8") as f:
+            f.write(c_code)
+        source = os.path.join(workdir, "driver.c")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write(driver)
+
+        for opt in opt_levels:
+            binary = os.path.join(workdir, f"driver{opt.replace('-', '_')}")
+            cmd = [compiler, opt, *cflags, "-o", binary, source, "-lm"]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise CustomException(f"Compiling benchmark driver ({opt}) failed:\n{proc.stderr.strip()}", None)
+            proc = subprocess.run([*runner, binary], capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise CustomException(f"Benchmark driver ({opt}) failed: {proc.stderr.strip()}", None)
+
+            timing = json.loads(proc.stdout.strip().splitlines()[-1])
+            result = {"opt_level": opt, "single_ns": timing["single_ns"],
+                      "single_per_second": round(1e9 / timing["single_ns"]) if timing["single_ns"] > 0 else None,
+                      "binary_bytes": os.path.getsize(binary)}
+            if "batch_ns" in timing:
+                result["batch_ns"] = timing["batch_ns"]
+                result["batch_per_second"] = round(1e9 / timing["batch_ns"]) if timing["batch_ns"] > 0 else None
+            logger.info("Benchmark %s: %s", opt, result)
+            results.append(result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import datetime
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+from logger.custom_logger import CustomLogger, configure_logging
+from exception.custom_exception import CustomException
+from src._version import __version__
+from src.validators.c_harness import find_c_compiler
+from src.benchmark.driver import benchmark_header, compiler_version, DEFAULT_OPT_LEVELS, DEFAULT_ROWS
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_FEATURES = (16, 256, 4096)
+DEFAULT_CLASSES = (1, 2, 8)
+# a result slower than baseline * this factor is reported as a regression
+REGRESSION_FACTOR = 1.10
+
+
+def synthetic_converter(n_features: int, n_classes: int, seed: int = 0):
+    """LinearConverter for a random model: Ridge for 1 class, LogisticRegression otherwise (no fitting)."""
+    from sklearn.linear_model import LogisticRegression, Ridge
+    from src.converter.linear import LinearConverter
+
+    rng = np.random.default_rng(seed)
+    if n_classes == 1:
+        model = Ridge()
+        model.coef_ = rng.normal(size=n_features)
+        model.intercept_ = float(rng.normal())
+    else:
+        model = LogisticRegression()
+        rows = 1 if n_classes == 2 else n_classes
+        model.coef_ = rng.normal(size=(rows, n_features))
+        model.intercept_ = rng.normal(size=rows)
+        model.classes_ = np.arange(n_classes)
+    model.n_features_in_ = n_features
+    converter = LinearConverter()
+    converter.load(model)
+    return converter
+
+
+def run_suite(features: Sequence[int] = DEFAULT_FEATURES, classes: Sequence[int] = DEFAULT_CLASSES,
+              variants: Optional[Dict[str, Dict[str, Any]]] = None, opt_levels: Sequence[str] = DEFAULT_OPT_LEVELS,
+              compiler: Optional[str] = None, cflags: Sequence[str] = (), runner: Sequence[str] = (),
+              rows: int = DEFAULT_ROWS, min_seconds: float = 0.05) -> Dict[str, Any]:
+    """Benchmark synthetic linear headers over a features x classes grid.
+
+    ``variants`` maps a name to export options (default: the folded float32
+    header with its batch entry point). Every result carries the grid point,
+    variant and optimization level, so two result files can be joined on
+    those keys by ``compare_results``.
+    """
+    compiler = compiler or find_c_compiler()
+    if compiler is None:
+        raise CustomException("No C compiler found (set $CC or install cc)", None)
+    variants = variants or {"float32": {"batch": True}}
+
+    results: List[Dict[str, Any]] = []
+    for n_features in features:
+        for n_classes in classes:
+            converter = synthetic_converter(n_features, n_classes)
+            for variant, options in variants.items():
+                c_code = converter.convert_to_c(**options)
+                for r in benchmark_header(c_code, n_features=n_features, opt_levels=opt_levels, compiler=compiler,
+                                          cflags=cflags, runner=runner, rows=rows, min_seconds=min_seconds):
+                    results.append(dict(r, n_features=n_features, n_classes=n_classes, variant=variant,
+                                        header_bytes=len(c_code)))
+    return {
+        "converter_version": __version__,
+        "compiler": compiler_version(compiler),
+        "cflags": list(cflags),
+        "runner": list(runner),
+        "machine": platform.machine(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "rows": rows,
+        "results": results,
+    }
+
+
+def _result_key(r: Dict[str, Any]) -> tuple:
+    return (r.get("header"), r.get("n_features"), r.get("n_classes"), r.get("variant"), r["opt_level"])
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    factor: float = REGRESSION_FACTOR) -> List[Dict[str, Any]]:
+    """Entries of ``current`` whose single or batch time exceeds ``factor`` x the matching baseline entry."""
+    known = {_result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current.get("results", []):
+        old = known.get(_result_key(r))
+        if old is None:
+            continue
+        for metric in ("single_ns", "batch_ns"):
+            if metric in r and metric in old and old[metric] > 0 and r[metric] > factor * old[metric]:
+                regressions.append({"key": list(_result_key(r)), "metric": metric, "baseline": old[metric],
+                                    "current": r[metric], "ratio": round(r[metric] / old[metric], 3)})
+    return regressions
+
+
+def _format_table(report: Dict[str, Any]) -> str:
+    lines = [f"{'header/grid':<28} {'variant':<10} {'opt':<4} {'single ns':>11} {'batch ns':>11} {'rows/s':>13}"]
+    for r in report["results"]:
+        where = r.get("header") or f"F={r['n_features']} C={r['n_classes']}"
+        batch = f"{r['batch_ns']:11.1f}" if "batch_ns" in r else f"{'-':>11}"
+        lines.append(f"{where:<28} {r.get('variant', '-'):<10} {r['opt_level']:<4} {r['single_ns']:11.1f} {batch} "
+                     f"{r['single_per_second']:>13,}")
+    return "\n".join(lines)
+
+
+def cli_entry(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="model2c-bench", description="Micro-benchmark generated C headers")
+    parser.add_argument("--header", action="append", default=[],
+                        help="Benchmark this converted header (repeatable); without it a synthetic grid is run")
+    parser.add_argument("--func-name", default="predict_model", help="Entry point of --header")
+    parser.add_argument("--n-features", type=int, default=None, help="Input width of --header (default: inferred)")
+    parser.add_argument("--features", default=",".join(map(str, DEFAULT_FEATURES)), help="Grid feature counts")
+    parser.add_argument("--classes", default=",".join(map(str, DEFAULT_CLASSES)),
+                        help="Grid class counts (1: regression, 2: binary logistic)")
+    parser.add_argument("--opt", default=",".join(o.lstrip("-") for o in DEFAULT_OPT_LEVELS),
+                        help="Optimization levels without the dash, e.g. O2,O3,Os")
+    parser.add_argument("--cc", default=None, help="Compiler, e.g. a cross gcc (default: $CC or cc)")
+    parser.add_argument("--cflags", default="", help="Extra compiler flags, e.g. '-march=armv8-a -static'")
+    parser.add_argument("--runner", default="", help="Command prefix that runs target binaries, e.g. 'qemu-aarch64'")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Distinct input rows per timed pass")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Minimum duration of one timing trial")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"Exit 1 when a result is more than {REGRESSION_FACTOR:.2f}x slower than --baseline")
+    args = parser.parse_args(argv)
+    configure_logging(level="WARNING", log_file=False)
+
+    opt_levels = ["-" + o.strip().lstrip("-") for o in args.opt.split(",") if o.strip()]
+    common = dict(opt_levels=opt_levels, compiler=args.cc, cflags=args.cflags.split(), runner=args.runner.split(),
+                  rows=args.rows, min_seconds=args.min_seconds)
+    try:
+        if args.header:
+            report = run_suite(features=(), **common)
+            for path in args.header:
+                with open(path, "r", encoding="utf-8") as f:
+                    c_code = f.read()
+                for r in benchmark_header(c_code, args.func_name, args.n_features, **common):
+                    report["results"].append(dict(r, header=os.path.basename(path), header_bytes=len(c_code)))
+        else:
+            report = run_suite(features=[int(v) for v in args.features.split(",")],
+                               classes=[int(v) for v in args.classes.split(",")], **common)
+    except Exception as e:
+        logger.exception("Benchmark failed")
+        print(f"Benchmark failed: {e}")
+        sys.exit(1)
+
+    print(_format_table(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_results(json.load(f), report)
+        for reg in regressions:
+            print(f"REGRESSION {reg['key']} {reg['metric']}: {reg['baseline']:.1f} -> {reg['current']:.1f} ns "
+                  f"(x{reg['ratio']})")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli_entry()
@@ -0,0 +1,126 @@
+import os
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src._version import __version__
+from src.utils import ensure_dir, header_base_name
+
+logger = CustomLogger().get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+def collect_model_paths(model_dir: str, pattern: str = "*.pkl", recursive: bool = False) -> List[str]:
+    """Model files under ``model_dir`` matching ``pattern``, sorted for a stable manifest."""
+    if not os.path.isdir(model_dir):
+        raise CustomException(f"Model directory not found: {model_dir}", None)
+    if recursive:
+        paths = glob.glob(os.path.join(model_dir, "**", pattern), recursive=True)
+    else:
+        paths = glob.glob(os.path.join(model_dir, pattern))
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def header_bases(model_paths: List[str]) -> Dict[str, str]:
+    """Header name stem per model: its path relative to the models' common directory.
+
+    Files that share a name in different directories (``--recursive``) get
+    distinct stems (``x/model.pkl`` -> ``x_model``); in a single directory
+    the stem is just the file name.
+    """
+    if not model_paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in model_paths])
+    return {p: header_base_name(os.path.abspath(p), root) for p in model_paths}
+
+
+def header_collisions(bases: Dict[str, str]) -> Dict[str, List[str]]:
+    """Per model, the other models whose header stem (``bases``) is the same; empty when unique."""
+    owners: Dict[str, List[str]] = {}
+    for path, base in bases.items():
+        owners.setdefault(base, []).append(path)
+    return {path: [p for p in owners[base] if p != path] for path, base in bases.items()}
+
+
+def collision_error(base: str, clashes: List[str]) -> str:
+    return f"header name '{base}' collides with {', '.join(clashes)}"
+
+
+def _convert_one(model_path: str, output_dir: str, convert_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # runs in a worker process: never raise, the result must always pickle back
+    from src.main import convert_model
+
+    start = time.perf_counter()
+    try:
+        out_path = convert_model(model_path, output_dir, **convert_kwargs)
+        return {"model": model_path, "status": "ok", "output": out_path,
+                "seconds": round(time.perf_counter() - start, 4)}
+    except Exception as e:
+        message = e.error_message if isinstance(e, CustomException) else str(e)
+        return {"model": model_path, "status": "failed", "error": message,
+                "seconds": round(time.perf_counter() - start, 4)}
+
+
+def convert_many(model_paths: List[str], output_dir: str = "./generated", max_workers: Optional[int] = None,
+                 manifest_path: Optional[str] = None, **convert_kwargs: Any) -> Dict[str, Any]:
+    """Convert many models across a process pool and write one JSON manifest.
+
+    ``convert_kwargs`` (``validate``, ``export_options``, ``cache``, ...) are
+    passed to ``convert_model`` for every model. A failing model is recorded
+    under ``"failures"`` and does not stop the rest of the batch.
+    ``max_workers=1`` converts in-process without a pool.
+
+    Header names are built from each path relative to the models' common
+    directory (see ``header_bases``). Models whose names would still collide
+    (``a-b.pkl`` and ``a_b.pkl``) are recorded as failures instead of
+    overwriting each other's header.
+    """
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+
+    bases = header_bases(model_paths)
+    collisions = header_collisions(bases)
+    todo = []
+    for path in model_paths:
+        if collisions[path]:
+            results.append({"model": path, "status": "failed", "error": collision_error(bases[path], collisions[path])})
+        else:
+            todo.append((path, dict(convert_kwargs, header_base=bases[path])))
+
+    if max_workers == 1 or len(todo) <= 1:
+        for path, kwargs in todo:
+            results.append(_convert_one(path, output_dir, kwargs))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_convert_one, path, output_dir, kwargs): path for path, kwargs in todo}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # worker died (e.g. BrokenProcessPool); record it and keep collecting
+                    logger.exception("Worker failed for %s", path)
+                    results.append({"model": path, "status": "failed", "error": f"worker error: {e}"})
+
+    results.sort(key=lambda r: r["model"])
+    manifest = {
+        "converter_version": __version__,
+        "output_dir": os.path.abspath(output_dir),
+        "total": len(results),
+        "seconds": round(time.perf_counter() - start, 4),
+        "outputs": [r for r in results if r["status"] == "ok"],
+        "failures": [r for r in results if r["status"] != "ok"],
+    }
+
+    manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_NAME)
+    ensure_dir(manifest_path)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info("Bulk conversion finished: %d ok, %d failed -> %s",
+                len(manifest["outputs"]), len(manifest["failures"]), manifest_path)
+    return manifest
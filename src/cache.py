@@ -0,0 +1,201 @@
+import os
+import json
+import hashlib
+import functools
+import tempfile
+from typing import Any, Dict, Optional
+from logger.custom_logger import CustomLogger
+from src._version import __version__
+from src.utils import fingerprint, file_sha256, ensure_dir
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "autoedgeml")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# sources whose changes alter emitted headers (relative to src/)
+EMITTER_SOURCES = ("converter", "footprint.py")
+
+
+@functools.lru_cache(maxsize=None)
+def emitter_version() -> str:
+    """``__version__`` plus a hash of the emitter sources.
+
+    Part of every cache key, so a fix to a converter invalidates headers
+    cached before it even when ``__version__`` is not bumped.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256(__version__.encode("utf-8"))
+    for source in EMITTER_SOURCES:
+        path = os.path.join(root, source)
+        files = [os.path.join(path, n) for n in sorted(os.listdir(path)) if n.endswith(".py")] \
+            if os.path.isdir(path) else [path]
+        for name in files:
+            h.update(os.path.relpath(name, root).encode("utf-8"))
+            with open(name, "rb") as f:
+                h.update(f.read())
+    return f"{__version__}+{h.hexdigest()[:16]}"
+
+
+class ConversionCache:
+    """On-disk, content-addressed cache of emitted headers.
+
+    Two keys are used, both including ``emitter_version()``:
+
+    * the *file key* hashes the model file bytes and the export options. A hit
+      skips load, emit and validation entirely.
+    * the *param key* hashes the fitted estimator/scaler parameters instead, so
+      a re-pickled but identical model still skips emit and validation.
+
+    Only the C code is stored under the param key: two model files with
+    identical parameters share it, but each keeps its own header name. The
+    name a model path was first written under is remembered separately (per
+    path, param key and naming options) so a hit does not get a new
+    timestamped name.
+
+    Layout (one file per entry, so concurrent bulk workers never share an index)::
+
+        <cache_dir>/files/<file_key>.json     -> {"param_key": ...}
+        <cache_dir>/headers/<param_key>.h     emitted header
+        <cache_dir>/names/<name_key>.json     {"file_name": ..., "param_key": ...}
+
+    Headers are evicted least-recently-used first (mtime, refreshed on every
+    hit) once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.files_dir = os.path.join(cache_dir, "files")
+        self.headers_dir = os.path.join(cache_dir, "headers")
+        self.names_dir = os.path.join(cache_dir, "names")
+
+    # keys
+    def file_key(self, model_path: str, export_options: Optional[Dict[str, Any]] = None) -> str:
+        return fingerprint("file", emitter_version(), file_sha256(model_path), export_options or {})
+
+    def param_key(self, estimator: Any, scaler: Optional[Any], export_options: Optional[Dict[str, Any]] = None) -> str:
+        return fingerprint("params", emitter_version(), estimator, scaler, export_options or {})
+
+    @staticmethod
+    def name_key(model_path: str, param_key: str, naming: Optional[Dict[str, Any]] = None) -> str:
+        return fingerprint("name", os.path.abspath(model_path), param_key, naming or {})
+
+    # lookup
+    def lookup_file(self, file_key: str) -> Optional[str]:
+        """The param key a model file was converted under, or None."""
+        entry = self._read_json(os.path.join(self.files_dir, f"{file_key}.json"))
+        return entry["param_key"] if entry is not None else None
+
+    def lookup_params(self, param_key: str) -> Optional[str]:
+        """The cached C code for ``param_key``, or None."""
+        header_path = os.path.join(self.headers_dir, f"{param_key}.h")
+        try:
+            with open(header_path, "r", encoding="utf-8") as f:
+                c_code = f.read()
+            os.utime(header_path)
+        except OSError:
+            return None
+        return c_code
+
+    def lookup_name(self, model_path: str, param_key: str, naming: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """The header name ``model_path`` was written under for ``param_key``, or None."""
+        entry = self._read_json(os.path.join(self.names_dir, f"{self.name_key(model_path, param_key, naming)}.json"))
+        return entry["file_name"] if entry is not None else None
+
+    # update
+    def link(self, file_key: str, param_key: str) -> None:
+        self._write_json(os.path.join(self.files_dir, f"{file_key}.json"), {"param_key": param_key})
+
+    def store(self, file_key: str, param_key: str, c_code: str) -> None:
+        header_path = os.path.join(self.headers_dir, f"{param_key}.h")
+        ensure_dir(header_path)
+        self._atomic_write(header_path, c_code)
+        self.link(file_key, param_key)
+        self.evict()
+
+    def store_name(self, model_path: str, param_key: str, file_name: str,
+                   naming: Optional[Dict[str, Any]] = None) -> None:
+        self._write_json(os.path.join(self.names_dir, f"{self.name_key(model_path, param_key, naming)}.json"),
+                         {"file_name": file_name, "param_key": param_key})
+
+    def evict(self) -> int:
+        """Drop least-recently-used headers until the cache fits ``max_bytes``; returns bytes freed."""
+        if not os.path.isdir(self.headers_dir):
+            return 0
+        entries = []
+        total = 0
+        for name in os.listdir(self.headers_dir):
+            if not name.endswith(".h"):
+                continue
+            path = os.path.join(self.headers_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            freed += size
+        if freed:
+            # file-key entries pointing at evicted headers simply miss on lookup; names of them are dropped
+            for name in os.listdir(self.names_dir) if os.path.isdir(self.names_dir) else ():
+                entry = self._read_json(os.path.join(self.names_dir, name))
+                if entry is not None and not os.path.exists(os.path.join(self.headers_dir,
+                                                                         f"{entry['param_key']}.h")):
+                    try:
+                        os.remove(os.path.join(self.names_dir, name))
+                    except OSError:
+                        pass
+            logger.info("ConversionCache: evicted %d bytes from %s", freed, self.cache_dir)
+        return freed
+
+    # helpers
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        ensure_dir(path)
+        self._atomic_write(path, json.dumps(data))
+
+    @staticmethod
+    def _atomic_write(path: str, text: str) -> None:
+        # a unique temp file per write: threads of one process (the server) may store the same key at once
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def materialize_header(output_dir: str, file_name: str, c_code: str) -> str:
+    """Write a cached header into ``output_dir``, leaving an identical existing file untouched."""
+    out_path = os.path.join(output_dir, file_name)
+    try:
+        with open(out_path, "r", encoding="utf-8") as f:
+            if f.read() == c_code:
+                return out_path
+    except OSError:
+        pass
+    ensure_dir(out_path)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(c_code)
+    return out_path
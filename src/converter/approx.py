@@ -0,0 +1,110 @@
+import numpy as np
+from typing import Any, List, Optional
+from exception.custom_exception import CustomException
+
+# "libm": expf from <math.h>; "poly": range reduction + degree-5 polynomial (rel. error ~3.3e-6);
+# "lut": 64-entry 2^(j/64) table + linear term (rel. error ~6e-5), no libm calls in either
+EXP_IMPLS = ("libm", "poly", "lut")
+
+_LOG2E = np.float32(1.44269504)
+_LN2_HI = np.float32(0.693145752)
+_LN2_LO = np.float32(1.42860677e-6)
+_POLY = tuple(np.float32(c) for c in (1.0, 1.0, 0.5, 0.166666672, 0.0416666679, 0.00833333377))
+_LUT_SIZE = 64
+_LUT_SCALE = np.float32(92.3324826)      # 64 * log2(e)
+_LUT_STEP = np.float32(0.0108304247)     # ln(2) / 64
+_EXP2_LUT = np.exp2(np.arange(_LUT_SIZE) / _LUT_SIZE).astype(np.float32)
+# below this exp underflows to 0; above, it is clamped (2^127 * p stays finite)
+_EXP_MIN = np.float32(-87.0)
+_EXP_MAX = np.float32(88.0)
+
+_POLY_C = """static inline float autoedge_expf_poly(float x) {
+    /* x = n*ln2 + r, |r| <= ln2/2: exp(x) = 2^n * p(r), degree-5 Horner */
+    if (x < -87.0f) return 0.0f;
+    if (x > 88.0f) x = 88.0f;
+    float y = x * 1.44269504f;
+    int32_t n = (int32_t)(y + (y >= 0.0f ? 0.5f : -0.5f));
+    float fn = (float)n;
+    float r = x - fn * 0.693145752f - fn * 1.42860677e-6f;
+    float p = 1.0f + r * (1.0f + r * (0.5f + r * (0.166666672f + r * (0.0416666679f + r * 0.00833333377f))));
+    uint32_t bits = (uint32_t)(n + 127) << 23;
+    float scale;
+    memcpy(&scale, &bits, sizeof scale);
+    return p * scale;
+}"""
+
+_LUT_C = """static const float AUTOEDGE_EXP2_LUT[64] = { %s };
+
+static inline float autoedge_expf_lut(float x) {
+    /* x * 64*log2(e) = k + f: exp(x) = 2^(k>>6) * 2^((k&63)/64) * (1 + f*ln2/64) */
+    if (x < -87.0f) return 0.0f;
+    if (x > 88.0f) x = 88.0f;
+    float y = x * 92.3324826f;
+    int32_t k = (int32_t)y;
+    if ((float)k > y) --k;
+    float d = (y - (float)k) * 0.0108304247f;
+    int32_t j = k & 63;
+    int32_t n = (k - j) / 64;
+    uint32_t bits = (uint32_t)(n + 127) << 23;
+    float scale;
+    memcpy(&scale, &bits, sizeof scale);
+    return AUTOEDGE_EXP2_LUT[j] * (1.0f + d) * scale;
+}""" % ", ".join("%.9ef" % v for v in _EXP2_LUT.tolist())
+
+EXP_HELPERS = {"poly": _POLY_C, "lut": _LUT_C}
+
+
+def check_exp_impl(impl: str) -> None:
+    if impl not in EXP_IMPLS:
+        raise CustomException(f"Unsupported exp_impl '{impl}' (expected one of {EXP_IMPLS})", None)
+
+
+def exp_helper_c(impl: str) -> Optional[str]:
+    """C definition the header needs for ``impl`` (``None`` for libm)."""
+    check_exp_impl(impl)
+    return EXP_HELPERS.get(impl)
+
+
+def insert_exp_helper(parts: List[Any], impl: str) -> List[Any]:
+    """Insert the approximate ``expf`` definition after the includes when the header calls it."""
+    helper = exp_helper_c(impl)
+    if helper is None or not any(isinstance(p, str) and f"autoedge_expf_{impl}(" in p for p in parts):
+        return parts
+    at = max(i for i, p in enumerate(parts) if isinstance(p, str) and p.startswith("#include"))
+    includes = [inc for inc in ("#include <stdint.h>", "#include <string.h>") if inc not in parts]
+    return parts[:at + 1] + includes + ["", helper] + parts[at + 1:]
+
+
+def exp_call(impl: str, arg: str) -> str:
+    return f"expf({arg})" if impl == "libm" else f"autoedge_expf_{impl}({arg})"
+
+
+def approx_exp(impl: str, x: np.ndarray) -> np.ndarray:
+    """float32 NumPy replay of the C exp ``impl``, operation for operation."""
+    check_exp_impl(impl)
+    x = np.asarray(x, dtype=np.float32)
+    if impl == "libm":
+        # float64 exp rounded once: within 1 ulp of libm expf
+        with np.errstate(over="ignore"):
+            return np.exp(x.astype(np.float64)).astype(np.float32)
+
+    under = x < _EXP_MIN
+    x = np.minimum(x, _EXP_MAX)
+    if impl == "poly":
+        y = x * _LOG2E
+        n = (y + np.where(y >= 0, np.float32(0.5), np.float32(-0.5))).astype(np.int32)
+        fn = n.astype(np.float32)
+        r = x - fn * _LN2_HI - fn * _LN2_LO
+        p = _POLY[5]
+        for c in _POLY[4::-1]:
+            p = c + r * p
+    else:
+        y = x * _LUT_SCALE
+        k = y.astype(np.int32)
+        k = k - (k.astype(np.float32) > y)
+        d = (y - k.astype(np.float32)) * _LUT_STEP
+        j = k & (_LUT_SIZE - 1)
+        n = (k - j) // _LUT_SIZE
+        p = _EXP2_LUT[j] * (np.float32(1.0) + d)
+    out = np.ldexp(p, np.clip(n, -126, 127)).astype(np.float32)
+    return np.where(under, np.float32(0.0), out)
@@ -1,7 +1,7 @@
 from typing import Any, Optional
-import joblib
 from logger.custom_logger import CustomLogger
-from src.utils import unwrap_pipeline
+from src.utils import unwrap_pipeline, load_model
+from src.profiling import stage
 
 logger = CustomLogger().get_logger(__name__)
 
@@ -12,7 +12,15 @@ class BaseConverter:
         self.model: Optional[Any] = None
         self.scaler: Optional[Any] = None
 
-    def load(self, model_obj: Optional[Any] = None) -> None:
+    def load(self, model_obj: Optional[Any] = None, timer: Optional[Any] = None,
+             mmap_mode: Optional[str] = None) -> None:
+        """Load ``model_path`` (or take ``model_obj``) and split it into scaler and estimator.
+
+        ``model_path`` is a joblib pickle or a parameter-only ``.npz`` (see
+        ``src.utils.load_model``, which also explains ``mmap_mode``).
+        ``timer`` (a ``src.profiling.StageTimer``) records the ``load`` and
+        ``unwrap_pipeline`` stages.
+        """
         if model_obj is not None:
             self.raw_model = model_obj
             logger.info("BaseConverter.load(): using provided model object")
@@ -20,14 +28,17 @@ class BaseConverter:
             if not self.model_path:
                 raise ValueError("No model_path provided to BaseConverter")
             try:
-                self.raw_model = joblib.load(self.model_path)
+                # the first load also pays for importing joblib/sklearn, which is part of the load cost
+                with stage(timer, "load"):
+                    self.raw_model = load_model(self.model_path, mmap_mode=mmap_mode)
                 logger.info("BaseConverter.load(): loaded from %s", self.model_path)
             except Exception as e:
-                logger.exception("BaseConverter.load(): joblib.load failed: %s", e)
+                logger.exception("BaseConverter.load(): loading %s failed: %s", self.model_path, e)
                 raise
 
         try:
-            scaler, estimator = unwrap_pipeline(self.raw_model)
+            with stage(timer, "unwrap_pipeline"):
+                scaler, estimator = unwrap_pipeline(self.raw_model)
             self.scaler = scaler
             self.model = estimator
             logger.info("BaseConverter.load(): extracted estimator=%s scaler=%s",
@@ -49,3 +60,7 @@ class BaseConverter:
         self.model = self.raw_model
         self.scaler = None
         logger.info("BaseConverter.load(): final estimator=%s", type(self.model).__name__)
+
+    def emit_parts(self, func_name: str = "predict_model", **options) -> list:
+        """Header as a list of lines/``CTable`` parts; converters without a streaming emitter return one string."""
+        return [self.convert_to_c(func_name=func_name, **options)]
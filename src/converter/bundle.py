@@ -0,0 +1,317 @@
+import re
+import hashlib
+import numpy as np
+from typing import Any, Dict, IO, List, Optional, Tuple
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.utils import is_standard_scaler
+from .base import BaseConverter
+from .linear import LinearConverter, _HALF_TO_FLOAT_C
+from .approx import EXP_HELPERS
+from .cformat import CTable, Part, render, write_parts, CHUNK_VALUES
+from .scaling import scaler_runtime_tables, scaled_expr
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_BUNDLE_NAME = "autoedge_bundle"
+
+_IDENT = re.compile(r"^[A-Za-z_]\w*$")
+_CONST_SYMBOL = re.compile(r"^static const \w+ (\w+)(?:\[\d+\])? =")
+_TABLE_LINE = re.compile(r"^static const (\w+) (\w+)\[(\d+)\] = \{ (.*) \};")
+_FUNCTION = re.compile(r"^static inline (\w+) (\w+)\(")
+# per-model boilerplate that the bundle emits once
+_DROPPED_PREFIXES = ("// Auto-generated", "#pragma once")
+_SHARED_HELPERS = (_HALF_TO_FLOAT_C,) + tuple(EXP_HELPERS.values())
+
+
+class BundleMember:
+    """One model of a bundle: converter, C identifier and export options."""
+
+    def __init__(self, name: str, converter: BaseConverter, export_options: Optional[Dict[str, Any]] = None):
+        if not _IDENT.match(name):
+            raise CustomException(f"Bundle member name '{name}' is not a C identifier", None)
+        self.name = name
+        self.converter = converter
+        self.export_options = dict(export_options or {})
+        self.func_name = f"{name}_predict"
+        self.return_type = "float"
+        # index of the shared scaling pass this member reads, None for raw inputs
+        self.scaler_group: Optional[int] = None
+
+    @property
+    def shares_scaling(self) -> bool:
+        """Linear members scaling at run time read the bundle's shared scaled row instead."""
+        return (isinstance(self.converter, LinearConverter) and self.converter.scaler is not None
+                and not self.export_options.get("fold_scaler", True)
+                and self.export_options.get("quantize") is None)
+
+
+class ModelBundle:
+    """Several models in one header, e.g. a regressor and a classifier on the same inputs.
+
+    Every member's tables are prefixed with its upper-cased name
+    (``SALARY_WEIGHTS``) and its entry point is ``<name>_predict``, so the
+    member headers no longer collide. Constant tables with identical type and
+    contents are stored once. Members exported with ``fold_scaler=False``
+    whose scalers have identical parameters share one ``SCALER*`` table set,
+    and ``<bundle>_predict`` scales each input row once for all of them before
+    calling the members. Folded members and tree ensembles read the raw row.
+    """
+
+    def __init__(self, name: str = DEFAULT_BUNDLE_NAME):
+        if not _IDENT.match(name):
+            raise CustomException(f"Bundle name '{name}' is not a C identifier", None)
+        self.name = name
+        self.members: List[BundleMember] = []
+        self.scalers: List[Tuple[Any, List[str]]] = []
+        self.deduplicated: Dict[str, str] = {}
+
+    def add(self, name: str, converter: BaseConverter, **export_options) -> BundleMember:
+        if any(m.name == name for m in self.members):
+            raise CustomException(f"Duplicate bundle member name '{name}'", None)
+        if converter.model is None:
+            raise CustomException("Converter has no loaded estimator; call load() first", None)
+        member = BundleMember(name, converter, export_options)
+        self.members.append(member)
+        return member
+
+    @property
+    def n_features(self) -> int:
+        counts = {m.name: _n_features(m.converter) for m in self.members}
+        if len(set(counts.values())) != 1:
+            raise CustomException(f"Bundle members disagree on the number of input features: {counts}", None)
+        return next(iter(counts.values()))
+
+    def convert_to_c(self, batch: bool = False) -> str:
+        return render(self.emit_parts(batch))
+
+    def write_c(self, f: IO[str], batch: bool = False, chunk_size: int = CHUNK_VALUES) -> int:
+        return write_parts(self.emit_parts(batch), f, chunk_size)
+
+    def emit_parts(self, batch: bool = False) -> List[Part]:
+        """Bundle header as lines and ``CTable`` parts.
+
+        ``batch=True`` appends ``<bundle>_predict_batch``; member ``batch``
+        options are ignored because members may read pre-scaled rows.
+        """
+        if not self.members:
+            raise CustomException("Bundle has no members", None)
+        F = self.n_features
+        self._group_scalers()
+
+        includes: List[str] = ["#include <math.h>"]
+        helpers: List[str] = []
+        seen: Dict[Any, str] = {}
+        self.deduplicated = {}
+        body: List[Part] = []
+
+        for g, (scaler, names) in enumerate(self.scalers):
+            body.append(f"/* {type(scaler).__name__} shared by {', '.join(names)}: scaled once per row */")
+            for suffix, values in scaler_runtime_tables(scaler, F):
+                body.extend(self._dedup(CTable("float", f"{self.name.upper()}_SCALER{g}_{suffix}", values), seen))
+            body.append("")
+
+        for member in self.members:
+            parts = self._member_parts(member, includes, helpers)
+            body.append(f"/* ---- {member.name}: {type(member.converter.model).__name__} ---- */")
+            kept: List[Part] = []
+            aliases: Dict[str, str] = {}
+            for part in parts:
+                unique = self._dedup(part, seen)
+                if not unique:
+                    dropped = part.name if isinstance(part, CTable) else _TABLE_LINE.match(part).group(2)
+                    aliases[dropped] = seen[_table_key(part)]
+                kept.extend(unique)
+            # later references to a dropped table read the identical one emitted earlier
+            _rename_in_place(kept, aliases)
+            self.deduplicated.update(aliases)
+            body.extend(kept)
+            body.append("")
+
+        if helpers:
+            for inc in ("#include <stdint.h>", "#include <string.h>"):
+                if inc not in includes:
+                    includes.append(inc)
+        lines: List[Part] = [f"// Auto-generated by AutoEdgeML (bundle {self.name}: "
+                             f"{', '.join(m.name for m in self.members)})",
+                             "#pragma once"] + includes + [""]
+        for helper in helpers:
+            lines += [helper, ""]
+        lines += body
+        lines += self._emit_entry(F, batch)
+        if self.deduplicated:
+            logger.info("Bundle %s: %d duplicate tables stored once (%s)", self.name, len(self.deduplicated),
+                        ", ".join(f"{a}->{b}" for a, b in self.deduplicated.items()))
+        return lines
+
+    def op_counts(self) -> dict:
+        """Members' per-inference arithmetic plus one division (StandardScaler) or multiply-add
+        (MinMaxScaler) per feature and shared scaler."""
+        ops: Dict[str, int] = {}
+        for member in self.members:
+            for k, v in member.converter.op_counts().items():
+                ops[k] = ops.get(k, 0) + int(v)
+        for scaler, _ in self.scalers:
+            key = "divisions" if is_standard_scaler(scaler) else "macs"
+            ops[key] = ops.get(key, 0) + self.n_features
+        return ops
+
+    def accessor_c(self, member_name: str) -> Tuple[str, str]:
+        """(C code, function name) of a ``float f(const float *x, int n_features)`` returning one member's output.
+
+        Used to drive a single member of the bundle through the C test harness.
+        """
+        member = next((m for m in self.members if m.name == member_name), None)
+        if member is None:
+            raise CustomException(f"No bundle member '{member_name}'", None)
+        func = f"{self.name}_{member.name}_only"
+        code = (f"static inline {member.return_type} {func}(const float *x, int n_features) {{\n"
+                f"    {self.name}_result r;\n"
+                f"    {self.name}_predict(x, n_features, &r);\n"
+                f"    return r.{member.name};\n"
+                f"}}\n")
+        return code, func
+
+    # emission helpers
+    def _group_scalers(self) -> None:
+        keys: Dict[Any, int] = {}
+        self.scalers = []
+        for member in self.members:
+            member.scaler_group = None
+            if not member.shares_scaling:
+                continue
+            key = _scaler_key(member.converter.scaler, self.n_features)
+            if key not in keys:
+                keys[key] = len(self.scalers)
+                self.scalers.append((member.converter.scaler, []))
+            member.scaler_group = keys[key]
+            self.scalers[keys[key]][1].append(member.name)
+
+    def _member_parts(self, member: BundleMember, includes: List[str], helpers: List[str]) -> List[Part]:
+        """Member header without boilerplate and shared helpers, symbols prefixed."""
+        converter = member.converter
+        options = {k: v for k, v in member.export_options.items() if k != "batch"}
+        scaler = converter.scaler
+        if member.scaler_group is not None:
+            # emit against scaled inputs; the bundle entry point does the scaling
+            converter.scaler = None
+        try:
+            raw = converter.emit_parts(func_name=member.func_name, **options)
+        finally:
+            converter.scaler = scaler
+        if member.scaler_group is not None and getattr(converter, "sparse", None) is not None:
+            converter.sparse.folded = False
+
+        parts: List[Part] = []
+        for part in raw:
+            if isinstance(part, CTable):
+                parts.append(part)
+                continue
+            if part in _SHARED_HELPERS:
+                # half-float decode / approximate expf: one definition for the whole bundle
+                if part not in helpers:
+                    helpers.append(part)
+                continue
+            for line in part.split("\n"):
+                if line.startswith(_DROPPED_PREFIXES):
+                    continue
+                if line.startswith("#include"):
+                    if line not in includes:
+                        includes.append(line)
+                    continue
+                parts.append(line)
+        while parts and parts[0] == "":
+            parts.pop(0)
+
+        symbols = {p.name for p in parts if isinstance(p, CTable)}
+        symbols.update(m.group(1) for p in parts if isinstance(p, str) for m in [_CONST_SYMBOL.match(p)] if m)
+        prefix = member.name.upper() + "_"
+        _rename_in_place(parts, {s: prefix + s for s in symbols})
+
+        for p in parts:
+            m = _FUNCTION.match(p) if isinstance(p, str) else None
+            if m and m.group(2) == member.func_name:
+                member.return_type = m.group(1)
+        return parts
+
+    @staticmethod
+    def _dedup(part: Part, seen: Dict[Any, str]) -> List[Part]:
+        """``[part]``, or ``[]`` when an identical table was already emitted."""
+        key = _table_key(part)
+        if key is None:
+            return [part]
+        if key in seen:
+            return []
+        seen[key] = part.name if isinstance(part, CTable) else _TABLE_LINE.match(part).group(2)
+        return [part]
+
+    def _emit_entry(self, F: int, batch: bool) -> List[Part]:
+        lines: List[Part] = ["typedef struct {"]
+        for member in self.members:
+            lines.append(f"    {member.return_type} {member.name};")
+        lines.append(f"}} {self.name}_result;")
+        lines.append("")
+        lines.append(f"static inline void {self.name}_predict(const float *x, int n_features, {self.name}_result *out) {{")
+        for g, (scaler, _) in enumerate(self.scalers):
+            prefix = f"{self.name.upper()}_SCALER{g}_"
+            t = {suffix: self.deduplicated.get(prefix + suffix, prefix + suffix)
+                 for suffix, _ in scaler_runtime_tables(scaler, F)}
+            lines.append(f"    float xs{g}[{F}];")
+            lines.append("    for (int i = 0; i < n_features; ++i) {")
+            lines.append(f"        xs{g}[i] = {scaled_expr(scaler, 'x[i]', t)};")
+            lines.append("    }")
+        for member in self.members:
+            xref = "x" if member.scaler_group is None else f"xs{member.scaler_group}"
+            lines.append(f"    out->{member.name} = {member.func_name}({xref}, n_features);")
+        lines.append("}")
+
+        if batch:
+            lines.append("")
+            lines.append(f"static inline void {self.name}_predict_batch(const float *X, int n_rows, "
+                         f"{self.name}_result *out) {{")
+            lines.append("    for (int r = 0; r < n_rows; ++r) {")
+            lines.append(f"        {self.name}_predict(X + r * {F}, {F}, out + r);")
+            lines.append("    }")
+            lines.append("}")
+        return lines
+
+
+def _n_features(converter: BaseConverter) -> int:
+    program = getattr(converter, "program", None)
+    if program is not None:
+        # compiled pipelines read the raw row, not the estimator's preprocessed features
+        return program.n_inputs
+    model = converter.model
+    if hasattr(model, "coef_"):
+        return int(np.asarray(model.coef_).shape[-1])
+    return int(model.n_features_in_)
+
+
+def _scaler_key(scaler: Any, n_features: int) -> Tuple:
+    """Identity of the transform a scaler applies: its effective runtime tables, so
+    ``feature_range``/``with_mean``/``with_std`` are part of it."""
+    return (type(scaler).__name__,) + tuple((suffix, np.asarray(v, dtype=np.float64).tobytes())
+                                             for suffix, v in scaler_runtime_tables(scaler, n_features))
+
+
+def _table_key(part: Part) -> Optional[Tuple]:
+    """Identity of a constant table's type and contents, ``None`` for anything else."""
+    if isinstance(part, CTable):
+        values = np.ascontiguousarray(part.values)
+        digest = hashlib.sha256(values.tobytes()).hexdigest()
+        return ("table", part.ctype, part.fmt, values.dtype.str, part.size, digest)
+    m = _TABLE_LINE.match(part)
+    if m is None:
+        return None
+    return ("line", m.group(1), m.group(3), m.group(4))
+
+
+def _rename_in_place(parts: List[Part], mapping: Dict[str, str]) -> None:
+    if not mapping:
+        return
+    pattern = re.compile(r"\b(" + "|".join(sorted(map(re.escape, mapping), key=len, reverse=True)) + r")\b")
+    for i, part in enumerate(parts):
+        if isinstance(part, CTable):
+            part.name = mapping.get(part.name, part.name)
+        else:
+            parts[i] = pattern.sub(lambda m: mapping[m.group(1)], part)
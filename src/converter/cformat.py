@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Any, IO, Iterable, Iterator, List, Optional, Tuple, Union
+from exception.custom_exception import CustomException
+
+# values formatted per chunk: bounds the temporary strings for 100k+ feature tables
+CHUNK_VALUES = 65536
+
+FLOAT_FMT = "%.10ff"
+INT_FMT = "%d"
+HEX16_FMT = "0x%04x"
+
+
+def smallest_int_type(lo: int, hi: int) -> Tuple[str, Any]:
+    """Smallest C integer type (and matching numpy dtype) holding [lo, hi]."""
+    for bits in (8, 16, 32):
+        if lo >= 0 and hi < 2 ** bits:
+            return f"uint{bits}_t", np.dtype(f"uint{bits}")
+        if lo >= -(2 ** (bits - 1)) and hi < 2 ** (bits - 1):
+            return f"int{bits}_t", np.dtype(f"int{bits}")
+    raise CustomException(f"Index range [{lo}, {hi}] does not fit in 32 bits", None)
+
+
+def iter_c_values(values: Any, fmt: str, chunk_size: int = CHUNK_VALUES) -> Iterator[str]:
+    """``", "``-separated C literals of ``values``, one string per chunk.
+
+    Each chunk is converted with ``ndarray.tolist()`` and formatted by a
+    single ``%`` over a repeated format string, which produces the same text
+    as a per-element f-string at a fraction of the interpreter overhead.
+    """
+    flat = np.ravel(values)
+    for start in range(0, flat.size, chunk_size):
+        chunk = flat[start:start + chunk_size].tolist()
+        yield ", ".join([fmt] * len(chunk)) % tuple(chunk)
+
+
+def c_values(values: Any, fmt: str) -> str:
+    return ", ".join(iter_c_values(values, fmt))
+
+
+class CTable:
+    """A ``static const`` array whose initializer is only formatted when written.
+
+    ``str(table)`` gives the whole declaration line; ``write(f)`` streams it
+    chunk by chunk so the formatted table never exists as one string.
+    """
+
+    def __init__(self, ctype: str, name: str, values: Any, fmt: str = FLOAT_FMT, comment: Optional[str] = None):
+        self.ctype = ctype
+        self.name = name
+        self.values = np.ravel(values)
+        self.fmt = fmt
+        self.comment = comment
+
+    @property
+    def size(self) -> int:
+        return int(self.values.size)
+
+    def _head(self) -> str:
+        return f"static const {self.ctype} {self.name}[{self.size}] = {{ "
+
+    def _tail(self) -> str:
+        return " };" + (f" /* {self.comment} */" if self.comment else "")
+
+    def declaration(self) -> str:
+        """The line without its values, e.g. for footprint estimation."""
+        return self._head() + "..." + self._tail()
+
+    def __str__(self) -> str:
+        return self._head() + c_values(self.values, self.fmt) + self._tail()
+
+    def write(self, f: IO[str], chunk_size: int = CHUNK_VALUES) -> int:
+        written = f.write(self._head())
+        for i, chunk in enumerate(iter_c_values(self.values, self.fmt, chunk_size)):
+            if i:
+                written += f.write(", ")
+            written += f.write(chunk)
+        return written + f.write(self._tail())
+
+
+Part = Union[str, CTable]
+
+
+def render(parts: Iterable[Part]) -> str:
+    return "\n".join(str(p) for p in parts)
+
+
+def render_skeleton(parts: Iterable[Part]) -> str:
+    """Header text with every ``CTable`` initializer elided; cheap even for huge models."""
+    return "\n".join(p.declaration() if isinstance(p, CTable) else p for p in parts)
+
+
+def write_parts(parts: List[Part], f: IO[str], chunk_size: int = CHUNK_VALUES) -> int:
+    """Stream ``parts`` to ``f``; the bytes match ``render(parts)`` exactly. Returns characters written."""
+    written = 0
+    for i, part in enumerate(parts):
+        if i:
+            written += f.write("\n")
+        if isinstance(part, CTable):
+            written += part.write(f, chunk_size)
+        else:
+            written += f.write(part)
+    return written
@@ -0,0 +1,37 @@
+from typing import Any, Optional
+from logger.custom_logger import CustomLogger
+from .base import BaseConverter
+from .linear import LinearConverter
+from .tree import TreeEnsembleConverter, is_tree_model
+from .mlp import MLPConverter, is_mlp_model
+from .pipeline import PipelineConverter
+from .preprocess import is_preprocess_chain
+
+logger = CustomLogger().get_logger(__name__)
+
+
+def converter_class_for(estimator: Any) -> type:
+    if is_tree_model(estimator):
+        return TreeEnsembleConverter
+    if is_mlp_model(estimator):
+        return MLPConverter
+    return LinearConverter
+
+
+def load_converter(model_path: Optional[str] = None, model_obj: Optional[Any] = None,
+                   timer: Optional[Any] = None, mmap_mode: Optional[str] = None) -> BaseConverter:
+    """Load a model once and return the converter subclass that handles its estimator.
+
+    Pipelines with more preprocessing than one scaler get a ``PipelineConverter``
+    wrapping the estimator's converter.
+    """
+    probe = BaseConverter(model_path)
+    probe.load(model_obj, timer=timer, mmap_mode=mmap_mode)
+    chain = is_preprocess_chain(probe.scaler)
+    cls = PipelineConverter if chain else converter_class_for(probe.model)
+    converter = cls(model_path)
+    converter.raw_model, converter.model, converter.scaler = probe.raw_model, probe.model, probe.scaler
+    if chain:
+        converter.compile()
+    logger.info("load_converter(): %s -> %s", type(probe.model).__name__, cls.__name__)
+    return converter
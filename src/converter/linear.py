@@ -1,57 +1,340 @@
 import numpy as np
+from typing import IO, List, Optional
 from logger.custom_logger import CustomLogger
 from exception.custom_exception import CustomException
 from .base import BaseConverter
-from sklearn.linear_model import LogisticRegression
-from src.utils import is_standard_scaler, is_minmax_scaler
+from src.utils import is_standard_scaler, instance_of
+from .quantization import calibrate_linear, WEIGHT_TYPES, INPUT_QMIN, INPUT_QMAX, INPUT_CLAMP, REQUANT_SHIFT
+from .cformat import (CTable, Part, c_values, render, write_parts, smallest_int_type, FLOAT_FMT, INT_FMT,
+                      HEX16_FMT, CHUNK_VALUES)
+from .scaling import scaler_affine, scaler_runtime_tables, scaled_expr
+from .sparse import SparseLinear, use_sparse, DEFAULT_DENSITY_THRESHOLD
+from .approx import check_exp_impl, exp_call, insert_exp_helper
 
 logger = CustomLogger().get_logger(__name__)
 
+
+def _c_floats(values) -> str:
+    return c_values(values, FLOAT_FMT)
+
+
+def _c_ints(values) -> str:
+    return c_values(np.asarray(values).astype(np.int64), INT_FMT)
+
+
+WEIGHT_DTYPES = ("float32", "float16")
+# above this, folding the scaler costs more float32 precision than runtime scaling (see _fold_cancellation)
+FOLD_MAX_CANCELLATION = 4.0
+
+# IEEE 754 half -> float with integer ops only (no FPU or F16C needed)
+_HALF_TO_FLOAT_C = """static inline float autoedge_half_to_float(uint16_t h) {
+    uint32_t sign = (uint32_t)(h & 0x8000u) << 16;
+    uint32_t exp = (h >> 10) & 0x1Fu;
+    uint32_t mant = h & 0x3FFu;
+    uint32_t bits;
+    if (exp == 0) {
+        if (mant == 0) {
+            bits = sign;
+        } else {
+            exp = 113;
+            while ((mant & 0x400u) == 0) { mant <<= 1; --exp; }
+            bits = sign | (exp << 23) | ((mant & 0x3FFu) << 13);
+        }
+    } else if (exp == 31) {
+        bits = sign | 0x7F800000u | (mant << 13);
+    } else {
+        bits = sign | ((exp + 112) << 23) | (mant << 13);
+    }
+    float f;
+    memcpy(&f, &bits, sizeof f);
+    return f;
+}"""
+
+
+def _half_bits(values) -> np.ndarray:
+    halfs = np.asarray(np.ravel(values), dtype=np.float64).astype(np.float16)
+    if not np.all(np.isfinite(halfs)):
+        raise CustomException("Weights exceed the float16 range (|w| > 65504); use float32", None)
+    return halfs.view(np.uint16)
+
+
 class LinearConverter(BaseConverter):
     def __init__(self, model_path: str = None):
         super().__init__(model_path)
+        self.quantized = None
+        self.sparse = None
+        self._weight_dtype = "float32"
+        self._runtime_scaling = False
+        self._fold_skipped = False
+        self._exp_impl = "libm"
+
+    def convert_to_c(self, func_name: str = "predict_model", **options) -> str:
+        """Emit a self-contained C header for the loaded estimator (see ``emit_parts`` for options)."""
+        return render(self.emit_parts(func_name, **options))
+
+    def write_c(self, f: IO[str], func_name: str = "predict_model", chunk_size: int = CHUNK_VALUES,
+                **options) -> int:
+        """Stream the header to the open text file ``f``; same bytes as ``convert_to_c``."""
+        return write_parts(self.emit_parts(func_name, **options), f, chunk_size)
+
+    def emit_parts(self, func_name: str = "predict_model", batch: bool = False,
+                   fold_scaler: bool = True, quantize: Optional[str] = None,
+                   quant_granularity: str = "tensor", calibration_data: Optional[np.ndarray] = None,
+                   weight_dtype: str = "float32", sparse: Optional[bool] = None,
+                   sparse_threshold: float = DEFAULT_DENSITY_THRESHOLD, proba: bool = False, top_k: int = 0,
+                   exp_impl: str = "libm") -> List[Part]:
+        """The header as lines and lazily formatted ``CTable`` constant arrays.
+
+        With ``fold_scaler=True`` (default) a StandardScaler/MinMaxScaler is
+        folded into the weights and bias at export time, so the emitted code is
+        a single dot product. ``fold_scaler=False`` keeps the raw ``SCALER_*``
+        constant arrays and scales each input at run time. Folding is skipped
+        (with a warning) when features sit far from the scaler's center
+        relative to their spread: the folded bias would then cancel against
+        large float32 products at run time, losing precision that runtime
+        scaling keeps (see ``_fold_cancellation``).
+
+        With ``batch=True`` a ``<func_name>_batch(const float *X, int n_rows, out)``
+        entry point is appended. It scores ``n_rows`` row-major samples using
+        weights with the scaler already folded in, so no per-row scaling pass
+        or stack buffer is needed (unless folding was skipped for precision,
+        in which case it calls the single-row function per row). Multiclass
+        weights are then stored once as a contiguous row-major ``[C][F]``
+        ``W_MATRIX`` (with ``B_VECTOR``) that both entry points read, instead
+        of per-class ``W_c``/``B_c`` tables; with ``fold_scaler=False`` the
+        single-row function keeps ``W_c`` and the batch one gets a folded
+        ``W_MATRIX`` copy.
 
-    def convert_to_c(self, func_name: str = "predict_model") -> str:
+        ``quantize="int8"|"int16"`` emits fixed-point weights with int32
+        accumulators instead (see ``quantization.QuantizedLinear``). The
+        scale/zero points are calibrated on ``calibration_data`` (raw input
+        rows), per tensor or per class (``quant_granularity``). The resulting
+        parameters are kept on ``self.quantized`` for validation.
+
+        ``weight_dtype="float16"`` stores the float weight tables as IEEE half
+        bit patterns (half the flash) decoded with integer ops at run time;
+        biases and accumulation stay float32.
+
+        Float exports store only the nonzero weights (index + value, CSR
+        ``W_ROW_PTR``/``W_COL_INDEX``/``W_VALUE`` for multiclass) and loop over
+        those when ``sparse=True``, or with ``sparse=None`` (default) when at
+        most ``sparse_threshold`` of the weights are nonzero, as with typical
+        Lasso/ElasticNet/L1 models. The CSR tables are kept on ``self.sparse``
+        for validation.
+
+        ``proba=True`` adds ``<func_name>_proba(x, n_features, float *proba)``
+        for multiclass models: softmax over the class scores (what sklearn's
+        ``predict_proba`` returns), with the argmax label as return value.
+        ``top_k=K`` also adds ``<func_name>_topk(x, n_features, int *labels,
+        float *probs)`` with the K most probable classes, most probable first.
+        Binary logistic entry points already return the probability.
+        ``exp_impl`` picks the ``expf`` behind softmax and sigmoid: ``"libm"``,
+        or the libm-free ``"poly"``/``"lut"`` approximations of
+        ``approx.py`` (cheaper, relative error ~3e-6 / ~6e-5).
+        """
         if self.model is None:
             raise CustomException("Converter has no loaded estimator; call load() first", None)
+        if weight_dtype not in WEIGHT_DTYPES:
+            raise CustomException(f"Unsupported weight_dtype '{weight_dtype}' (expected one of {WEIGHT_DTYPES})", None)
+        check_exp_impl(exp_impl)
+        self._weight_dtype = weight_dtype
+        self._exp_impl = exp_impl
 
         coef = np.asarray(self.model.coef_)
         intercept = np.asarray(self.model.intercept_)
+        if coef.ndim == 2 and coef.shape[0] == 1:
+            # binary LogisticRegression stores coef_ as (1, F): one score, not a 1-class argmax
+            coef = coef[0]
+            intercept = intercept.ravel()[:1]
+        self._fold_skipped = False
+        if fold_scaler and self.scaler is not None and quantize is None:
+            cancellation = self._fold_cancellation(coef, intercept)
+            if cancellation > FOLD_MAX_CANCELLATION:
+                logger.warning("Not folding %s: inputs are far from its center, folding would amplify float32 "
+                               "rounding %.1fx; scaling at run time instead", type(self.scaler).__name__,
+                               cancellation)
+                fold_scaler = False
+                self._fold_skipped = True
+        self._runtime_scaling = self.scaler is not None and not fold_scaler and quantize is None
+        self.quantized = None
+        self.sparse = None
+        proba = proba or top_k > 0
+        if proba and coef.ndim != 2:
+            if not instance_of(self.model, "sklearn.linear_model", "LogisticRegression"):
+                raise CustomException("proba/top_k need a classifier", None)
+            if top_k:
+                raise CustomException("top_k needs a multiclass model", None)
+            logger.info("Binary logistic entry point already returns the probability; proba adds nothing")
+            proba = False
+        if top_k and not 0 < top_k <= coef.shape[0]:
+            raise CustomException(f"top_k must be in [1, {coef.shape[0]}], got {top_k}", None)
 
-        if coef.ndim == 1:
-            return self._emit_regression_or_binary(func_name, coef, intercept)
+        if quantize is not None:
+            if proba:
+                raise CustomException("proba/top_k are not available for quantized exports", None)
+            parts = self._emit_quantized(func_name, coef, intercept, quantize, quant_granularity,
+                                         calibration_data, batch)
+        # folding scales columns, so the zero pattern is the same before and after
+        elif coef.ndim in (1, 2) and use_sparse(coef, sparse, sparse_threshold):
+            parts = self._emit_sparse(func_name, coef, intercept, fold_scaler, batch, proba)
+        elif coef.ndim == 1:
+            parts = self._emit_regression_or_binary(func_name, coef, intercept, fold_scaler)
+            if batch:
+                parts += [""] + self._emit_batch_regression_or_binary(
+                    func_name, coef, intercept, reuse_weights=fold_scaler or self.scaler is None)
         elif coef.ndim == 2:
-            return self._emit_multiclass(func_name, coef, intercept)
+            # with a batch entry point on scaler-free weights, both entry points read one row-major W_MATRIX
+            reuse_weights = fold_scaler or self.scaler is None
+            parts = self._emit_multiclass(func_name, coef, intercept, fold_scaler, proba,
+                                          matrix=batch and reuse_weights)
+            if batch:
+                parts += [""] + self._emit_batch_multiclass(func_name, coef, intercept, reuse_weights=reuse_weights)
         else:
             raise CustomException("Unsupported coef_ shape", None)
 
-    def _emit_regression_or_binary(self, func_name: str, coef: np.ndarray, intercept: np.ndarray) -> str:
+        if proba:
+            parts += [""] + self._emit_proba(func_name, coef.shape[0], top_k)
+        return self._with_exp_helper(parts)
+
+    def op_counts(self) -> dict:
+        """Per-inference arithmetic of the last ``convert_to_c`` output."""
+        coef = np.asarray(self.model.coef_)
+        n_features = coef.shape[-1]
+        if self.sparse is not None:
+            # the sparse loop scales each used input on the fly
+            return self._with_scaling_ops({"macs": self.sparse.nnz}, self.sparse.nnz)
+        return self._with_scaling_ops({"macs": int(coef.size)}, int(n_features))
+
+    def _with_scaling_ops(self, ops: dict, n_scaled: int) -> dict:
+        """Runtime scaling: one division (StandardScaler) or multiply-add (MinMaxScaler) per scaled input."""
+        if self._runtime_scaling:
+            key = "divisions" if is_standard_scaler(self.scaler) else "macs"
+            ops[key] = ops.get(key, 0) + n_scaled
+        return ops
+
+    def _weight_ctype(self) -> str:
+        return "uint16_t" if self._weight_dtype == "float16" else "float"
+
+    def _weight_table(self, name: str, values) -> CTable:
+        if self._weight_dtype == "float16":
+            return CTable("uint16_t", name, _half_bits(values), HEX16_FMT, comment="float16 bits")
+        return CTable("float", name, values)
+
+    def _weight_at(self, expr: str) -> str:
+        return f"autoedge_half_to_float({expr})" if self._weight_dtype == "float16" else expr
+
+    def _weight_preamble(self) -> list:
+        if self._weight_dtype != "float16":
+            return []
+        return ["#include <stdint.h>", "#include <string.h>", "", _HALF_TO_FLOAT_C]
+
+    def _sigmoid(self, s: str) -> str:
+        return f"1.0f / (1.0f + {exp_call(self._exp_impl, '-' + s)})"
+
+    def _with_exp_helper(self, parts: List[Part]) -> List[Part]:
+        return insert_exp_helper(parts, self._exp_impl)
+
+    def _emit_proba(self, func_name: str, C: int, top_k: int) -> List[Part]:
+        """Softmax (and top-k) entry points on top of ``<func_name>_scores``."""
+        lines = []
+        lines.append(f"/* softmax over the class scores ({self._exp_impl} expf); returns the argmax label */")
+        lines.append(f"static inline int {func_name}_proba(const float *x, int n_features, float *proba) {{")
+        lines.append(f"    {func_name}_scores(x, n_features, proba);")
+        lines.append("    int best = 0;")
+        lines.append(f"    for (int k = 1; k < {C}; ++k) {{ if (proba[k] > proba[best]) best = k; }}")
+        lines.append("    float m = proba[best];")
+        lines.append("    float sum = 0.0f;")
+        lines.append(f"    for (int k = 0; k < {C}; ++k) {{")
+        lines.append(f"        proba[k] = {exp_call(self._exp_impl, 'proba[k] - m')};")
+        lines.append("        sum += proba[k];")
+        lines.append("    }")
+        lines.append("    float inv = 1.0f / sum;")
+        lines.append(f"    for (int k = 0; k < {C}; ++k) proba[k] *= inv;")
+        lines.append("    return best;")
+        lines.append("}")
+        if top_k:
+            lines.append("")
+            lines.append(f"/* the {top_k} most probable classes, most probable first */")
+            lines.append(f"static inline void {func_name}_topk(const float *x, int n_features, int *labels, float *probs) {{")
+            lines.append(f"    float proba[{C}];")
+            lines.append(f"    {func_name}_proba(x, n_features, proba);")
+            lines.append(f"    for (int j = 0; j < {top_k}; ++j) {{")
+            lines.append("        int best = 0;")
+            lines.append(f"        for (int k = 1; k < {C}; ++k) {{ if (proba[k] > proba[best]) best = k; }}")
+            lines.append("        labels[j] = best;")
+            lines.append("        probs[j] = proba[best];")
+            lines.append("        proba[best] = -1.0f;")
+            lines.append("    }")
+            lines.append("}")
+        return lines
+
+    def _scaler_tables(self) -> List[Part]:
+        """``SCALER_*`` tables of runtime scaling (see ``scaling.scaler_runtime_tables``)."""
+        return [CTable("float", f"SCALER_{suffix}", values)
+                for suffix, values in scaler_runtime_tables(self.scaler, self._n_features())] + [""]
+
+    def _scaled(self, x: str) -> str:
+        names = {suffix: f"SCALER_{suffix}" for suffix, _ in scaler_runtime_tables(self.scaler, self._n_features())}
+        return scaled_expr(self.scaler, x, names)
+
+    def _n_features(self) -> int:
+        return int(np.asarray(self.model.coef_).shape[-1])
+
+    def _folded_params(self, coef: np.ndarray, intercept: np.ndarray):
+        """Fold the affine scaler into the weights: w.(a*x + c) + b == (w*a).x + (w.c + b)."""
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.asarray(intercept, dtype=np.float64)
+        if self.scaler is None:
+            return coef, intercept
+        a, c = scaler_affine(self.scaler, coef.shape[-1])
+        return coef * a, coef.dot(c) + intercept
+
+    def _fold_cancellation(self, coef: np.ndarray, intercept: np.ndarray) -> float:
+        """How much larger the folded float32 sum's terms are than the score they produce.
+
+        The folded bias ``w.c + b`` is cancelled at run time by ``(w*a).x``
+        for inputs near the scaler's center, so float32 rounding of those
+        terms is amplified by ``(|b| + sum|w*c|) / (|b| + sum|w|*spread)``,
+        with ``spread`` about one standard deviation of a scaled feature:
+        ~1 for centered features, large for features whose offset is much
+        bigger than their spread. Worst class for multiclass.
+        """
+        if self.scaler is None:
+            return 1.0
+        coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+        intercept = np.abs(np.asarray(intercept, dtype=np.float64)).ravel()
+        _, c = scaler_affine(self.scaler, coef.shape[-1])
+        if is_standard_scaler(self.scaler):
+            spread = 1.0
+        else:
+            low, high = getattr(self.scaler, "feature_range", (0, 1))
+            spread = (high - low) / 4.0
+        folded = intercept + np.abs(coef * c).sum(axis=1)
+        unfolded = intercept + np.abs(coef).sum(axis=1) * spread
+        return float(np.max(folded / np.maximum(unfolded, np.finfo(np.float64).tiny)))
+
+    def _emit_regression_or_binary(self, func_name: str, coef: np.ndarray, intercept: np.ndarray,
+                                   fold_scaler: bool = False) -> List[Part]:
         n_features = coef.shape[0]
         has_scaler = self.scaler is not None
+        folded = has_scaler and fold_scaler
+        if folded:
+            coef, intercept = self._folded_params(coef, intercept)
+            has_scaler = False
 
         lines = []
         lines.append("// Auto-generated by AutoEdgeML (linear)")
         lines.append("#pragma once")
         lines.append("#include <math.h>")
+        lines.extend(self._weight_preamble())
         lines.append("")
+        if folded:
+            lines.append(f"/* {type(self.scaler).__name__} folded into WEIGHTS/BIAS at export time */")
         if has_scaler:
-            if is_standard_scaler(self.scaler):
-                means = ", ".join(f"{m:.10f}f" for m in self.scaler.mean_)
-                scales = ", ".join(f"{s:.10f}f" for s in self.scaler.scale_)
-                lines.append(f"static const float SCALER_MEAN[{n_features}] = {{ {means} }};")
-                lines.append(f"static const float SCALER_SCALE[{n_features}] = {{ {scales} }};")
-            elif is_minmax_scaler(self.scaler):
-                mins = ", ".join(f"{m:.10f}f" for m in self.scaler.data_min_)
-                maxs = ", ".join(f"{M:.10f}f" for M in self.scaler.data_max_)
-                lines.append(f"static const float SCALER_MIN[{n_features}] = {{ {mins} }};")
-                lines.append(f"static const float SCALER_MAX[{n_features}] = {{ {maxs} }};")
-            else:
-                raise CustomException("Unsupported scaler type", None)
-            lines.append("")
+            lines.extend(self._scaler_tables())
 
-        weights = ", ".join(f"{w:.10f}f" for w in coef)
         bias = float(intercept.ravel()[0])
-        lines.append(f"static const float WEIGHTS[{n_features}] = {{ {weights} }};")
+        lines.append(self._weight_table("WEIGHTS", coef))
         lines.append(f"static const float BIAS = {bias:.10f}f;")
         lines.append("")
 
@@ -59,11 +342,7 @@ class LinearConverter(BaseConverter):
         if has_scaler:
             lines.append(f"    float x_scaled[{n_features}];")
             lines.append("    for (int i = 0; i < n_features; ++i) {")
-            if is_standard_scaler(self.scaler):
-                lines.append("        x_scaled[i] = (x[i] - SCALER_MEAN[i]) / SCALER_SCALE[i];")
-            else:
-                lines.append("        if (SCALER_MAX[i] - SCALER_MIN[i] == 0.0f) x_scaled[i] = 0.0f; else")
-                lines.append("        x_scaled[i] = (x[i] - SCALER_MIN[i]) / (SCALER_MAX[i] - SCALER_MIN[i]);")
+            lines.append(f"        x_scaled[i] = {self._scaled('x[i]')};")
             lines.append("    }")
             xref = "x_scaled"
         else:
@@ -71,64 +350,82 @@ class LinearConverter(BaseConverter):
 
         lines.append("    float s = BIAS;")
         lines.append("    for (int i = 0; i < n_features; ++i) {")
-        lines.append(f"        s += WEIGHTS[i] * {xref}[i];")
+        lines.append(f"        s += {self._weight_at('WEIGHTS[i]')} * {xref}[i];")
         lines.append("    }")
 
         # logistic detection
-        if isinstance(self.model, LogisticRegression):
+        if instance_of(self.model, "sklearn.linear_model", "LogisticRegression"):
             lines.append("    /* logistic sigmoid: return probability */")
-            lines.append("    return 1.0f / (1.0f + expf(-s));")
+            lines.append(f"    return {self._sigmoid('s')};")
         else:
             lines.append("    return s;")
 
         lines.append("}")
-        return "\n".join(lines)
+        return lines
 
-    def _emit_multiclass(self, func_name: str, coef: np.ndarray, intercept: np.ndarray) -> str:
+    def _emit_multiclass(self, func_name: str, coef: np.ndarray, intercept: np.ndarray,
+                         fold_scaler: bool = False, scores_fn: bool = False, matrix: bool = False) -> List[Part]:
+        """``matrix``: store the weights as one row-major ``W_MATRIX`` (shared with the batch entry point)."""
         C, F = coef.shape
         has_scaler = self.scaler is not None
+        folded = has_scaler and fold_scaler
+        if folded:
+            coef, intercept = self._folded_params(coef, intercept)
+            has_scaler = False
+
         lines = []
         lines.append("// Auto-generated by AutoEdgeML (multiclass logistic)")
         lines.append("#pragma once")
         lines.append("#include <math.h>")
+        lines.extend(self._weight_preamble())
         lines.append("")
+        tables = "W_MATRIX/B_VECTOR" if matrix else "W_c/B_c"
+        if folded:
+            lines.append(f"/* {type(self.scaler).__name__} folded into {tables} at export time */")
         if has_scaler:
-            if is_standard_scaler(self.scaler):
-                means = ", ".join(f"{m:.10f}f" for m in self.scaler.mean_)
-                scales = ", ".join(f"{s:.10f}f" for s in self.scaler.scale_)
-                lines.append(f"static const float SCALER_MEAN[{F}] = {{ {means} }};")
-                lines.append(f"static const float SCALER_SCALE[{F}] = {{ {scales} }};")
-            elif is_minmax_scaler(self.scaler):
-                mins = ", ".join(f"{m:.10f}f" for m in self.scaler.data_min_)
-                maxs = ", ".join(f"{M:.10f}f" for M in self.scaler.data_max_)
-                lines.append(f"static const float SCALER_MIN[{F}] = {{ {mins} }};")
-                lines.append(f"static const float SCALER_MAX[{F}] = {{ {maxs} }};")
-            lines.append("")
+            lines.extend(self._scaler_tables())
 
-        for c in range(C):
-            w = ", ".join(f"{v:.10f}f" for v in coef[c])
-            lines.append(f"static const float W_{c}[{F}] = {{ {w} }};")
-            lines.append(f"static const float B_{c} = {float(intercept[c]):.10f}f;")
+        if matrix:
+            lines.append(f"/* weights as one row-major [{C}][{F}] matrix */")
+            lines.append(self._weight_table("W_MATRIX", coef))
+            lines.append(f"static const float B_VECTOR[{C}] = {{ {_c_floats(intercept)} }};")
+        else:
+            for c in range(C):
+                lines.append(self._weight_table(f"W_{c}", coef[c]))
+                lines.append(f"static const float B_{c} = {float(intercept[c]):.10f}f;")
         lines.append("")
 
-        lines.append(f"static inline int {func_name}(const float *x, int n_features) {{")
+        body = []
         if has_scaler:
-            lines.append(f"    float x_scaled[{F}];")
-            lines.append("    for (int i = 0; i < n_features; ++i) {")
-            if is_standard_scaler(self.scaler):
-                lines.append("        x_scaled[i] = (x[i] - SCALER_MEAN[i]) / SCALER_SCALE[i];")
-            else:
-                lines.append("        if (SCALER_MAX[i] - SCALER_MIN[i] == 0.0f) x_scaled[i] = 0.0f; else")
-                lines.append("        x_scaled[i] = (x[i] - SCALER_MIN[i]) / (SCALER_MAX[i] - SCALER_MIN[i]);")
-            lines.append("    }")
+            body.append(f"    float x_scaled[{F}];")
+            body.append("    for (int i = 0; i < n_features; ++i) {")
+            body.append(f"        x_scaled[i] = {self._scaled('x[i]')};")
+            body.append("    }")
             xref = "x_scaled"
         else:
             xref = "x"
+        score_lines = []
+        if matrix:
+            score_lines.append(f"    for (int c = 0; c < {C}; ++c) {{")
+            score_lines.append(f"        const {self._weight_ctype()} *w = W_MATRIX + c * {F};")
+            score_lines.append("        scores[c] = B_VECTOR[c];")
+            score_lines.append(f"        for (int i = 0; i < n_features; ++i) scores[c] += {self._weight_at('w[i]')} * {xref}[i];")
+            score_lines.append("    }")
+        else:
+            for c in range(C):
+                score_lines.append(f"    scores[{c}] = B_{c};")
+                score_lines.append(f"    for (int i = 0; i < n_features; ++i) scores[{c}] += {self._weight_at(f'W_{c}[i]')} * {xref}[i];")
+
+        if scores_fn:
+            lines.append(f"static inline void {func_name}_scores(const float *x, int n_features, float *scores) {{")
+            lines.extend(body + score_lines)
+            lines.append("}")
+            lines.append("")
 
+        lines.append(f"static inline int {func_name}(const float *x, int n_features) {{")
+        lines.extend(body)
         lines.append(f"    float scores[{C}];")
-        for c in range(C):
-            lines.append(f"    scores[{c}] = B_{c};")
-            lines.append(f"    for (int i = 0; i < n_features; ++i) scores[{c}] += W_{c}[i] * {xref}[i];")
+        lines.extend(score_lines)
 
         lines.append("    /* argmax */")
         lines.append("    int best = 0;")
@@ -136,4 +433,280 @@ class LinearConverter(BaseConverter):
         lines.append(f"    for (int k = 1; k < {C}; ++k) {{ if (scores[k] > best_s) {{ best_s = scores[k]; best = k; }} }}")
         lines.append("    return best;")
         lines.append("}")
-        return "\n".join(lines)
+        return lines
+
+    def _emit_sparse(self, func_name: str, coef: np.ndarray, intercept: np.ndarray, fold_scaler: bool,
+                     batch: bool, scores_fn: bool = False) -> List[Part]:
+        multiclass = coef.ndim == 2
+        has_scaler = self.scaler is not None
+        folded = has_scaler and fold_scaler
+        if folded:
+            coef, intercept = self._folded_params(coef, intercept)
+            has_scaler = False
+        sp = SparseLinear.from_dense(coef, np.atleast_1d(intercept), folded=folded or self.scaler is None)
+        self.sparse = sp
+        C, F, nnz = sp.n_classes, sp.n_features, sp.nnz
+        idx_t, _ = smallest_int_type(0, max(F - 1, 0))
+        logistic = instance_of(self.model, "sklearn.linear_model", "LogisticRegression")
+        logger.info("Sparse linear export: %d of %d weights nonzero (density %.3f)", nnz, C * F, sp.density)
+
+        lines = []
+        lines.append("// Auto-generated by AutoEdgeML (linear, sparse weights)")
+        lines.append("#pragma once")
+        lines.append("#include <math.h>")
+        lines.append("#include <stdint.h>")
+        lines.extend(self._weight_preamble()[1:])
+        lines.append("")
+        if folded:
+            lines.append(f"/* {type(self.scaler).__name__} folded into the weights and bias at export time */")
+        if has_scaler:
+            lines.extend(self._scaler_tables())
+
+        if multiclass:
+            ptr_t, _ = smallest_int_type(0, nnz)
+            lines.append(f"/* CSR: {nnz} of {C}x{F} weights nonzero; class c uses W_VALUE[W_ROW_PTR[c] .. W_ROW_PTR[c+1]) */")
+            lines.append(CTable(ptr_t, "W_ROW_PTR", sp.row_ptr, INT_FMT))
+            lines.append(CTable(idx_t, "W_COL_INDEX", sp.col_index, INT_FMT))
+            lines.append(self._weight_table("W_VALUE", sp.values))
+            lines.append(CTable("float", "B_VECTOR", sp.bias))
+        else:
+            lines.append(f"/* {nnz} of {F} weights nonzero: WEIGHT_VALUE[k] multiplies x[WEIGHT_INDEX[k]] */")
+            lines.append(CTable(idx_t, "WEIGHT_INDEX", sp.col_index, INT_FMT))
+            lines.append(self._weight_table("WEIGHT_VALUE", sp.values))
+            lines.append(f"static const float BIAS = {float(sp.bias[0]):.10f}f;")
+        lines.append("")
+
+        x_expr = self._scaled("x[i]") if has_scaler else "x[i]"
+
+        if multiclass:
+            class_score = ["        float s = B_VECTOR[c];",
+                           "        for (int k = W_ROW_PTR[c]; k < W_ROW_PTR[c + 1]; ++k) {",
+                           "            int i = W_COL_INDEX[k];",
+                           f"            float xi = {x_expr};",
+                           f"            s += {self._weight_at('W_VALUE[k]')} * xi;",
+                           "        }"]
+            if scores_fn:
+                lines.append(f"static inline void {func_name}_scores(const float *x, int n_features, float *scores) {{")
+                lines.append("    (void)n_features;")
+                lines.append(f"    for (int c = 0; c < {C}; ++c) {{")
+                lines.extend(class_score)
+                lines.append("        scores[c] = s;")
+                lines.append("    }")
+                lines.append("}")
+                lines.append("")
+            lines.append(f"static inline int {func_name}(const float *x, int n_features) {{")
+            lines.append("    (void)n_features;")
+            lines.append("    int best = 0;")
+            lines.append("    float best_s = 0.0f;")
+            lines.append(f"    for (int c = 0; c < {C}; ++c) {{")
+            lines.extend(class_score)
+            lines.append("        if (c == 0 || s > best_s) { best_s = s; best = c; }")
+            lines.append("    }")
+            lines.append("    return best;")
+            lines.append("}")
+        else:
+            lines.append(f"static inline float {func_name}(const float *x, int n_features) {{")
+            lines.append("    (void)n_features;")
+            lines.append("    float s = BIAS;")
+            lines.append(f"    for (int k = 0; k < {nnz}; ++k) {{")
+            lines.append("        int i = WEIGHT_INDEX[k];")
+            lines.append(f"        float xi = {x_expr};")
+            lines.append(f"        s += {self._weight_at('WEIGHT_VALUE[k]')} * xi;")
+            lines.append("    }")
+            if logistic:
+                lines.append("    /* logistic sigmoid: return probability */")
+                lines.append(f"    return {self._sigmoid('s')};")
+            else:
+                lines.append("    return s;")
+            lines.append("}")
+
+        if batch:
+            out_type = "int" if multiclass else "float"
+            lines.append("")
+            lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, {out_type} *out) {{")
+            lines.append("    for (int r = 0; r < n_rows; ++r) {")
+            lines.append(f"        out[r] = {func_name}(X + r * {F}, {F});")
+            lines.append("    }")
+            lines.append("}")
+        return lines
+
+    def _emit_batch_regression_or_binary(self, func_name: str, coef: np.ndarray, intercept: np.ndarray,
+                                         reuse_weights: bool = False) -> List[Part]:
+        """``reuse_weights``: WEIGHTS/BIAS are already scaler-free, don't emit a folded copy."""
+        n_features = coef.shape[0]
+        if self._fold_skipped:
+            return ["/* batch entry point: scaler kept at run time for precision */",
+                    f"static inline void {func_name}_batch(const float *X, int n_rows, float *out) {{",
+                    "    for (int r = 0; r < n_rows; ++r) {",
+                    f"        out[r] = {func_name}(X + r * {n_features}, {n_features});",
+                    "    }",
+                    "}"]
+
+        lines = []
+        if reuse_weights:
+            w_name, b_name = "WEIGHTS", "BIAS"
+            lines.append("/* batch entry point */")
+        else:
+            w, b = self._folded_params(coef, intercept)
+            w_name, b_name = "WEIGHTS_FOLDED", "BIAS_FOLDED"
+            lines.append("/* batch entry point: scaler folded into weights at export time */")
+            lines.append(self._weight_table("WEIGHTS_FOLDED", w))
+            lines.append(f"static const float BIAS_FOLDED = {float(np.ravel(b)[0]):.10f}f;")
+            lines.append("")
+        lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, float *out) {{")
+        lines.append("    for (int r = 0; r < n_rows; ++r) {")
+        lines.append(f"        const float *x = X + r * {n_features};")
+        lines.append(f"        float s = {b_name};")
+        lines.append(f"        for (int i = 0; i < {n_features}; ++i) {{")
+        lines.append(f"            s += {self._weight_at(w_name + '[i]')} * x[i];")
+        lines.append("        }")
+        if instance_of(self.model, "sklearn.linear_model", "LogisticRegression"):
+            lines.append(f"        out[r] = {self._sigmoid('s')};")
+        else:
+            lines.append("        out[r] = s;")
+        lines.append("    }")
+        lines.append("}")
+        return lines
+
+    def _emit_batch_multiclass(self, func_name: str, coef: np.ndarray, intercept: np.ndarray,
+                               reuse_weights: bool = False) -> List[Part]:
+        """``reuse_weights``: the single-row ``W_MATRIX``/``B_VECTOR`` are already scaler-free, score them
+        directly instead of emitting a folded copy."""
+        C, F = coef.shape
+        if self._fold_skipped:
+            return ["/* batch entry point: scaler kept at run time for precision */",
+                    f"static inline void {func_name}_batch(const float *X, int n_rows, int *out) {{",
+                    "    for (int r = 0; r < n_rows; ++r) {",
+                    f"        out[r] = {func_name}(X + r * {F}, {F});",
+                    "    }",
+                    "}"]
+
+        lines = []
+        if reuse_weights:
+            lines.append("/* batch entry point: the same row-major W_MATRIX as the single-row function */")
+        else:
+            W, b = self._folded_params(coef, intercept)
+            lines.append("/* batch entry point: scaler folded in, weights as one row-major [C][F] matrix */")
+            lines.append(self._weight_table("W_MATRIX", W))
+            lines.append(f"static const float B_VECTOR[{C}] = {{ {_c_floats(b)} }};")
+            lines.append("")
+        lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, int *out) {{")
+        lines.append("    for (int r = 0; r < n_rows; ++r) {")
+        lines.append(f"        const float *x = X + r * {F};")
+        lines.append("        int best = 0;")
+        lines.append("        float best_s = 0.0f;")
+        lines.append(f"        for (int c = 0; c < {C}; ++c) {{")
+        lines.append(f"            const {self._weight_ctype()} *w = W_MATRIX + c * {F};")
+        lines.append("            float s = B_VECTOR[c];")
+        lines.append(f"            for (int i = 0; i < {F}; ++i) {{")
+        lines.append(f"                s += {self._weight_at('w[i]')} * x[i];")
+        lines.append("            }")
+        lines.append("            if (c == 0 || s > best_s) { best_s = s; best = c; }")
+        lines.append("        }")
+        lines.append("        out[r] = best;")
+        lines.append("    }")
+        lines.append("}")
+        return lines
+
+    def _emit_quantized(self, func_name: str, coef: np.ndarray, intercept: np.ndarray, dtype: str,
+                        granularity: str, calibration_data: Optional[np.ndarray], batch: bool) -> List[Part]:
+        multiclass = coef.ndim == 2
+        W, b = self._folded_params(np.atleast_2d(coef), np.atleast_1d(intercept))
+        q = calibrate_linear(W, b, calibration_data, dtype=dtype, granularity=granularity)
+        self.quantized = q
+        C, F = q.n_classes, q.n_features
+        ctype, _ = WEIGHT_TYPES[dtype]
+
+        lines = []
+        lines.append(f"// Auto-generated by AutoEdgeML (linear, {dtype} quantized, per-{granularity} scale)")
+        lines.append("#pragma once")
+        lines.append("#include <math.h>")
+        lines.append("#include <stdint.h>")
+        lines.append("")
+        lines.append(f"/* xq[i] = clamp(floor(x[i] * INPUT_INV_SCALE[i] + 0.5) + INPUT_ZERO_POINT[i], {INPUT_QMIN}, {INPUT_QMAX});")
+        lines.append(f"   the rounded value is first clamped to +-{INPUT_CLAMP:.0f} so out-of-range input saturates */")
+        lines.append(CTable("float", "INPUT_INV_SCALE", 1.0 / q.input_scale))
+        lines.append(CTable("int32_t", "INPUT_ZERO_POINT", q.input_zero_point.astype(np.int64), INT_FMT))
+        lines.append("")
+
+        if multiclass:
+            lines.append(CTable(ctype, "W_Q", q.weights_q.astype(np.int64), INT_FMT))
+            lines.append(f"static const int32_t B_Q[{C}] = {{ {_c_ints(q.bias_q)} }};")
+            scales = ", ".join(f"{float(v):.10e}f" for v in q.weight_scale)
+            lines.append(f"static const float W_SCALE[{C}] = {{ {scales} }};")
+            if granularity == "class":
+                lines.append(f"/* Q{REQUANT_SHIFT} rescale of each class accumulator to the largest W_SCALE */")
+                lines.append(f"static const int32_t REQUANT_MULT[{C}] = {{ {_c_ints(q.requant_multiplier)} }};")
+        else:
+            lines.append(CTable(ctype, "WEIGHTS_Q", q.weights_q.astype(np.int64), INT_FMT))
+            lines.append(f"static const int32_t BIAS_Q = {int(q.bias_q[0])};")
+            lines.append(f"static const float OUTPUT_SCALE = {float(q.weight_scale[0]):.10e}f;")
+        lines.append("")
+
+        lines.append(f"static inline void {func_name}_quantize_input(const float *x, int8_t *xq) {{")
+        lines.append(f"    for (int i = 0; i < {F}; ++i) {{")
+        lines.append("        float f = floorf(x[i] * INPUT_INV_SCALE[i] + 0.5f);")
+        bound = f"{INPUT_CLAMP:.1f}f"
+        lines.append(f"        f = f > {bound} ? {bound} : (f > -{bound} ? f : -{bound});")
+        lines.append("        int64_t v = (int64_t)f + INPUT_ZERO_POINT[i];")
+        lines.append(f"        xq[i] = (int8_t)(v < {INPUT_QMIN} ? {INPUT_QMIN} : (v > {INPUT_QMAX} ? {INPUT_QMAX} : v));")
+        lines.append("    }")
+        lines.append("}")
+        lines.append("")
+
+        if multiclass:
+            lines.append("/* integer-only inference: returns the class index */")
+            lines.append(f"static inline int {func_name}_q(const int8_t *xq) {{")
+            lines.append("    int best = 0;")
+            lines.append("    int64_t best_s = 0;")
+            lines.append(f"    for (int c = 0; c < {C}; ++c) {{")
+            lines.append(f"        const {ctype} *w = W_Q + c * {F};")
+            lines.append("        int32_t acc = B_Q[c];")
+            lines.append(f"        for (int i = 0; i < {F}; ++i) {{")
+            lines.append("            acc += (int32_t)w[i] * (int32_t)xq[i];")
+            lines.append("        }")
+            if granularity == "class":
+                lines.append(f"        int64_t s = ((int64_t)acc * REQUANT_MULT[c]) >> {REQUANT_SHIFT};")
+            else:
+                lines.append("        int64_t s = acc;")
+            lines.append("        if (c == 0 || s > best_s) { best_s = s; best = c; }")
+            lines.append("    }")
+            lines.append("    return best;")
+            lines.append("}")
+            lines.append("")
+            lines.append(f"static inline int {func_name}(const float *x, int n_features) {{")
+            lines.append(f"    int8_t xq[{F}];")
+            lines.append("    (void)n_features;")
+            lines.append(f"    {func_name}_quantize_input(x, xq);")
+            lines.append(f"    return {func_name}_q(xq);")
+            lines.append("}")
+        else:
+            lines.append("/* integer-only inference: raw int32 score, output = OUTPUT_SCALE * acc (sign gives the binary label) */")
+            lines.append(f"static inline int32_t {func_name}_q(const int8_t *xq) {{")
+            lines.append("    int32_t acc = BIAS_Q;")
+            lines.append(f"    for (int i = 0; i < {F}; ++i) {{")
+            lines.append("        acc += (int32_t)WEIGHTS_Q[i] * (int32_t)xq[i];")
+            lines.append("    }")
+            lines.append("    return acc;")
+            lines.append("}")
+            lines.append("")
+            lines.append(f"static inline float {func_name}(const float *x, int n_features) {{")
+            lines.append(f"    int8_t xq[{F}];")
+            lines.append("    (void)n_features;")
+            lines.append(f"    {func_name}_quantize_input(x, xq);")
+            lines.append(f"    float s = OUTPUT_SCALE * (float){func_name}_q(xq);")
+            if instance_of(self.model, "sklearn.linear_model", "LogisticRegression"):
+                lines.append(f"    return {self._sigmoid('s')};")
+            else:
+                lines.append("    return s;")
+            lines.append("}")
+
+        if batch:
+            out_type = "int" if multiclass else "float"
+            lines.append("")
+            lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, {out_type} *out) {{")
+            lines.append("    for (int r = 0; r < n_rows; ++r) {")
+            lines.append(f"        out[r] = {func_name}(X + r * {F}, {F});")
+            lines.append("    }")
+            lines.append("}")
+        return lines
@@ -0,0 +1,283 @@
+import numpy as np
+from typing import IO, Any, List, Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from .base import BaseConverter
+from .cformat import CTable, Part, render, write_parts, CHUNK_VALUES
+from .approx import approx_exp, check_exp_impl, exp_call, insert_exp_helper
+from .scaling import scaler_affine
+from src.utils import instance_of
+
+logger = CustomLogger().get_logger(__name__)
+
+MLP_MODELS = ("MLPClassifier", "MLPRegressor")
+ACTIVATIONS = ("identity", "relu", "tanh", "logistic")
+
+
+def is_mlp_model(model: Any) -> bool:
+    return instance_of(model, "sklearn.neural_network", *MLP_MODELS)
+
+
+def _dense(W: np.ndarray, b: np.ndarray, A: np.ndarray) -> np.ndarray:
+    # float32, accumulated input by input in the same order as the C loop
+    s = np.repeat(b[None, :], A.shape[0], axis=0)
+    for i in range(W.shape[1]):
+        s += A[:, i:i + 1] * W[:, i]
+    return s
+
+
+class DenseNetwork:
+    """The float32 layers of an exported MLP, re-executed the way the C code runs them.
+
+    ``weights[l]`` is row-major ``[n_out][n_in]`` (one contiguous row per
+    neuron) with any scaler folded into layer 0. ``activation`` applies to
+    every hidden layer; ``output`` is ``"identity"`` (regression value),
+    ``"exp"`` (Poisson regression value), ``"logistic"`` (binary probability)
+    or ``"softmax"`` (class index).
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activation: str, output: str,
+                 exp_impl: str = "libm"):
+        self.weights = weights
+        self.biases = biases
+        self.activation = activation
+        self.output = output
+        self.exp_impl = exp_impl
+
+    @property
+    def n_features(self) -> int:
+        return int(self.weights[0].shape[1])
+
+    @property
+    def widths(self) -> List[int]:
+        return [int(W.shape[0]) for W in self.weights]
+
+    @property
+    def buffer_width(self) -> int:
+        return max(self.widths)
+
+    def _activate(self, s: np.ndarray) -> np.ndarray:
+        if self.activation == "relu":
+            return np.maximum(s, np.float32(0.0))
+        if self.activation == "tanh":
+            return np.tanh(s)
+        if self.activation == "logistic":
+            return np.float32(1.0) / (np.float32(1.0) + approx_exp(self.exp_impl, -s))
+        return s
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        """Output-layer pre-activations, shape (n_samples, n_outputs)."""
+        A = np.asarray(X, dtype=np.float32)
+        for l, (W, b) in enumerate(zip(self.weights, self.biases)):
+            A = _dense(W, b, A)
+            if l < len(self.weights) - 1:
+                A = self._activate(A)
+        return A
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        s = self.scores(X)
+        if self.output == "logistic":
+            p = np.float32(1.0) / (np.float32(1.0) + approx_exp(self.exp_impl, -s[:, 0]))
+            return np.column_stack([np.float32(1.0) - p, p])
+        e = approx_exp(self.exp_impl, s - s.max(axis=1, keepdims=True))
+        return e * (np.float32(1.0) / e.sum(axis=1, keepdims=True, dtype=np.float32))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Regression value, or class index like the C entry point's label."""
+        s = self.scores(X)
+        if self.output == "identity":
+            return s[:, 0]
+        if self.output == "exp":
+            return approx_exp(self.exp_impl, s[:, 0])
+        if self.output == "logistic":
+            return (s[:, 0] > 0).astype(int)
+        return np.argmax(s, axis=1)
+
+
+class MLPConverter(BaseConverter):
+    def __init__(self, model_path: str = None):
+        super().__init__(model_path)
+        self.net: Optional[DenseNetwork] = None
+
+    def convert_to_c(self, func_name: str = "predict_model", **options) -> str:
+        """Emit a self-contained C header for the loaded network (see ``emit_parts`` for options)."""
+        return render(self.emit_parts(func_name, **options))
+
+    def write_c(self, f: IO[str], func_name: str = "predict_model", chunk_size: int = CHUNK_VALUES,
+                **options) -> int:
+        """Stream the header to the open text file ``f``; same bytes as ``convert_to_c``."""
+        return write_parts(self.emit_parts(func_name, **options), f, chunk_size)
+
+    def emit_parts(self, func_name: str = "predict_model", batch: bool = False, fold_scaler: bool = True,
+                   proba: bool = False, exp_impl: str = "libm") -> List[Part]:
+        """Layer tables plus one fused matvec+activation kernel per activation used.
+
+        ``L<l>_WEIGHTS`` is row-major ``[n_out][n_in]`` and ``L<l>_BIAS`` has
+        ``n_out`` entries. Each layer's dot products and activation run in one
+        loop over its neurons. Layers alternate between two static ping-pong
+        buffers sized to the widest layer, so RAM does not grow with depth
+        (the entry points are not reentrant). A StandardScaler/MinMaxScaler
+        is always folded into layer 0 (``fold_scaler=False`` is rejected).
+
+        Regressors return the value (``expf`` of the output for
+        ``loss="poisson"``), binary classifiers the probability of
+        class 1, and multiclass classifiers the argmax class index.
+        ``proba=True`` adds ``<func_name>_proba(x, n_features, float *proba)``
+        with softmax probabilities (multiclass). ``exp_impl`` picks the
+        ``expf`` behind logistic/softmax as for linear models.
+        """
+        if self.model is None:
+            raise CustomException("Converter has no loaded estimator; call load() first", None)
+        if not fold_scaler and self.scaler is not None:
+            raise CustomException("MLP converter always folds the scaler into the first layer", None)
+        check_exp_impl(exp_impl)
+
+        self.net = net = self.network(exp_impl)
+        if proba and net.output != "softmax":
+            if net.output in ("identity", "exp"):
+                raise CustomException("proba needs a classifier", None)
+            logger.info("Binary MLP entry point already returns the probability; proba adds nothing")
+            proba = False
+
+        parts = self._emit(func_name, net, batch, proba)
+        return insert_exp_helper(parts, exp_impl)
+
+    def op_counts(self) -> dict:
+        """Per-inference work: one MAC per weight, one activation per hidden neuron."""
+        coefs = self.model.coefs_
+        return {"macs": int(sum(np.asarray(W).size for W in coefs)),
+                "activations": int(sum(np.asarray(W).shape[1] for W in coefs[:-1]))}
+
+    # network
+    def network(self, exp_impl: str = "libm") -> DenseNetwork:
+        m = self.model
+        if m.activation not in ACTIVATIONS:
+            raise CustomException(f"Unsupported MLP activation '{m.activation}'", None)
+        if m.out_activation_ in ("identity", "exp"):
+            if m.n_outputs_ != 1:
+                raise CustomException("Multi-output MLP regressors are not supported", None)
+        elif m.out_activation_ == "logistic":
+            if m.n_outputs_ != 1:
+                raise CustomException("Multi-label MLP classifiers are not supported", None)
+        elif m.out_activation_ != "softmax":
+            raise CustomException(f"Unsupported MLP output activation '{m.out_activation_}'", None)
+
+        weights = [np.asarray(W, dtype=np.float64).T for W in m.coefs_]
+        biases = [np.asarray(b, dtype=np.float64) for b in m.intercepts_]
+        weights[0], biases[0] = self._folded_first_layer(weights[0], biases[0])
+        logger.info("MLPConverter.network(): %s layers %s, %s hidden activation", type(m).__name__,
+                    "-".join(str(n) for n in [weights[0].shape[1]] + [W.shape[0] for W in weights]), m.activation)
+        return DenseNetwork([W.astype(np.float32) for W in weights], [b.astype(np.float32) for b in biases],
+                            m.activation, m.out_activation_, exp_impl)
+
+    def _folded_first_layer(self, W: np.ndarray, b: np.ndarray):
+        """Fold the affine scaler into layer 0: W.(a*x + c) + b == (W*a).x + (W.c + b)."""
+        if self.scaler is None:
+            return W, b
+        a, c = scaler_affine(self.scaler, W.shape[1])
+        return W * a, W.dot(c) + b
+
+    # emission
+    def _kernel(self, func_name: str, activation: str, exp_impl: str) -> List[str]:
+        if activation == "relu":
+            result = "s > 0.0f ? s : 0.0f"
+        elif activation == "tanh":
+            result = "tanhf(s)"
+        elif activation == "logistic":
+            result = f"1.0f / (1.0f + {exp_call(exp_impl, '-s')})"
+        else:
+            result = "s"
+        return [f"static inline void {func_name}_dense_{activation}(const float *W, const float *B, "
+                f"const float *in, int n_in, float *out, int n_out) {{",
+                "    for (int o = 0; o < n_out; ++o) {",
+                "        const float *w = W + o * n_in;",
+                "        float s = B[o];",
+                "        for (int i = 0; i < n_in; ++i) s += w[i] * in[i];",
+                f"        out[o] = {result};",
+                "    }",
+                "}"]
+
+    def _emit(self, func_name: str, net: DenseNetwork, batch: bool, proba: bool) -> List[Part]:
+        n_layers = len(net.weights)
+        F, W, C = net.n_features, net.buffer_width, net.widths[-1]
+        bufs = (f"{func_name}_act_a", f"{func_name}_act_b")
+
+        lines: List[Part] = []
+        lines.append(f"// Auto-generated by AutoEdgeML (MLP: {type(self.model).__name__}, layers "
+                     f"{'-'.join(str(n) for n in [F] + net.widths)}, {net.activation} hidden activation)")
+        lines.append("#pragma once")
+        lines.append("#include <math.h>")
+        lines.append("")
+        if self.scaler is not None:
+            lines.append(f"/* {type(self.scaler).__name__} folded into the first layer at export time */")
+        lines.append("/* L<l>_WEIGHTS: row-major [n_out][n_in], one contiguous row per neuron */")
+        for l, (Wl, bl) in enumerate(zip(net.weights, net.biases)):
+            lines.append(CTable("float", f"L{l}_WEIGHTS", Wl))
+            lines.append(CTable("float", f"L{l}_BIAS", bl))
+        lines.append("")
+        lines.append(f"/* ping-pong activation buffers sized to the widest layer ({W}); not reentrant */")
+        lines.append(f"static float {bufs[0]}[{W}];")
+        lines.append(f"static float {bufs[1]}[{W}];")
+        lines.append("")
+
+        lines.append("/* fused dense layer: out[o] = act(B[o] + W[o][:] . in) */")
+        for activation in dict.fromkeys([net.activation] * (n_layers - 1) + ["identity"]):
+            lines.extend(self._kernel(func_name, activation, net.exp_impl))
+            lines.append("")
+
+        lines.append(f"static inline const float *{func_name}_forward(const float *x) {{")
+        src = "x"
+        for l in range(n_layers):
+            activation = net.activation if l < n_layers - 1 else "identity"
+            n_in = F if l == 0 else net.widths[l - 1]
+            lines.append(f"    {func_name}_dense_{activation}(L{l}_WEIGHTS, L{l}_BIAS, {src}, {n_in}, "
+                         f"{bufs[l % 2]}, {net.widths[l]});")
+            src = bufs[l % 2]
+        lines.append(f"    return {src};")
+        lines.append("}")
+        lines.append("")
+
+        ret = "int" if net.output == "softmax" else "float"
+        lines.append(f"static inline {ret} {func_name}(const float *x, int n_features) {{")
+        lines.append("    (void)n_features;")
+        lines.append(f"    const float *s = {func_name}_forward(x);")
+        if net.output == "identity":
+            lines.append("    return s[0];")
+        elif net.output == "exp":
+            lines.append(f"    return {exp_call(net.exp_impl, 's[0]')};")
+        elif net.output == "logistic":
+            lines.append("    /* logistic output: return probability */")
+            lines.append(f"    return 1.0f / (1.0f + {exp_call(net.exp_impl, '-s[0]')});")
+        else:
+            lines.append("    int best = 0;")
+            lines.append(f"    for (int k = 1; k < {C}; ++k) {{ if (s[k] > s[best]) best = k; }}")
+            lines.append("    return best;")
+        lines.append("}")
+
+        if proba:
+            lines.append("")
+            lines.append(f"/* softmax over the output layer ({net.exp_impl} expf); returns the argmax label */")
+            lines.append(f"static inline int {func_name}_proba(const float *x, int n_features, float *proba) {{")
+            lines.append("    (void)n_features;")
+            lines.append(f"    const float *s = {func_name}_forward(x);")
+            lines.append("    int best = 0;")
+            lines.append(f"    for (int k = 1; k < {C}; ++k) {{ if (s[k] > s[best]) best = k; }}")
+            lines.append("    float m = s[best];")
+            lines.append("    float sum = 0.0f;")
+            lines.append(f"    for (int k = 0; k < {C}; ++k) {{")
+            lines.append(f"        proba[k] = {exp_call(net.exp_impl, 's[k] - m')};")
+            lines.append("        sum += proba[k];")
+            lines.append("    }")
+            lines.append("    float inv = 1.0f / sum;")
+            lines.append(f"    for (int k = 0; k < {C}; ++k) proba[k] *= inv;")
+            lines.append("    return best;")
+            lines.append("}")
+
+        if batch:
+            lines.append("")
+            lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, {ret} *out) {{")
+            lines.append("    for (int r = 0; r < n_rows; ++r) {")
+            lines.append(f"        out[r] = {func_name}(X + r * {F}, {F});")
+            lines.append("    }")
+            lines.append("}")
+        return lines
@@ -0,0 +1,344 @@
+import re
+import numpy as np
+from typing import IO, Any, Dict, List, Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from .base import BaseConverter
+from .linear import LinearConverter
+from .cformat import CTable, Part, render, write_parts, CHUNK_VALUES
+from .approx import check_exp_impl, exp_call, insert_exp_helper
+from .preprocess import PreprocessProgram, compile_preprocessing, is_preprocess_chain
+from src.utils import instance_of
+
+logger = CustomLogger().get_logger(__name__)
+
+# entry points of the estimator's header that get a raw-input wrapper
+_WRAPPED_SUFFIXES = ("", "_proba", "_topk")
+
+
+class CompiledPreprocessing:
+    """A pipeline's preprocessing steps together with their compiled ``PreprocessProgram``.
+
+    Stands in for the scaler wherever validators expect one: ``transform``
+    is sklearn's (densified), ``sample_inputs`` draws raw rows the chain
+    accepts (e.g. known categories for one-hot columns).
+    """
+
+    def __init__(self, pipeline: Any, program: PreprocessProgram):
+        self.pipeline = pipeline
+        self.program = program
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        Z = self.pipeline.transform(X)
+        return Z.toarray() if hasattr(Z, "toarray") else np.asarray(Z, dtype=np.float64)
+
+    def sample_inputs(self, n_samples: int, seed: int = 0) -> np.ndarray:
+        return self.program.sample_inputs(n_samples, seed)
+
+
+class QuadraticForm:
+    """A linear model over monomials of degree <= 2, evaluated without the expanded features.
+
+    With ``v`` the ``n`` values feeding the last preprocessing stage (the
+    output of ``prefix``), class ``k`` scores
+    ``B[k] + sum_i v[i] * (L[k][i] + sum_{j>=i} Q[k][i][j] * v[j])``.
+    ``quad`` holds the upper triangles row-packed, ``None`` when the last
+    stage is affine.
+    """
+
+    def __init__(self, quad: Optional[np.ndarray], lin: np.ndarray, bias: np.ndarray, prefix: PreprocessProgram):
+        self.quad = None if quad is None else np.asarray(quad, dtype=np.float32)
+        self.lin = np.asarray(lin, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.prefix = prefix
+
+    @property
+    def n_values(self) -> int:
+        return int(self.lin.shape[1])
+
+    @property
+    def n_outputs(self) -> int:
+        return int(self.lin.shape[0])
+
+    def op_count(self) -> int:
+        n = self.n_values
+        return self.n_outputs * (n + (n * (n + 1) // 2 if self.quad is not None else 0))
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        """float32 scores of raw rows ``X``, accumulated in the C loop order."""
+        V = self.prefix.transform(X)
+        out = np.empty((V.shape[0], self.n_outputs), dtype=np.float32)
+        for k in range(self.n_outputs):
+            s = np.full(V.shape[0], self.bias[k], dtype=np.float32)
+            q = 0
+            for i in range(self.n_values):
+                t = np.full(V.shape[0], self.lin[k, i], dtype=np.float32)
+                if self.quad is not None:
+                    for j in range(i, self.n_values):
+                        t += self.quad[k, q] * V[:, j]
+                        q += 1
+                s += t * V[:, i]
+            out[:, k] = s
+        return out
+
+
+def fold_quadratic(stage: List[Any], coef: np.ndarray, intercept: np.ndarray, n: int):
+    """``(quad, lin, bias)`` of ``coef . stage(v) + intercept`` for a stage of monomials of degree <= 2."""
+    coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+    bias = np.asarray(intercept, dtype=np.float64).ravel()[:coef.shape[0]].copy()
+    lin = np.zeros((coef.shape[0], n))
+    quad = np.zeros((coef.shape[0], n * (n + 1) // 2))
+    for j, col in enumerate(stage):
+        w = coef[:, j]
+        bias += w * col.c
+        if not col.src:
+            bias += w * col.a
+        elif len(col.src) == 1:
+            lin[:, col.src[0]] += w * col.a
+        else:
+            i, i2 = sorted(col.src)
+            # row i of the packed upper triangle starts after rows 0..i-1 (n, n-1, ... entries)
+            quad[:, i * n - i * (i - 1) // 2 + (i2 - i)] += w * col.a
+    has_quad = any(len(col.src) == 2 for col in stage)
+    return (quad if has_quad else None), lin, bias
+
+
+class PipelineConverter(BaseConverter):
+    """Pipelines with preprocessing beyond one StandardScaler/MinMaxScaler.
+
+    The preprocessing steps are lowered by ``preprocess.py`` into one fused
+    per-row routine, ``<func_name>_preprocess``; the estimator is converted
+    by its own converter (``self.inner``) as ``<func_name>_features`` on the
+    preprocessed values, and ``<func_name>`` wraps the two. ``self.scaler``
+    is a ``CompiledPreprocessing``.
+    """
+
+    def __init__(self, model_path: str = None):
+        super().__init__(model_path)
+        self.inner: Optional[BaseConverter] = None
+        self.program: Optional[PreprocessProgram] = None
+        self.quadratic: Optional[QuadraticForm] = None
+
+    def load(self, model_obj: Optional[Any] = None, timer: Optional[Any] = None,
+             mmap_mode: Optional[str] = None) -> None:
+        super().load(model_obj, timer=timer, mmap_mode=mmap_mode)
+        self.compile()
+
+    def compile(self) -> None:
+        """Compile ``self.scaler`` (the preprocessing ``Pipeline``) and build the estimator's converter."""
+        from .factory import converter_class_for
+
+        chain = self.scaler.pipeline if isinstance(self.scaler, CompiledPreprocessing) else self.scaler
+        if not is_preprocess_chain(chain):
+            raise CustomException("PipelineConverter needs a Pipeline with preprocessing steps", None)
+        self.program = compile_preprocessing(chain, int(chain.n_features_in_))
+        self.scaler = CompiledPreprocessing(chain, self.program)
+
+        expected = getattr(self.model, "n_features_in_", None)
+        if expected is not None and int(expected) != self.program.n_outputs:
+            raise CustomException(f"Compiled preprocessing yields {self.program.n_outputs} features but "
+                                  f"{type(self.model).__name__} expects {expected}", None)
+        self.inner = converter_class_for(self.model)(self.model_path)
+        self.inner.raw_model, self.inner.model, self.inner.scaler = self.raw_model, self.model, None
+
+    @property
+    def n_inputs(self) -> int:
+        return self.program.n_inputs
+
+    def convert_to_c(self, func_name: str = "predict_model", **options) -> str:
+        """Emit a self-contained C header for the whole pipeline (see ``emit_parts`` for options)."""
+        return render(self.emit_parts(func_name, **options))
+
+    def write_c(self, f: IO[str], func_name: str = "predict_model", chunk_size: int = CHUNK_VALUES,
+                **options) -> int:
+        """Stream the header to the open text file ``f``; same bytes as ``convert_to_c``."""
+        return write_parts(self.emit_parts(func_name, **options), f, chunk_size)
+
+    def emit_parts(self, func_name: str = "predict_model", batch: bool = False, **options) -> List[Part]:
+        """Preprocessing routine plus the estimator's header, behind raw-input entry points.
+
+        ``options`` go to the estimator's converter; ``calibration_data``
+        (raw rows) is preprocessed first. ``<func_name>`` and, when the
+        estimator header has them, ``_proba``/``_topk`` take raw rows;
+        ``batch`` adds ``<func_name>_batch`` over raw rows.
+
+        A linear model after a last stage of degree <= 2 monomials (e.g.
+        ``PolynomialFeatures(degree=2)``, or only affine steps) is folded into
+        a ``QuadraticForm`` over that stage's inputs when its tables are not
+        larger than the expanded weights, so the expanded feature vector is
+        never built. Options the quadratic path has no equivalent for
+        (quantization, float16/sparse weights, proba/top_k) keep the
+        expanded path.
+        """
+        if self.inner is None:
+            raise CustomException("Converter has no loaded estimator; call load() first", None)
+        options = dict(options)
+        if options.get("calibration_data") is not None:
+            options["calibration_data"] = self.scaler.transform(options["calibration_data"])
+
+        self.quadratic = self._quadratic_form(options)
+        if self.quadratic is not None:
+            exp_impl = options.get("exp_impl", "libm")
+            check_exp_impl(exp_impl)
+            return insert_exp_helper(self._emit_quadratic(func_name, batch, exp_impl), exp_impl)
+        return self._emit_wrapped(func_name, self.inner.emit_parts(f"{func_name}_features", **options), batch)
+
+    def op_counts(self) -> dict:
+        if self.quadratic is not None:
+            return {"macs": self.quadratic.op_count(), "preprocess_ops": self.quadratic.prefix.op_count()}
+        return dict(self.inner.op_counts(), preprocess_ops=self.program.op_count())
+
+    # quadratic fusion
+    def _quadratic_form(self, options: Dict[str, Any]) -> Optional[QuadraticForm]:
+        if not isinstance(self.inner, LinearConverter) or not self.program.stages:
+            return None
+        if (options.get("quantize") or options.get("sparse") or options.get("proba") or options.get("top_k")
+                or options.get("weight_dtype", "float32") != "float32"):
+            return None
+        coef = np.asarray(self.model.coef_)
+        logistic = instance_of(self.model, "sklearn.linear_model", "LogisticRegression")
+        if coef.ndim == 2 and not logistic:
+            return None
+        last = self.program.stages[-1]
+        if not all(col.kind == "mono" and len(col.src) <= 2 for col in last):
+            return None
+        stages = self.program.stages[:-1]
+        n = len(stages[-1]) if stages else self.program.n_inputs
+        quad, lin, bias = fold_quadratic(last, coef, self.model.intercept_, n)
+        if quad is not None and quad.shape[1] > len(last):
+            logger.info("Quadratic form (%d terms) larger than the %d expanded features; keeping them",
+                        quad.shape[1], len(last))
+            return None
+        prefix = PreprocessProgram(stages, self.program.n_inputs, self.program.steps, self.program.hints)
+        logger.info("Folded %s into a quadratic form over %d values (%d expanded features not stored)",
+                    type(self.model).__name__, n, len(last))
+        return QuadraticForm(quad, lin, bias, prefix)
+
+    def _emit_quadratic(self, func_name: str, batch: bool, exp_impl: str) -> List[Part]:
+        qf = self.quadratic
+        n, K, F = qf.n_values, qf.n_outputs, self.program.n_inputs
+        multiclass = K > 1
+        lines: List[Part] = []
+        lines.append(f"// Auto-generated by AutoEdgeML (pipeline: {' -> '.join(self.program.steps)} -> "
+                     f"{type(self.model).__name__}, quadratic form)")
+        lines.append("#pragma once")
+        lines.append("#include <math.h>")
+        lines.append("#include <stdint.h>")
+        lines.append("")
+        if qf.prefix.stages:
+            lines.extend(qf.prefix.emit(func_name))
+            lines.append("")
+        lines.append(f"/* {type(self.model).__name__} folded into the last preprocessing stage: "
+                     f"{self.program.n_outputs} features are never stored */")
+        if qf.quad is not None:
+            lines.append(f"/* QUAD_Q: per output, the upper triangle of the {n}x{n} quadratic term, row-packed */")
+            lines.append(CTable("float", "QUAD_Q", qf.quad))
+        lines.append(CTable("float", "QUAD_L", qf.lin))
+        lines.append(CTable("float", "QUAD_B", qf.bias))
+        lines.append("")
+
+        if qf.quad is not None:
+            lines.append(f"static inline float {func_name}_qform(const float *Q, const float *L, float b, "
+                         f"const float *v) {{")
+            lines.append("    float s = b;")
+            lines.append("    int q = 0;")
+            lines.append(f"    for (int i = 0; i < {n}; ++i) {{")
+            lines.append("        float t = L[i];")
+            lines.append(f"        for (int j = i; j < {n}; ++j) t += Q[q++] * v[j];")
+            lines.append("        s += t * v[i];")
+            lines.append("    }")
+            lines.append("    return s;")
+            lines.append("}")
+            call = f"{func_name}_qform(QUAD_Q + {{k}} * {n * (n + 1) // 2}, QUAD_L + {{k}} * {n}, QUAD_B[{{k}}], v)"
+        else:
+            lines.append(f"static inline float {func_name}_qform(const float *L, float b, const float *v) {{")
+            lines.append("    float s = b;")
+            lines.append(f"    for (int i = 0; i < {n}; ++i) s += L[i] * v[i];")
+            lines.append("    return s;")
+            lines.append("}")
+            call = f"{func_name}_qform(QUAD_L + {{k}} * {n}, QUAD_B[{{k}}], v)"
+        lines.append("")
+
+        ret = "int" if multiclass else "float"
+        lines.append(f"static inline {ret} {func_name}(const float *x, int n_features) {{")
+        lines.append("    (void)n_features;")
+        if qf.prefix.stages:
+            lines.append(f"    float v[{n}];")
+            lines.append(f"    {func_name}_preprocess(x, v);")
+        else:
+            lines.append("    const float *v = x;")
+        if multiclass:
+            lines.append("    int best = 0;")
+            lines.append(f"    float best_s = {call.format(k=0)};")
+            lines.append(f"    for (int k = 1; k < {K}; ++k) {{")
+            lines.append(f"        float s = {call.format(k='k')};")
+            lines.append("        if (s > best_s) { best_s = s; best = k; }")
+            lines.append("    }")
+            lines.append("    return best;")
+        else:
+            lines.append(f"    float s = {call.format(k=0)};")
+            if instance_of(self.model, "sklearn.linear_model", "LogisticRegression"):
+                lines.append("    /* logistic sigmoid: return probability */")
+                lines.append(f"    return 1.0f / (1.0f + {exp_call(exp_impl, '-s')});")
+            else:
+                lines.append("    return s;")
+        lines.append("}")
+        if batch:
+            lines.append("")
+            lines.extend(self._emit_batch(func_name, ret, F))
+        return lines
+
+    # expanded path
+    def _emit_wrapped(self, func_name: str, inner_parts: List[Part], batch: bool) -> List[Part]:
+        F, M = self.program.n_inputs, self.program.n_outputs
+        lines: List[Part] = []
+        lines.append(f"// Auto-generated by AutoEdgeML (pipeline: {' -> '.join(self.program.steps)} -> "
+                     f"{type(self.model).__name__})")
+        lines.append("#pragma once")
+        lines.append("#include <stdint.h>")
+        lines.append("")
+        lines.extend(self.program.emit(func_name))
+        lines.append("")
+        lines.append(f"/* {type(self.model).__name__} on the {M} preprocessed values */")
+
+        inner = f"{func_name}_features"
+        entry = re.compile(rf"^static inline (\w+) {re.escape(inner)}({'|'.join(_WRAPPED_SUFFIXES[1:])})?"
+                           rf"\(const float \*x, int n_features(.*)\) \{{$", re.MULTILINE)
+        wrappers: List[Part] = []
+        ret = "float"
+        for part in inner_parts:
+            if isinstance(part, CTable):
+                lines.append(part)
+                continue
+            # the estimator's own boilerplate; parts may be single lines or whole blocks
+            kept = [line for line in part.split("\n") if not line.startswith(("// Auto-generated", "#pragma once"))]
+            if not kept:
+                continue
+            part = "\n".join(kept)
+            lines.append(part)
+            for m in entry.finditer(part):
+                rtype, suffix, rest = m.group(1), m.group(2) or "", m.group(3)
+                if not suffix:
+                    ret = rtype
+                args = "".join(", " + p.split()[-1].lstrip("*") for p in rest.split(",")[1:])
+                wrappers.append("")
+                wrappers.append(f"static inline {rtype} {func_name}{suffix}(const float *x, int n_features{rest}) {{")
+                wrappers.append("    (void)n_features;")
+                wrappers.append(f"    float z[{M}];")
+                wrappers.append(f"    {func_name}_preprocess(x, z);")
+                call = f"{inner}{suffix}(z, {M}{args});"
+                wrappers.append(f"    {call}" if rtype == "void" else f"    return {call}")
+                wrappers.append("}")
+        lines.extend(wrappers)
+        if batch:
+            lines.append("")
+            lines.extend(self._emit_batch(func_name, ret, F))
+        return lines
+
+    @staticmethod
+    def _emit_batch(func_name: str, ret: str, F: int) -> List[str]:
+        return [f"static inline void {func_name}_batch(const float *X, int n_rows, {ret} *out) {{",
+                "    for (int r = 0; r < n_rows; ++r) {",
+                f"        out[r] = {func_name}(X + r * {F}, {F});",
+                "    }",
+                "}"]
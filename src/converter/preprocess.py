@@ -0,0 +1,384 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from .cformat import CTable, Part, smallest_int_type
+from .scaling import scaler_affine
+from src.utils import instance_of
+
+logger = CustomLogger().get_logger(__name__)
+
+AFFINE_STEPS = ("StandardScaler", "MinMaxScaler", "RobustScaler", "MaxAbsScaler")
+SUPPORTED_STEPS = AFFINE_STEPS + ("PolynomialFeatures", "OneHotEncoder", "ColumnTransformer", "Pipeline")
+
+
+def is_preprocess_chain(obj: Any) -> bool:
+    """A scaler slot holding several preprocessing steps (see ``extract_pipeline_components``)."""
+    return instance_of(obj, "sklearn.pipeline", "Pipeline")
+
+
+class Column:
+    """One output value of a stage, computed from the previous stage's values ``v``.
+
+    ``"mono"``: ``a * v[src[0]] * v[src[1]] ... + c`` (``src=()`` is the
+    constant ``a + c``). ``"ind"``: ``a if v[src[0]] == value else c``
+    (one-hot indicators, ``a``/``c`` being the on/off values).
+    """
+
+    __slots__ = ("kind", "src", "a", "c", "value")
+
+    def __init__(self, kind: str, src: Tuple[int, ...], a: float = 1.0, c: float = 0.0, value: float = 0.0):
+        self.kind = kind
+        self.src = tuple(int(s) for s in src)
+        self.a = float(a)
+        self.c = float(c)
+        self.value = float(value)
+
+    def __repr__(self) -> str:
+        return f"Column({self.kind!r}, {self.src}, a={self.a!r}, c={self.c!r}, value={self.value!r})"
+
+    @property
+    def affine(self) -> bool:
+        return self.kind == "mono" and len(self.src) <= 1
+
+    def then(self, a: float, c: float) -> "Column":
+        """This column followed by ``a * value + c``."""
+        if self.kind == "ind":
+            return Column("ind", self.src, a * self.a + c, a * self.c + c, self.value)
+        return Column("mono", self.src, a * self.a, a * self.c + c)
+
+
+Stage = List[Column]
+
+
+def _identity(n: int) -> Stage:
+    return [Column("mono", (i,)) for i in range(n)]
+
+
+def _affine(a: np.ndarray, c: np.ndarray) -> Stage:
+    return [Column("mono", (i,), ai, ci) for i, (ai, ci) in enumerate(zip(a, c))]
+
+
+def _lower_affine(step: Any, n_in: int, raw: Sequence[Optional[int]], hints: Dict[int, tuple]) -> Stage:
+    """Per-feature ``a*x + c`` of a fitted scaler, and where its raw inputs usually lie."""
+    name = type(step).__name__
+    ones, zeros = np.ones(n_in), np.zeros(n_in)
+    if name in ("StandardScaler", "MinMaxScaler"):
+        a, c = scaler_affine(step, n_in)
+        if name == "StandardScaler":
+            # mean_ is fitted even when with_mean=False: it still tells where the raw inputs lie
+            mean = step.mean_ if getattr(step, "mean_", None) is not None else zeros
+            scale = step.scale_ if getattr(step, "scale_", None) is not None else ones
+            hint = [("normal", m, s) for m, s in zip(mean, scale)]
+        else:
+            hint = [("uniform", lo, hi) for lo, hi in zip(step.data_min_, step.data_max_)]
+    elif name == "RobustScaler":
+        center = step.center_ if getattr(step, "center_", None) is not None else zeros
+        scale = step.scale_ if getattr(step, "scale_", None) is not None else ones
+        a = 1.0 / np.asarray(scale, dtype=np.float64)
+        c = -np.asarray(center, dtype=np.float64) * a
+        hint = [("normal", m, s) for m, s in zip(center, scale)]
+    else:
+        a = 1.0 / np.asarray(step.scale_, dtype=np.float64)
+        c = zeros
+        hint = [("uniform", -m, m) for m in step.max_abs_]
+    for i, r in enumerate(raw):
+        if r is not None:
+            hints.setdefault(r, hint[i])
+    return _affine(a, c)
+
+
+def _lower_polynomial(step: Any) -> Stage:
+    stage = []
+    for powers in np.asarray(step.powers_):
+        src = tuple(i for i, p in enumerate(powers) for _ in range(int(p)))
+        stage.append(Column("mono", src))
+    return stage
+
+
+def _lower_onehot(step: Any, raw: Sequence[Optional[int]], hints: Dict[int, tuple]) -> Stage:
+    if getattr(step, "_infrequent_enabled", False) or step.handle_unknown == "infrequent_if_exist":
+        raise CustomException("OneHotEncoder with infrequent categories cannot be compiled to C", None)
+    drop_idx = getattr(step, "drop_idx_", None)
+    stage = []
+    for j, categories in enumerate(step.categories_):
+        if categories.dtype.kind not in "biuf":
+            raise CustomException("OneHotEncoder categories must be numeric: the C routine reads float inputs", None)
+        categories = np.asarray(categories, dtype=np.float64)
+        if np.isnan(categories).any():
+            raise CustomException("OneHotEncoder NaN categories cannot be compiled to C", None)
+        if raw[j] is not None:
+            hints[raw[j]] = ("categories", categories)
+        dropped = None if drop_idx is None or drop_idx[j] is None else int(drop_idx[j])
+        for k, value in enumerate(categories):
+            if k != dropped:
+                stage.append(Column("ind", (j,), 1.0, 0.0, value))
+    return stage
+
+
+def _input_indices(ct: Any, name: str, columns: Any, n_in: int) -> List[int]:
+    resolved = getattr(ct, "_transformer_to_input_indices", None)
+    if resolved is not None and name in resolved:
+        return [int(i) for i in resolved[name]]
+    if isinstance(columns, slice):
+        return list(range(n_in))[columns]
+    cols = np.atleast_1d(np.asarray(columns))
+    if cols.dtype == bool:
+        return [int(i) for i in np.flatnonzero(cols)]
+    if cols.dtype.kind in "iu":
+        return [int(i) % n_in for i in cols]
+    names = list(getattr(ct, "feature_names_in_", []))
+    try:
+        return [names.index(str(c)) for c in cols]
+    except ValueError:
+        raise CustomException(f"ColumnTransformer columns {columns!r} cannot be resolved to input indices", None)
+
+
+def _lower_columns(ct: Any, n_in: int, raw: Sequence[Optional[int]], hints: Dict[int, tuple]) -> List[Stage]:
+    """Branches of a ColumnTransformer, padded to the same depth and concatenated stage by stage."""
+    branches = []
+    for name, transformer, columns in ct.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        idx = _input_indices(ct, name, columns, n_in)
+        if not idx:
+            continue
+        stages = [] if isinstance(transformer, str) else _lower(transformer, len(idx), [raw[i] for i in idx], hints)
+        if stages:
+            # the branch's first stage reads the selected columns: point it at the transformer's input
+            stages[0] = [Column(c.kind, tuple(idx[s] for s in c.src), c.a, c.c, c.value) for c in stages[0]]
+        else:
+            stages = [[Column("mono", (i,)) for i in idx]]
+        branches.append(stages)
+    if not branches:
+        raise CustomException("ColumnTransformer drops every column", None)
+
+    depth = max(len(b) for b in branches)
+    for b in branches:
+        while len(b) < depth:
+            b.append(_identity(len(b[-1])))
+    merged: List[Stage] = []
+    for d in range(depth):
+        stage: Stage = []
+        offset = 0
+        for b in branches:
+            shift = offset if d else 0
+            stage.extend(Column(c.kind, tuple(s + shift for s in c.src), c.a, c.c, c.value) for c in b[d])
+            if d:
+                offset += len(b[d - 1])
+        merged.append(stage)
+    return merged
+
+
+def _lower(step: Any, n_in: int, raw: Sequence[Optional[int]], hints: Dict[int, tuple]) -> List[Stage]:
+    """Stages computing ``step.transform`` on ``n_in`` inputs; ``raw[i]`` is input ``i``'s raw column (or None)."""
+    if step is None or (isinstance(step, str) and step == "passthrough"):
+        return []
+    name = type(step).__name__
+    if instance_of(step, "sklearn.pipeline", "Pipeline"):
+        stages: List[Stage] = []
+        for _, sub in step.steps:
+            lowered = _lower(sub, n_in, raw, hints)
+            if lowered:
+                stages.extend(lowered)
+                n_in, raw = len(lowered[-1]), [None] * len(lowered[-1])
+        return stages
+    if instance_of(step, "sklearn.preprocessing", *AFFINE_STEPS):
+        return [_lower_affine(step, n_in, raw, hints)]
+    if instance_of(step, "sklearn.preprocessing", "PolynomialFeatures"):
+        return [_lower_polynomial(step)]
+    if instance_of(step, "sklearn.preprocessing", "OneHotEncoder"):
+        return [_lower_onehot(step, raw, hints)]
+    if instance_of(step, "sklearn.compose", "ColumnTransformer"):
+        return _lower_columns(step, n_in, raw, hints)
+    raise CustomException(f"Pipeline step {name} cannot be compiled to C (supported: {', '.join(SUPPORTED_STEPS)})",
+                          None)
+
+
+def collapse_affine(stages: List[Stage]) -> List[Stage]:
+    """Fold every all-affine stage (scalers, column selection) into the stage before it."""
+    out: List[Stage] = []
+    for stage in stages:
+        if out and all(col.affine for col in stage):
+            prev = out[-1]
+            out[-1] = [prev[col.src[0]].then(col.a, col.c) if col.src else col for col in stage]
+        else:
+            out.append(stage)
+    return out
+
+
+def _runs(stage: Stage) -> List[Tuple[int, List[Column]]]:
+    """(output offset, columns) of maximal runs computed by the same kind of loop."""
+    runs: List[Tuple[int, List[Column]]] = []
+    key = None
+    for i, col in enumerate(stage):
+        k = (col.kind, len(col.src))
+        if k != key:
+            runs.append((i, []))
+            key = k
+        runs[-1][1].append(col)
+    return runs
+
+
+def _index(src: np.ndarray) -> Tuple[Optional[int], np.ndarray]:
+    """``(start, src)`` when ``src`` is ``start, start+1, ...``; ``(None, src)`` otherwise."""
+    if src.size and np.array_equal(src, np.arange(src[0], src[0] + src.size)):
+        return int(src[0]), src
+    return None, src
+
+
+class PreprocessProgram:
+    """Lowered preprocessing: a few stages of per-column expressions over a float row.
+
+    Built by ``compile_preprocessing``. ``transform`` re-executes the stages
+    in float32 in the order the emitted C runs them; ``emit`` writes the
+    fused per-row routine.
+    """
+
+    def __init__(self, stages: List[Stage], n_inputs: int, steps: Sequence[str] = (),
+                 hints: Optional[Dict[int, tuple]] = None):
+        self.stages = stages
+        self.n_inputs = int(n_inputs)
+        self.steps = list(steps)
+        self.hints = dict(hints or {})
+
+    @property
+    def n_outputs(self) -> int:
+        return len(self.stages[-1]) if self.stages else self.n_inputs
+
+    @property
+    def widths(self) -> List[int]:
+        return [len(s) for s in self.stages]
+
+    def op_count(self) -> int:
+        """Multiplies, adds and compares per row."""
+        ops = 0
+        for stage in self.stages:
+            for col in stage:
+                ops += 1 if col.kind == "ind" else len(col.src) + 1
+        return ops
+
+    def sample_inputs(self, n_samples: int, seed: int = 0) -> np.ndarray:
+        """Raw rows near the training data: categories for one-hot columns, scaler statistics elsewhere."""
+        rng = np.random.RandomState(seed)
+        X = rng.randn(n_samples, self.n_inputs)
+        for col, hint in self.hints.items():
+            if hint[0] == "categories":
+                X[:, col] = rng.choice(hint[1], size=n_samples)
+            elif hint[0] == "normal":
+                X[:, col] = hint[1] + hint[2] * rng.randn(n_samples)
+            else:
+                X[:, col] = hint[1] + (hint[2] - hint[1]) * rng.uniform(-0.1, 1.1, size=n_samples)
+        return X
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        V = np.asarray(X, dtype=np.float32)
+        for stage in self.stages:
+            out = np.empty((V.shape[0], len(stage)), dtype=np.float32)
+            for offset, run in _runs(stage):
+                a = np.array([col.a for col in run], dtype=np.float32)
+                c = np.array([col.c for col in run], dtype=np.float32)
+                cols = slice(offset, offset + len(run))
+                if run[0].kind == "ind":
+                    src = np.array([col.src[0] for col in run])
+                    value = np.array([col.value for col in run], dtype=np.float32)
+                    out[:, cols] = np.where(V[:, src] == value, a, c)
+                elif not run[0].src:
+                    out[:, cols] = np.array([col.a + col.c for col in run], dtype=np.float32)
+                else:
+                    p = np.repeat(a[None, :], V.shape[0], axis=0)
+                    for m in range(len(run[0].src)):
+                        p = p * V[:, [col.src[m] for col in run]]
+                    out[:, cols] = p + c
+            V = out
+        return V
+
+    def emit(self, func_name: str) -> List[Part]:
+        """Tables plus ``<func_name>_preprocess(const float *x, float *z)`` writing ``n_outputs`` values to ``z``."""
+        tables: List[Part] = []
+        body: List[str] = []
+        for l, stage in enumerate(self.stages):
+            src = "x" if l == 0 else f"t{l - 1}"
+            dst = "z" if l == len(self.stages) - 1 else f"t{l}"
+            if dst != "z":
+                body.append(f"    float {dst}[{len(stage)}];")
+            for r, (offset, run) in enumerate(_runs(stage)):
+                t, s = self._emit_run(f"PRE{l}_{r}", run, src)
+                tables.extend(t)
+                out = f"{dst}[{offset} + k]" if offset else f"{dst}[k]"
+                body.append(f"    for (int k = 0; k < {len(run)}; ++k) {out} = {s};")
+        if not self.stages:
+            body.append(f"    for (int k = 0; k < {self.n_inputs}; ++k) z[k] = x[k];")
+
+        lines: List[Part] = []
+        chain = " -> ".join(self.steps) or "passthrough"
+        lines.append(f"/* preprocessing ({chain}) compiled to {len(self.stages)} stage(s), "
+                     f"{self.n_inputs} -> {self.n_outputs} values per row */")
+        lines.extend(tables)
+        lines.append("")
+        lines.append(f"static inline void {func_name}_preprocess(const float *x, float *z) {{")
+        lines.extend(body)
+        lines.append("}")
+        return lines
+
+    @staticmethod
+    def _emit_run(prefix: str, run: List[Column], src: str) -> Tuple[List[Part], str]:
+        """Tables and the per-``k`` C expression of one run."""
+        tables: List[Part] = []
+        a = np.array([col.a for col in run])
+        c = np.array([col.c for col in run])
+
+        def index(values: np.ndarray, name: str) -> str:
+            start, values = _index(values)
+            if start is not None:
+                return f"{start} + k" if start else "k"
+            ctype, dtype = smallest_int_type(0, int(values.max()))
+            tables.append(CTable(ctype, f"{prefix}_{name}", values.astype(dtype), "%d"))
+            return f"{prefix}_{name}[k]"
+
+        kind, arity = run[0].kind, len(run[0].src)
+        if kind == "ind":
+            i = index(np.array([col.src[0] for col in run]), "SRC")
+            tables.append(CTable("float", f"{prefix}_VALUE", [col.value for col in run]))
+            if np.all(a == 1.0) and np.all(c == 0.0):
+                return tables, f"{src}[{i}] == {prefix}_VALUE[k] ? 1.0f : 0.0f"
+            tables.append(CTable("float", f"{prefix}_ON", a))
+            tables.append(CTable("float", f"{prefix}_OFF", c))
+            return tables, f"{src}[{i}] == {prefix}_VALUE[k] ? {prefix}_ON[k] : {prefix}_OFF[k]"
+        if arity == 0:
+            tables.append(CTable("float", f"{prefix}_C", a + c))
+            return tables, f"{prefix}_C[k]"
+
+        if arity <= 2:
+            factors = [f"{src}[{index(np.array([col.src[m] for col in run]), 'SRC' if arity == 1 else 'IJ'[m])}]"
+                       for m in range(arity)]
+            expr = " * ".join(factors)
+        else:
+            # higher degrees: one index row per output, multiplied left to right like the replay
+            srcs = np.array([col.src for col in run])
+            ctype, dtype = smallest_int_type(0, int(srcs.max()))
+            tables.append(CTable(ctype, f"{prefix}_SRC", srcs.astype(dtype), "%d"))
+            expr = " * ".join(f"{src}[{prefix}_SRC[{arity} * k + {m}]]" for m in range(arity))
+        if not np.all(a == 1.0):
+            tables.append(CTable("float", f"{prefix}_A", a))
+            expr = f"{prefix}_A[k] * {expr}"
+        if not np.all(c == 0.0):
+            tables.append(CTable("float", f"{prefix}_C", c))
+            expr = f"{expr} + {prefix}_C[k]"
+        return tables, expr
+
+
+def compile_preprocessing(chain: Any, n_inputs: int) -> PreprocessProgram:
+    """Lower a fitted preprocessing chain (a ``Pipeline`` of the supported steps) to a ``PreprocessProgram``.
+
+    Consecutive affine steps, and affine steps after a polynomial/one-hot
+    step, are collapsed into the per-column coefficients at export time.
+    """
+    hints: Dict[int, tuple] = {}
+    stages = collapse_affine(_lower(chain, n_inputs, list(range(n_inputs)), hints))
+    steps = [type(s).__name__ for _, s in getattr(chain, "steps", [(None, chain)])
+             if s is not None and not isinstance(s, str)]
+    program = PreprocessProgram(stages, n_inputs, steps, hints)
+    logger.info("compile_preprocessing(): %s -> %d stage(s), widths %s", " -> ".join(steps), len(stages),
+                [n_inputs] + program.widths)
+    return program
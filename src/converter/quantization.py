@@ -0,0 +1,129 @@
+import numpy as np
+from typing import Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+
+logger = CustomLogger().get_logger(__name__)
+
+# weight storage type -> (C type, qmax). Weights are symmetric (zero point 0).
+WEIGHT_TYPES = {
+    "int8": ("int8_t", 127),
+    "int16": ("int16_t", 32767),
+}
+
+# inputs are always int8 with a per-feature scale and zero point
+INPUT_QMIN, INPUT_QMAX = -128, 127
+REQUANT_SHIFT = 15
+INT32_MAX = 2**31 - 1
+# rounded inputs are clamped to +-INPUT_CLAMP before the integer cast, so
+# out-of-range (or NaN) rows saturate instead of overflowing the cast
+INPUT_CLAMP = 2.0**32
+
+
+def clamp_rounded_input(f: np.ndarray) -> np.ndarray:
+    """``floor(x * inv_scale + 0.5)`` clamped to ``+-INPUT_CLAMP`` (NaN -> ``-INPUT_CLAMP``), as the C header does."""
+    bound = np.float32(INPUT_CLAMP)
+    return np.where(f > -bound, np.minimum(f, bound), -bound).astype(np.int64)
+
+
+class QuantizedLinear:
+    """Integer-only parameters of a linear model (scaler already folded in).
+
+    Inference for class ``c`` is::
+
+        acc_c   = BIAS_Q[c] + sum_i W_Q[c][i] * xq[i]        (int32)
+        score_c = WEIGHT_SCALE[c] * acc_c                    (float, optional)
+
+    with ``xq[i] = clamp(floor(x[i] / INPUT_SCALE[i] + 0.5) + INPUT_ZERO_POINT[i])``.
+    The input zero points are folded into ``BIAS_Q`` so the inner loop is a
+    plain int8 x int8/int16 multiply-accumulate. With per-class scales the
+    accumulators are rescaled to the largest scale with a Q15 multiplier
+    before the argmax, so the comparison stays integer-only.
+    """
+
+    def __init__(self, dtype: str, granularity: str, input_scale: np.ndarray, input_zero_point: np.ndarray,
+                 weights_q: np.ndarray, weight_scale: np.ndarray, bias_q: np.ndarray):
+        self.dtype = dtype
+        self.granularity = granularity
+        self.input_scale = input_scale
+        self.input_zero_point = input_zero_point
+        self.weights_q = weights_q
+        self.weight_scale = weight_scale
+        self.bias_q = bias_q
+        # Q15 rescale of each class accumulator to the common (largest) scale
+        self.requant_multiplier = np.round(weight_scale / weight_scale.max() * (1 << REQUANT_SHIFT)).astype(np.int64)
+
+    @property
+    def n_classes(self) -> int:
+        return self.weights_q.shape[0]
+
+    @property
+    def n_features(self) -> int:
+        return self.weights_q.shape[1]
+
+    def quantize_input(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        inv_scale = (1.0 / self.input_scale).astype(np.float32)
+        with np.errstate(over="ignore"):
+            q = clamp_rounded_input(np.floor(X * inv_scale + np.float32(0.5))) + self.input_zero_point
+        return np.clip(q, INPUT_QMIN, INPUT_QMAX)
+
+    def accumulate(self, X: np.ndarray) -> np.ndarray:
+        """int32 accumulators, shape (n_samples, n_classes)."""
+        return self.quantize_input(X).dot(self.weights_q.T.astype(np.int64)) + self.bias_q
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.accumulate(X) * self.weight_scale
+
+    def predict_labels(self, X: np.ndarray) -> np.ndarray:
+        acc = self.accumulate(X)
+        if self.n_classes == 1:
+            return (acc[:, 0] >= 0).astype(int)
+        if self.granularity == "class":
+            acc = (acc * self.requant_multiplier) >> REQUANT_SHIFT
+        return np.argmax(acc, axis=1)
+
+
+def calibrate_linear(coef: np.ndarray, intercept: np.ndarray, X_calib: Optional[np.ndarray],
+                     dtype: str = "int8", granularity: str = "tensor") -> QuantizedLinear:
+    """Quantize folded ``coef`` (C, F) / ``intercept`` (C,) against raw calibration rows."""
+    if dtype not in WEIGHT_TYPES:
+        raise CustomException(f"Unsupported quantization dtype '{dtype}' (expected one of {sorted(WEIGHT_TYPES)})", None)
+    if granularity not in ("tensor", "class"):
+        raise CustomException(f"Unsupported quantization granularity '{granularity}' (expected 'tensor' or 'class')", None)
+    if X_calib is None:
+        raise CustomException("Quantized export requires calibration_data (sample input rows)", None)
+
+    coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+    intercept = np.atleast_1d(np.asarray(intercept, dtype=np.float64))
+    X_calib = np.asarray(X_calib, dtype=np.float64)
+    if X_calib.ndim != 2 or X_calib.shape[1] != coef.shape[1]:
+        raise CustomException(f"calibration_data must have shape (n, {coef.shape[1]}), got {X_calib.shape}", None)
+
+    # per-feature asymmetric input quantization over the observed range
+    lo = X_calib.min(axis=0)
+    hi = X_calib.max(axis=0)
+    span = hi - lo
+    input_scale = np.where(span > 0, span / (INPUT_QMAX - INPUT_QMIN), 1.0)
+    input_zero_point = (INPUT_QMIN - np.round(lo / input_scale)).astype(np.int64)
+
+    # x = s_x * (xq - zp)  ->  w.x = (w * s_x).xq - (w * s_x).zp
+    w_eff = coef * input_scale
+    _, qmax = WEIGHT_TYPES[dtype]
+    if granularity == "tensor":
+        absmax = np.full(coef.shape[0], np.abs(w_eff).max())
+    else:
+        absmax = np.abs(w_eff).max(axis=1)
+    weight_scale = np.where(absmax > 0, absmax / qmax, 1.0)
+
+    weights_q = np.clip(np.round(w_eff / weight_scale[:, None]), -qmax, qmax).astype(np.int64)
+    bias_q = np.round(intercept / weight_scale).astype(np.int64) - weights_q.dot(input_zero_point)
+
+    worst = int(qmax * max(-INPUT_QMIN, INPUT_QMAX) * coef.shape[1] + np.abs(bias_q).max())
+    if worst > INT32_MAX:
+        raise CustomException(
+            f"{dtype} weights with {coef.shape[1]} features can overflow the int32 accumulator; use int8", None)
+
+    logger.info("Quantized linear model: dtype=%s granularity=%s classes=%d features=%d calib_rows=%d",
+                dtype, granularity, coef.shape[0], coef.shape[1], X_calib.shape[0])
+    return QuantizedLinear(dtype, granularity, input_scale, input_zero_point, weights_q, weight_scale, bias_q)
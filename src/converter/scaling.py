@@ -0,0 +1,64 @@
+import numpy as np
+from typing import Any, Dict, List, Tuple
+from exception.custom_exception import CustomException
+from src.utils import is_standard_scaler, is_minmax_scaler
+
+
+def standard_mean_scale(scaler: Any, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``(mean, scale)`` a StandardScaler actually applies: ``(x - mean) / scale``.
+
+    ``mean_`` is fitted even with ``with_mean=False`` but not subtracted, so
+    ``with_mean``/``with_std`` decide, not the presence of the attributes.
+    """
+    mean = getattr(scaler, "mean_", None) if getattr(scaler, "with_mean", True) else None
+    scale = getattr(scaler, "scale_", None) if getattr(scaler, "with_std", True) else None
+    mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    return mean, scale
+
+
+def scaler_affine(scaler: Any, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``(a, c)`` with ``scaler.transform(x) == a * x + c``, in float64.
+
+    Shared by every converter that folds a StandardScaler/MinMaxScaler into
+    its parameters. MinMaxScaler is sklearn's own ``x * scale_ + min_``
+    (``feature_range`` and constant features included).
+    """
+    if is_standard_scaler(scaler):
+        mean, scale = standard_mean_scale(scaler, n_features)
+        a = 1.0 / scale
+        return a, -mean * a
+    if is_minmax_scaler(scaler):
+        _check_minmax(scaler)
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    raise CustomException("Unsupported scaler type", None)
+
+
+def scaler_runtime_tables(scaler: Any, n_features: int) -> List[Tuple[str, np.ndarray]]:
+    """``(suffix, values)`` of the ``SCALER_*`` tables that scale inputs at run time.
+
+    StandardScaler keeps ``(x - MEAN) / SCALE`` (zeros/ones for a disabled
+    ``with_mean``/``with_std``); MinMaxScaler is ``x * SCALE + MIN`` from
+    ``scale_``/``min_``, as in ``scaler_affine``.
+    """
+    if is_standard_scaler(scaler):
+        mean, scale = standard_mean_scale(scaler, n_features)
+        return [("MEAN", mean), ("SCALE", scale)]
+    if is_minmax_scaler(scaler):
+        _check_minmax(scaler)
+        return [("SCALE", scaler.scale_), ("MIN", scaler.min_)]
+    raise CustomException("Unsupported scaler type", None)
+
+
+def _check_minmax(scaler: Any) -> None:
+    if getattr(scaler, "clip", False):
+        raise CustomException("MinMaxScaler(clip=True) cannot be compiled to C", None)
+
+
+def scaled_expr(scaler: Any, x: str, tables: Dict[str, str], index: str = "i") -> str:
+    """C expression of ``x`` scaled with the ``scaler_runtime_tables`` named ``tables[suffix]``."""
+    if is_standard_scaler(scaler):
+        return f"({x} - {tables['MEAN']}[{index}]) / {tables['SCALE']}[{index}]"
+    if is_minmax_scaler(scaler):
+        return f"{x} * {tables['SCALE']}[{index}] + {tables['MIN']}[{index}]"
+    raise CustomException("Unsupported scaler type", None)
@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+
+logger = CustomLogger().get_logger(__name__)
+
+# auto mode exports sparse weights when at most this fraction of them is nonzero
+DEFAULT_DENSITY_THRESHOLD = 0.25
+
+
+class SparseLinear:
+    """Nonzero weights of a linear model in CSR form (one row per class).
+
+    Inference for class ``c`` is::
+
+        score_c = BIAS[c] + sum_{k = ROW_PTR[c]}^{ROW_PTR[c+1]-1} VALUE[k] * x[COL_INDEX[k]]
+
+    ``folded`` tells whether a scaler was folded into ``values``/``bias``,
+    i.e. whether ``x`` is the raw or the scaled input.
+    """
+
+    def __init__(self, row_ptr: np.ndarray, col_index: np.ndarray, values: np.ndarray, bias: np.ndarray,
+                 n_features: int, folded: bool):
+        self.row_ptr = row_ptr
+        self.col_index = col_index
+        self.values = values
+        self.bias = bias
+        self.n_features = n_features
+        self.folded = folded
+
+    @classmethod
+    def from_dense(cls, W: np.ndarray, b: np.ndarray, folded: bool = False) -> "SparseLinear":
+        W = np.atleast_2d(np.asarray(W, dtype=np.float64))
+        rows, cols = np.nonzero(W)
+        row_ptr = np.zeros(W.shape[0] + 1, dtype=np.int64)
+        np.add.at(row_ptr, rows + 1, 1)
+        return cls(np.cumsum(row_ptr), cols.astype(np.int64), W[rows, cols],
+                   np.atleast_1d(np.asarray(b, dtype=np.float64)), W.shape[1], folded)
+
+    @property
+    def n_classes(self) -> int:
+        return self.row_ptr.shape[0] - 1
+
+    @property
+    def nnz(self) -> int:
+        return int(self.values.shape[0])
+
+    @property
+    def density(self) -> float:
+        return self.nnz / max(self.n_classes * self.n_features, 1)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """(n, C) scores computed from the CSR tables only."""
+        X = np.asarray(X, dtype=np.float64)
+        scores = np.tile(self.bias, (X.shape[0], 1))
+        for c in range(self.n_classes):
+            lo, hi = self.row_ptr[c], self.row_ptr[c + 1]
+            if hi > lo:
+                scores[:, c] += X[:, self.col_index[lo:hi]].dot(self.values[lo:hi])
+        return scores
+
+
+def weight_density(W: np.ndarray) -> float:
+    W = np.asarray(W)
+    return float(np.count_nonzero(W)) / max(W.size, 1)
+
+
+def use_sparse(W: np.ndarray, sparse: Optional[bool] = None,
+               threshold: float = DEFAULT_DENSITY_THRESHOLD) -> bool:
+    """``sparse=None`` decides from the density; an all-zero model always stays dense."""
+    if not 0.0 <= threshold <= 1.0:
+        raise CustomException(f"sparse_threshold must be in [0, 1], got {threshold}", None)
+    if np.count_nonzero(W) == 0:
+        return False
+    if sparse is None:
+        return weight_density(W) <= threshold
+    return bool(sparse)
@@ -0,0 +1,301 @@
+import numpy as np
+from typing import Any, List, Optional, Tuple
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from .base import BaseConverter
+from .cformat import c_values, smallest_int_type, INT_FMT
+from .scaling import scaler_affine
+from src.utils import instance_of
+
+logger = CustomLogger().get_logger(__name__)
+
+_SINGLE_TREES = ("DecisionTreeClassifier", "DecisionTreeRegressor")
+_FORESTS = ("RandomForestClassifier", "RandomForestRegressor", "ExtraTreesClassifier", "ExtraTreesRegressor")
+_BOOSTING = ("GradientBoostingClassifier", "GradientBoostingRegressor")
+
+# module -> supported estimator class names (checked with ``instance_of``, nothing is imported)
+TREE_MODELS = {"sklearn.tree": _SINGLE_TREES, "sklearn.ensemble": _FORESTS + _BOOSTING}
+
+_TREE_LEAF = -1
+
+
+def is_tree_model(model: Any) -> bool:
+    return any(instance_of(model, module, *names) for module, names in TREE_MODELS.items())
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each float64 value, so ``x32 <= t32`` agrees with sklearn's ``x32 <= t64``."""
+    values = np.asarray(values, dtype=np.float64)
+    t32 = values.astype(np.float32)
+    too_big = t32.astype(np.float64) > values
+    t32[too_big] = np.nextafter(t32[too_big], np.float32(-np.inf))
+    return t32
+
+
+def _c_floats32(values) -> str:
+    # 9 significant digits round-trip any float32 exactly
+    return c_values(values, "%.9ef")
+
+
+def _c_ints(values) -> str:
+    return c_values(np.asarray(values).astype(np.int64), INT_FMT)
+
+
+class FlatEnsemble:
+    """All trees of a model flattened into shared node/leaf tables.
+
+    Only internal nodes live in the node arrays. A child index ``>= 0`` is
+    another internal node; ``< 0`` is leaf ``~child``. Each tree adds its
+    ``width`` leaf values into ``acc[slot : slot + width]``, starting from
+    ``base``. ``post`` maps ``acc`` to the output: ``"identity"`` (value),
+    ``"argmax"`` (class index) or ``"sign"`` (binary class index, acc > 0).
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 roots: np.ndarray, leaf_values: np.ndarray, slots: np.ndarray, base: np.ndarray, post: str,
+                 n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.roots = roots
+        self.leaf_values = leaf_values
+        self.slots = slots
+        self.base = base
+        self.post = post
+        self.n_features = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.feature.shape[0])
+
+    @property
+    def width(self) -> int:
+        return int(self.leaf_values.shape[1])
+
+    @property
+    def n_outputs(self) -> int:
+        return int(self.base.shape[0])
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Vectorized float32 re-execution of the emitted traversal, shape (n_samples, n_outputs)."""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])
+        acc = np.tile(self.base.astype(np.float32), (X.shape[0], 1))
+        for t in range(self.n_trees):
+            node = np.full(X.shape[0], self.roots[t], dtype=np.int64)
+            active = node >= 0
+            while active.any():
+                n = node[active]
+                go_left = X[rows[active], self.feature[n]] <= self.threshold[n]
+                node[active] = np.where(go_left, self.left[n], self.right[n])
+                active = node >= 0
+            slot = int(self.slots[t])
+            acc[:, slot:slot + self.width] += self.leaf_values[~node]
+        return acc
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        acc = self.decision_function(X)
+        if self.post == "argmax":
+            return np.argmax(acc, axis=1)
+        if self.post == "sign":
+            return (acc[:, 0] > 0).astype(int)
+        return acc[:, 0]
+
+
+class TreeEnsembleConverter(BaseConverter):
+    def __init__(self, model_path: str = None):
+        super().__init__(model_path)
+        self.flat: Optional[FlatEnsemble] = None
+
+    def convert_to_c(self, func_name: str = "predict_model", batch: bool = False, fold_scaler: bool = True,
+                     merge_thresholds: bool = False) -> str:
+        """Emit packed node tables and a branch-light traversal loop.
+
+        A StandardScaler/MinMaxScaler is always folded into the split
+        thresholds (``fold_scaler=False`` is rejected). ``merge_thresholds``
+        stores each distinct threshold once and indexes it per node, which
+        shrinks flash when many trees split on the same values.
+        """
+        if self.model is None:
+            raise CustomException("Converter has no loaded estimator; call load() first", None)
+        if not fold_scaler and self.scaler is not None:
+            raise CustomException("Tree converter always folds the scaler into thresholds", None)
+
+        self.flat = self.flatten()
+        return self._emit(func_name, self.flat, batch, merge_thresholds)
+
+    def op_counts(self) -> dict:
+        """Worst-case per-inference work: one comparison per tree level, one leaf add per tree."""
+        trees = self._trees()
+        return {"max_comparisons": int(sum(tree.max_depth for tree, _, _ in trees)),
+                "leaf_adds": len(trees)}
+
+    # flattening
+    def _trees(self) -> List[Tuple[Any, int, float]]:
+        """(sklearn Tree, output slot, leaf scale) per tree, in evaluation order."""
+        m = self.model
+        if instance_of(m, "sklearn.tree", *_SINGLE_TREES):
+            return [(m.tree_, 0, 1.0)]
+        if instance_of(m, "sklearn.ensemble", *_FORESTS):
+            n = len(m.estimators_)
+            return [(e.tree_, 0, 1.0 / n) for e in m.estimators_]
+        if instance_of(m, "sklearn.ensemble", *_BOOSTING):
+            stages = m.estimators_
+            return [(stages[i, k].tree_, k, float(m.learning_rate))
+                    for i in range(stages.shape[0]) for k in range(stages.shape[1])]
+        raise CustomException(f"Unsupported tree model: {type(m).__name__}", None)
+
+    def _base_and_post(self) -> Tuple[np.ndarray, str, bool]:
+        """Initial accumulator, post-processing, and whether leaves hold class distributions."""
+        m = self.model
+        if instance_of(m, "sklearn.ensemble", *_BOOSTING):
+            if not (m.init_ == "zero" or instance_of(m.init_, "sklearn.dummy", "DummyClassifier", "DummyRegressor")):
+                raise CustomException("GradientBoosting with a custom init estimator is not supported", None)
+            base = np.asarray(m._raw_predict_init(np.zeros((1, m.n_features_in_)))[0], dtype=np.float64)
+            if instance_of(m, "sklearn.ensemble", "GradientBoostingRegressor"):
+                return base, "identity", False
+            return base, ("sign" if base.shape[0] == 1 else "argmax"), False
+        if getattr(m, "n_outputs_", 1) != 1:
+            raise CustomException("Multi-output trees are not supported", None)
+        if instance_of(m, "sklearn.base", "ClassifierMixin"):
+            return np.zeros(len(m.classes_)), "argmax", True
+        return np.zeros(1), "identity", False
+
+    def _fold_thresholds(self, feature: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        """Map thresholds on scaled inputs back to raw inputs (both scalers are increasing affine maps)."""
+        if self.scaler is None:
+            return threshold
+        # a * x + c <= t  <=>  x <= (t - c) / a, since a > 0
+        a, c = scaler_affine(self.scaler, self.model.n_features_in_)
+        return (threshold - c[feature]) / a[feature]
+
+    def flatten(self) -> FlatEnsemble:
+        base, post, distributions = self._base_and_post()
+        feats, thrs, lefts, rights, roots, leaves, slots = [], [], [], [], [], [], []
+        n_internal = 0
+        n_leaves = 0
+
+        for tree, slot, scale in self._trees():
+            cl, cr = tree.children_left, tree.children_right
+            is_leaf = cl == _TREE_LEAF
+            # local node id -> global encoded index (internal >= 0, leaf < 0)
+            internal_ids = np.flatnonzero(~is_leaf)
+            leaf_ids = np.flatnonzero(is_leaf)
+            enc = np.empty(tree.node_count, dtype=np.int64)
+            enc[internal_ids] = n_internal + np.arange(internal_ids.size)
+            enc[leaf_ids] = ~(n_leaves + np.arange(leaf_ids.size))
+
+            feats.append(tree.feature[internal_ids])
+            thrs.append(tree.threshold[internal_ids])
+            lefts.append(enc[cl[internal_ids]])
+            rights.append(enc[cr[internal_ids]])
+            roots.append(enc[0])
+
+            value = tree.value[leaf_ids][:, 0, :].astype(np.float64)
+            if distributions:
+                totals = value.sum(axis=1, keepdims=True)
+                value = value / np.where(totals > 0, totals, 1.0)
+            else:
+                value = value[:, :1]
+            leaves.append(value * scale)
+            slots.append(slot)
+
+            n_internal += internal_ids.size
+            n_leaves += leaf_ids.size
+
+        feature = np.concatenate(feats).astype(np.int64)
+        threshold = float32_floor(self._fold_thresholds(feature, np.concatenate(thrs)))
+        flat = FlatEnsemble(feature, threshold, np.concatenate(lefts), np.concatenate(rights),
+                            np.asarray(roots, dtype=np.int64), np.vstack(leaves).astype(np.float32),
+                            np.asarray(slots, dtype=np.int64), base, post, int(self.model.n_features_in_))
+        logger.info("TreeEnsembleConverter.flatten(): %s trees=%d internal=%d leaves=%d",
+                    type(self.model).__name__, flat.n_trees, flat.n_nodes, n_leaves)
+        return flat
+
+    # emission
+    def _emit(self, func_name: str, flat: FlatEnsemble, batch: bool, merge_thresholds: bool) -> str:
+        n_nodes = max(flat.n_nodes, 1)  # ISO C has no zero-length arrays
+        n_leaves = flat.leaf_values.shape[0]
+        feature = flat.feature if flat.n_nodes else np.zeros(1, dtype=np.int64)
+        threshold = flat.threshold if flat.n_nodes else np.zeros(1, dtype=np.float32)
+        left = flat.left if flat.n_nodes else np.full(1, -1)
+        right = flat.right if flat.n_nodes else np.full(1, -1)
+
+        feat_t, _ = smallest_int_type(0, max(flat.n_features - 1, 0))
+        child_t, _ = smallest_int_type(-n_leaves, max(flat.n_nodes - 1, 0))
+
+        lines = []
+        lines.append(f"// Auto-generated by AutoEdgeML (tree ensemble: {type(self.model).__name__}, "
+                     f"{flat.n_trees} trees, {flat.n_nodes} split nodes, {n_leaves} leaves)")
+        lines.append("#pragma once")
+        lines.append("#include <stdint.h>")
+        lines.append("")
+        if self.scaler is not None:
+            lines.append(f"/* {type(self.scaler).__name__} folded into split thresholds at export time */")
+        lines.append("/* child index >= 0: split node, < 0: leaf ~index */")
+        lines.append(f"static const {child_t} TREE_ROOT[{flat.n_trees}] = {{ {_c_ints(flat.roots)} }};")
+        lines.append(f"static const {feat_t} NODE_FEATURE[{n_nodes}] = {{ {_c_ints(feature)} }};")
+
+        threshold_ref = "NODE_THRESHOLD[n]"
+        if merge_thresholds:
+            uniq, idx = np.unique(threshold, return_inverse=True)
+            idx_t, _ = smallest_int_type(0, max(uniq.size - 1, 0))
+            if idx_t in ("uint8_t", "uint16_t"):
+                lines.append(f"/* {threshold.size} thresholds merged into {uniq.size} distinct values */")
+                lines.append(f"static const float THRESHOLD_VALUE[{uniq.size}] = {{ {_c_floats32(uniq)} }};")
+                lines.append(f"static const {idx_t} NODE_THRESHOLD_IDX[{n_nodes}] = {{ {_c_ints(idx)} }};")
+                threshold_ref = "THRESHOLD_VALUE[NODE_THRESHOLD_IDX[n]]"
+            else:
+                logger.info("merge_thresholds: %d distinct thresholds, index would not be smaller than a float",
+                            uniq.size)
+        if threshold_ref == "NODE_THRESHOLD[n]":
+            lines.append(f"static const float NODE_THRESHOLD[{n_nodes}] = {{ {_c_floats32(threshold)} }};")
+
+        lines.append(f"static const {child_t} NODE_LEFT[{n_nodes}] = {{ {_c_ints(left)} }};")
+        lines.append(f"static const {child_t} NODE_RIGHT[{n_nodes}] = {{ {_c_ints(right)} }};")
+        lines.append(f"static const float LEAF_VALUE[{n_leaves * flat.width}] = {{ {_c_floats32(flat.leaf_values)} }};")
+        multi_slot = bool(np.any(flat.slots != 0))
+        if multi_slot:
+            slot_t, _ = smallest_int_type(0, int(flat.slots.max()))
+            lines.append(f"static const {slot_t} TREE_SLOT[{flat.n_trees}] = {{ {_c_ints(flat.slots)} }};")
+        lines.append("")
+
+        ret = "float" if flat.post == "identity" else "int"
+        lines.append(f"static inline {ret} {func_name}(const float *x, int n_features) {{")
+        lines.append("    (void)n_features;")
+        lines.append(f"    float acc[{flat.n_outputs}] = {{ {_c_floats32(flat.base)} }};")
+        lines.append(f"    for (int t = 0; t < {flat.n_trees}; ++t) {{")
+        lines.append("        int32_t n = TREE_ROOT[t];")
+        lines.append("        while (n >= 0) {")
+        lines.append(f"            n = (x[NODE_FEATURE[n]] <= {threshold_ref}) ? NODE_LEFT[n] : NODE_RIGHT[n];")
+        lines.append("        }")
+        if flat.width == 1:
+            target = "acc[TREE_SLOT[t]]" if multi_slot else "acc[0]"
+            lines.append(f"        {target} += LEAF_VALUE[~n];")
+        else:
+            lines.append(f"        const float *v = LEAF_VALUE + (~n) * {flat.width};")
+            lines.append(f"        for (int k = 0; k < {flat.width}; ++k) acc[k] += v[k];")
+        lines.append("    }")
+        if flat.post == "identity":
+            lines.append("    return acc[0];")
+        elif flat.post == "sign":
+            lines.append("    return acc[0] > 0.0f ? 1 : 0;")
+        else:
+            lines.append("    int best = 0;")
+            lines.append(f"    for (int k = 1; k < {flat.n_outputs}; ++k) {{ if (acc[k] > acc[best]) best = k; }}")
+            lines.append("    return best;")
+        lines.append("}")
+
+        if batch:
+            lines.append("")
+            lines.append(f"static inline void {func_name}_batch(const float *X, int n_rows, {ret} *out) {{")
+            lines.append("    for (int r = 0; r < n_rows; ++r) {")
+            lines.append(f"        out[r] = {func_name}(X + r * {flat.n_features}, {flat.n_features});")
+            lines.append("    }")
+            lines.append("}")
+        return "\n".join(lines)
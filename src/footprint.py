@@ -0,0 +1,118 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+
+logger = CustomLogger().get_logger(__name__)
+
+C_TYPE_SIZES = {
+    "float": 4, "double": 8, "int": 4,
+    "int8_t": 1, "uint8_t": 1, "int16_t": 2, "uint16_t": 2,
+    "int32_t": 4, "uint32_t": 4, "int64_t": 8, "uint64_t": 8,
+}
+
+# bytes assumed per function frame for scalars, saved registers and the return address
+FRAME_OVERHEAD = 32
+
+_CONST_ARRAY = re.compile(r"^static const (\w+) (\w+)\[(\d+)\]", re.MULTILINE)
+_CONST_SCALAR = re.compile(r"^static const (\w+) (\w+) =", re.MULTILINE)
+_STATIC_ARRAY = re.compile(r"^static (?!const\b)(\w+) (\w+)\[(\d+)\];", re.MULTILINE)
+_LOCAL_ARRAY = re.compile(r"^\s+(\w+) (\w+)\[(\d+)\](?: =[^;]*)?;", re.MULTILINE)
+_FUNCTION = re.compile(r"^static inline \w+ (\w+)\(", re.MULTILINE)
+
+
+def estimate_footprint(c_code: str, ops: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Flash/RAM estimate of a generated header.
+
+    ``const_bytes`` sums every ``static const`` table and scalar. ``stack_bytes``
+    is an upper bound on peak stack: all local arrays of all entry points as if
+    they were live together, plus ``FRAME_OVERHEAD`` per function. ``ops`` (e.g.
+    ``{"macs": ...}``) comes from the converter. ``static_bytes`` counts
+    mutable file-scope buffers (e.g. MLP activation buffers), which live in
+    RAM but not on the stack.
+    """
+    tables = {}
+    for ctype, name, n in _CONST_ARRAY.findall(c_code):
+        tables[name] = C_TYPE_SIZES.get(ctype, 4) * int(n)
+    for ctype, name in _CONST_SCALAR.findall(c_code):
+        tables[name] = C_TYPE_SIZES.get(ctype, 4)
+
+    locals_bytes = sum(C_TYPE_SIZES.get(ctype, 4) * int(n) for ctype, _, n in _LOCAL_ARRAY.findall(c_code))
+    n_functions = len(_FUNCTION.findall(c_code))
+
+    report: Dict[str, Any] = {
+        "const_bytes": int(sum(tables.values())),
+        "stack_bytes": int(locals_bytes + FRAME_OVERHEAD * n_functions),
+        "static_bytes": int(sum(C_TYPE_SIZES.get(ctype, 4) * int(n) for ctype, _, n in _STATIC_ARRAY.findall(c_code))),
+        "tables": tables,
+    }
+    report.update(ops or {})
+    return report
+
+
+def fits(report: Dict[str, Any], flash_bytes: Optional[int] = None, stack_bytes: Optional[int] = None) -> bool:
+    if flash_bytes is not None and report["const_bytes"] > flash_bytes:
+        return False
+    if stack_bytes is not None and report["stack_bytes"] > stack_bytes:
+        return False
+    return True
+
+
+def budget_candidates(converter: Any, export_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Export options to try, from the requested one to the most compact."""
+    from src.converter.tree import TreeEnsembleConverter
+    from src.converter.mlp import MLPConverter
+
+    if getattr(converter, "inner", None) is not None:
+        # compiled pipelines take the options of their estimator's converter
+        return budget_candidates(converter.inner, export_options)
+    requested = dict(export_options)
+    if isinstance(converter, TreeEnsembleConverter):
+        return [requested, dict(requested, merge_thresholds=True)]
+    if isinstance(converter, MLPConverter):
+        return [requested]
+
+    candidates = [requested]
+    if requested.get("quantize") is None:
+        candidates.append(dict(requested, fold_scaler=True))
+        candidates.append(dict(requested, fold_scaler=True, weight_dtype="float16"))
+        if requested.get("calibration_data") is not None:
+            cal = {k: v for k, v in requested.items() if k != "weight_dtype"}
+            candidates.append(dict(cal, fold_scaler=True, quantize="int8"))
+    return candidates
+
+
+def fit_to_budget(converter: Any, export_options: Optional[Dict[str, Any]] = None, func_name: str = "predict_model",
+                  flash_bytes: Optional[int] = None,
+                  stack_bytes: Optional[int] = None) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """Emit with the first candidate (see ``budget_candidates``) that fits the budget.
+
+    Returns ``(c_code, chosen_export_options, footprint)``. Raises if even the
+    most compact candidate does not fit.
+    """
+    export_options = dict(export_options or {})
+    tried = []
+    for options in budget_candidates(converter, export_options):
+        c_code = converter.convert_to_c(func_name=func_name, **options)
+        report = estimate_footprint(c_code, converter.op_counts())
+        label = _describe(options)
+        tried.append(f"{label}: const={report['const_bytes']}B stack={report['stack_bytes']}B")
+        if fits(report, flash_bytes, stack_bytes):
+            report["selected"] = label
+            logger.info("fit_to_budget(): selected %s (const=%dB stack=%dB, budget flash=%s stack=%s)",
+                        label, report["const_bytes"], report["stack_bytes"], flash_bytes, stack_bytes)
+            return c_code, options, report
+
+    raise CustomException(f"No export variant fits flash={flash_bytes}B stack={stack_bytes}B; tried "
+                          + "; ".join(tried), None)
+
+
+def _describe(options: Dict[str, Any]) -> str:
+    if options.get("quantize"):
+        return options["quantize"]
+    parts = [options.get("weight_dtype", "float32")]
+    if not options.get("fold_scaler", True):
+        parts.append("raw-scaler")
+    if options.get("merge_thresholds"):
+        parts.append("merged-thresholds")
+    return "+".join(parts)
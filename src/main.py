@@ -1,61 +1,536 @@
 import os
+import re
 import sys
 import argparse
-from typing import Optional
-from logger.custom_logger import CustomLogger
+import contextlib
+import numpy as np
+from typing import Any, Dict, List, Optional
+from logger.custom_logger import CustomLogger, configure_logging
 from exception.custom_exception import CustomException
 from src.utils import generate_clean_header_name, ensure_dir, detect_linear_model_kind
-from src.converter.linear import LinearConverter
+from src.converter.factory import load_converter
+from src.converter.tree import TreeEnsembleConverter
+from src.converter.mlp import MLPConverter
+from src.converter.pipeline import PipelineConverter
+from src.converter.cformat import render, render_skeleton, write_parts
+from src.converter.bundle import ModelBundle, DEFAULT_BUNDLE_NAME
 from src.validators.linear_validation import validate_linear_model_exported
-import warnings
-from sklearn.exceptions import InconsistentVersionWarning
-
-warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
+from src.validators.tree_validation import validate_tree_model_exported
+from src.validators.mlp_validation import validate_mlp_model_exported
+from src.validators.pipeline_validation import (iter_raw_chunks, validate_preprocess_exported,
+                                                validate_quadratic_exported)
+from src.validators.c_harness import differential_validate
+from src.bulk import collect_model_paths, convert_many
+from src.watch import ModelWatcher, DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL
+from src.cache import ConversionCache, materialize_header, DEFAULT_MAX_BYTES
+from src.footprint import estimate_footprint, fit_to_budget
+from src.runtime.reference import HeaderRuntime, compare_with_sklearn
+from src.profiling import StageTimer, profile_session
 
 
 logger = CustomLogger().get_logger(__name__)
 
-def convert_model(model_path: str, output_dir: str = "./generated", validate: bool = True) -> str:
+def convert_model(model_path: str, output_dir: str = "./generated", validate: bool = True,
+                  export_options: Optional[Dict[str, Any]] = None,
+                  cache: Optional[ConversionCache] = None, validate_c: bool = False,
+                  validation_options: Optional[Dict[str, Any]] = None,
+                  budget: Optional[Dict[str, int]] = None, validate_reference: bool = False,
+                  profile_dir: Optional[str] = None, mmap_mode: Optional[str] = None,
+                  stable_name: bool = False, header_base: Optional[str] = None) -> str:
+    """Convert one pickled model to a C header.
+
+    The converter is picked from the estimator type (linear, tree ensemble or MLP;
+    pipelines with more preprocessing than one scaler get a ``PipelineConverter``)
+    and ``export_options`` is forwarded verbatim to its ``convert_to_c``
+    (e.g. ``{"batch": True}``). With a ``cache``, an unchanged model file (or a
+    re-pickled model with identical parameters) reuses the previously emitted
+    header under its original file name instead of writing a new one.
+
+    ``validation_options`` is forwarded to ``validate_linear_model_exported``
+    (``X`` array or ``.npy`` path, ``n_samples``, ``chunk_size``), which for a
+    linear model replays the emitted header tables rather than ``coef_``.
+
+    ``validate_c`` additionally compiles the emitted header with the local C
+    compiler and compares it against sklearn over thousands of rows.
+    ``validate_reference`` replays the header constants of a linear model in
+    float32 NumPy (``src.runtime.reference``) and compares against float64
+    sklearn, over the same rows as ``validation_options`` (default: 1M
+    synthetic rows), without needing a compiler.
+
+    Every conversion logs a footprint report (const table bytes, peak stack,
+    ops per inference). With ``budget`` (``flash_bytes``/``stack_bytes``) the
+    most precise export variant that fits is picked automatically.
+
+    Every conversion also logs a ``Conversion profile`` record with the wall
+    time of each stage (cache lookup, joblib load, ``unwrap_pipeline``, emit,
+    file write, validation), the header bytes emitted and the peak RSS. With
+    ``profile_dir`` the whole conversion runs under cProfile and tracemalloc
+    (see ``src.profiling.profile_session``) and the profile also reports the
+    peak Python allocations of each stage.
+
+    ``model_path`` may also be a parameter-only ``.npz`` written by
+    ``src.params.save_params``, which is read without unpickling;
+    ``mmap_mode`` memory-maps the arrays of a joblib pickle (see
+    ``src.utils.load_model``).
+
+    ``stable_name`` names the header after the model path only
+    (``{base}.h``), so every reconversion of a model file overwrites the
+    same header (``--watch``).
+    ``header_base`` replaces the file-name stem taken from the model's file
+    name (``convert_many`` uses it to keep same-named files in different
+    directories apart).
+    """
+    if profile_dir is not None:
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        with profile_session(profile_dir, name):
+            return _convert_model(model_path, output_dir, validate, export_options, cache, validate_c,
+                                  validation_options, budget, validate_reference, mmap_mode, stable_name,
+                                  header_base)
+    return _convert_model(model_path, output_dir, validate, export_options, cache, validate_c,
+                          validation_options, budget, validate_reference, mmap_mode, stable_name, header_base)
+
+
+def _convert_model(model_path: str, output_dir: str, validate: bool, export_options: Optional[Dict[str, Any]],
+                   cache: Optional[ConversionCache], validate_c: bool, validation_options: Optional[Dict[str, Any]],
+                   budget: Optional[Dict[str, int]], validate_reference: bool, mmap_mode: Optional[str],
+                   stable_name: bool = False, header_base: Optional[str] = None) -> str:
     logger.info("Starting conversion: %s", model_path)
+    timer = StageTimer()
+    export_options = dict(export_options or {})
+    validation_options = dict(validation_options or {})
+    cache_options = dict(export_options, validate=validate, validate_c=validate_c,
+                         validation_options=validation_options, budget=budget,
+                         validate_reference=validate_reference)
+    # the cache shares C code between identical models; names always come from this model path
+    naming = {"stable_name": stable_name, "header_base": header_base}
 
     try:
-        converter = LinearConverter(model_path)
-        converter.load()
+        file_key = None
+        if cache is not None:
+            with timer.stage("cache_lookup"):
+                file_key = cache.file_key(model_path, cache_options)
+                param_key = cache.lookup_file(file_key)
+                c_code = cache.lookup_params(param_key) if param_key is not None else None
+                file_name = cache.lookup_name(model_path, param_key, naming) if c_code is not None else None
+            if file_name is not None:
+                out_path = materialize_header(output_dir, file_name, c_code)
+                logger.info("Cache hit (model file unchanged): %s", out_path)
+                logger.info("Conversion profile", model=model_path, profile=timer.report())
+                return out_path
+
+        converter = load_converter(model_path, timer=timer, mmap_mode=mmap_mode)
 
         model_type = detect_linear_model_kind(converter.model)
         logger.info("Auto-detected model type: %s", model_type)
 
-        c_code = converter.convert_to_c(func_name="predict_model")
+        param_key = None
+        if cache is not None:
+            with timer.stage("cache_lookup"):
+                param_key = cache.param_key(converter.model, converter.scaler, cache_options)
+                c_code = cache.lookup_params(param_key)
+            if c_code is not None:
+                cache.link(file_key, param_key)
+                file_name = cache.lookup_name(model_path, param_key, naming) or generate_clean_header_name(
+                    converter.model, converter.raw_model, model_path, timestamp=not stable_name,
+                    base_name=header_base)
+                cache.store_name(model_path, param_key, file_name, naming)
+                out_path = materialize_header(output_dir, file_name, c_code)
+                logger.info("Cache hit (model parameters unchanged): %s", out_path)
+                logger.info("Conversion profile", model=model_path, profile=timer.report())
+                return out_path
+
+        export_options = export_options_for(converter, export_options)
+        with timer.stage("emit"):
+            if budget:
+                c_code, export_options, footprint = fit_to_budget(converter, export_options,
+                                                                  func_name="predict_model", **budget)
+                parts = [c_code]
+            else:
+                # constant tables stay unformatted until they are streamed to the file
+                parts = converter.emit_parts(func_name="predict_model", **export_options)
+                footprint = estimate_footprint(render_skeleton(parts), converter.op_counts())
+        logger.info("Footprint", footprint=footprint)
 
-        ensure_dir(output_dir)
-        file_name = generate_clean_header_name(converter.model,converter.raw_model, model_path)
+        file_name = generate_clean_header_name(converter.model, converter.raw_model, model_path,
+                                               timestamp=not stable_name, base_name=header_base)
         out_path = os.path.join(output_dir, file_name)
+        ensure_dir(out_path)
+
+        with timer.stage("write"), open(out_path, "w", encoding="utf-8") as f:
+            # the header is ASCII: characters written == bytes on disk
+            timer.bytes_emitted = write_parts(parts, f)
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(c_code)
+        logger.info("Saved C header: %s (%d bytes)", out_path, timer.bytes_emitted)
+        # the full text is only built when a later step needs it
+        if validate or validate_c or validate_reference or cache is not None:
+            with timer.stage("render"):
+                c_code = render(parts)
+        else:
+            c_code = None
 
-        logger.info("Saved C header: %s", out_path)
+        # a compiled pipeline is validated through the estimator's own converter
+        inner = getattr(converter, "inner", converter)
+        is_tree = isinstance(inner, TreeEnsembleConverter)
+        is_mlp = isinstance(inner, MLPConverter)
+        quantized = getattr(inner, "quantized", None)
+        lossy = quantized is not None or export_options.get("weight_dtype", "float32") != "float32"
+        # an approximate expf inside hidden layers compounds through the following layers
+        lossy = lossy or (is_mlp and export_options.get("exp_impl", "libm") != "libm")
 
         if validate:
             logger.info("Running Python-only validation…")
-            validate_linear_model_exported(estimator=converter.model, scaler=converter.scaler)
-            logger.info("Validation passed.")
+            with timer.stage("validate"):
+                report = _validate_python(converter, export_options, validation_options, c_code)
+            logger.info("Validation passed.", report=report)
 
+        if validate_c:
+            logger.info("Running compiled-C differential validation…")
+            if is_tree:
+                output = "label" if inner.flat.post != "identity" else None
+            else:
+                output = "label" if is_mlp and inner.net.output == "softmax" else None
+            with timer.stage("validate_c"):
+                report = differential_validate(converter.model, converter.scaler, c_code,
+                                               func_name="predict_model", strict=not lossy, output=output)
+            logger.info("Compiled-C validation passed.", report=report)
+
+        if validate_reference and not (is_tree or is_mlp or inner is not converter):
+            logger.info("Running float32 reference-runtime validation…")
+            ref_options = {k: v for k, v in validation_options.items() if v is not None}
+            ref_options.setdefault("n_samples", 1_000_000)
+            with timer.stage("validate_reference"):
+                report = compare_with_sklearn(HeaderRuntime(c_code), converter.model, converter.scaler,
+                                              **ref_options)
+            if not lossy and (report["max_rel_error"] > 1e-3 or report["mismatch_rate"] > 1e-3):
+                raise CustomException(f"float32 reference runtime deviates from sklearn: {report}", None)
+            logger.info("Reference-runtime validation passed.", report=report)
+
+        if cache is not None:
+            with timer.stage("cache_store"):
+                cache.store(file_key, param_key, c_code)
+                cache.store_name(model_path, param_key, file_name, naming)
+
+        logger.info("Conversion profile", model=model_path, profile=timer.report())
         return out_path
 
     except Exception as e:
         logger.exception("Conversion failed")
         raise CustomException(f"Model conversion failed: {e}", sys)
 
+# export options the tree and MLP converters understand; linear converters take all but merge_thresholds
+TREE_EXPORT_OPTIONS = ("batch", "merge_thresholds")
+MLP_EXPORT_OPTIONS = ("batch", "proba", "exp_impl")
+_OPTION_DEFAULTS = {"fold_scaler": True, "weight_dtype": "float32", "exp_impl": "libm", "quant_granularity": "tensor"}
+
+
+def _option_set(key: str, value: Any) -> bool:
+    """Whether an option asks for something beyond the default export."""
+    if key in _OPTION_DEFAULTS:
+        return value != _OPTION_DEFAULTS[key]
+    if value is None or isinstance(value, (int, float, str)):
+        return bool(value)
+    return True  # calibration rows
+
+
+def export_options_for(converter: Any, export_options: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of ``export_options`` the converter of ``converter``'s estimator supports.
+
+    Options meant for other model families (``--weight-dtype`` for a tree,
+    ``--merge-thresholds`` for a linear model, ``--keep-scaler`` for models
+    that always fold the scaler, ...) are dropped with a warning, so one set
+    of CLI options works across a mixed model directory.
+    """
+    inner = getattr(converter, "inner", converter)
+    if isinstance(inner, TreeEnsembleConverter):
+        supported = set(TREE_EXPORT_OPTIONS)
+    elif isinstance(inner, MLPConverter):
+        supported = set(MLP_EXPORT_OPTIONS)
+    else:
+        supported = set(export_options) - {"merge_thresholds"}
+    options = {key: v for key, v in export_options.items() if key in supported}
+    dropped = sorted(key for key, v in export_options.items() if key not in supported and _option_set(key, v))
+    if dropped:
+        logger.warning("Ignoring export options not supported for %s: %s", type(converter.model).__name__,
+                       ", ".join(dropped))
+    return options
+
+
+def _validate_python(converter: Any, export_options: Dict[str, Any], validation_options: Dict[str, Any],
+                     c_code: Optional[str] = None) -> Dict[str, Any]:
+    """Python-side validation; a linear model's ``c_code`` is replayed from its emitted tables."""
+    if isinstance(converter, PipelineConverter):
+        return _validate_pipeline(converter, export_options, validation_options)
+    if isinstance(converter, TreeEnsembleConverter):
+        return validate_tree_model_exported(converter.model, converter.flat, scaler=converter.scaler,
+                                            **validation_options)
+    if isinstance(converter, MLPConverter):
+        return validate_mlp_model_exported(converter.model, converter.net, scaler=converter.scaler,
+                                           **validation_options)
+    return validate_linear_model_exported(estimator=converter.model, scaler=converter.scaler,
+                                          quantized=getattr(converter, "quantized", None),
+                                          quant_samples=export_options.get("calibration_data"),
+                                          sparse=getattr(converter, "sparse", None),
+                                          exp_impl=export_options.get("exp_impl"), header=c_code,
+                                          **validation_options)
+
+
+def _validate_pipeline(converter: PipelineConverter, export_options: Dict[str, Any],
+                       validation_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Compiled preprocessing against sklearn, then the estimator's export on sklearn's preprocessed rows."""
+    rows = {k: validation_options[k] for k in ("X", "n_samples", "chunk_size") if k in validation_options}
+    report: Dict[str, Any] = {"preprocess": validate_preprocess_exported(converter.scaler, **rows)}
+    if converter.quadratic is not None:
+        report["estimator"] = validate_quadratic_exported(converter.model, converter.scaler, converter.quadratic,
+                                                          **rows)
+        return report
+
+    inner_options = dict(export_options)
+    if export_options.get("calibration_data") is not None:
+        inner_options["calibration_data"] = converter.scaler.transform(export_options["calibration_data"])
+    report["estimator"] = []
+    for X_chunk in iter_raw_chunks(converter.scaler, **rows):
+        chunk_options = dict(validation_options, X=converter.scaler.transform(X_chunk))
+        report["estimator"].append(_validate_python(converter.inner, inner_options, chunk_options))
+    return report
+
+
+def bundle_member_name(model_path: str) -> str:
+    """C identifier for a bundle member from its file name: ``models/Churn-v2.pkl`` -> ``churn_v2``."""
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    name = re.sub(r"\W+", "_", stem).strip("_").lower() or "model"
+    return f"m_{name}" if name[0].isdigit() else name
+
+
+def convert_bundle(model_paths: List[str], output_dir: str = "./generated", bundle_name: str = DEFAULT_BUNDLE_NAME,
+                   validate: bool = True, export_options: Optional[Dict[str, Any]] = None,
+                   validate_c: bool = False, validation_options: Optional[Dict[str, Any]] = None,
+                   mmap_mode: Optional[str] = None) -> str:
+    """Convert several models into one ``<bundle_name>.h`` (see ``ModelBundle``).
+
+    Members are named after their files and all get ``export_options``
+    (options a converter does not take, e.g. ``weight_dtype`` for trees, are
+    dropped for it; trees always fold their scaler). ``batch`` adds ``<bundle_name>_predict_batch``. The file
+    name has no timestamp, so firmware can include it by a fixed name.
+    Stage timings are logged as for ``convert_model``, summed over members.
+    """
+    logger.info("Starting bundle conversion: %d models -> %s", len(model_paths), bundle_name)
+    timer = StageTimer()
+    export_options = dict(export_options or {})
+    validation_options = dict(validation_options or {})
+    batch = bool(export_options.pop("batch", False))
+
+    try:
+        bundle = ModelBundle(bundle_name)
+        names = set()
+        for path in model_paths:
+            name = base = bundle_member_name(path)
+            k = 2
+            while name in names:
+                name, k = f"{base}_{k}", k + 1
+            names.add(name)
+            converter = load_converter(path, timer=timer, mmap_mode=mmap_mode)
+            bundle.add(name, converter, **export_options_for(converter, export_options))
+
+        with timer.stage("emit"):
+            parts = bundle.emit_parts(batch=batch)
+            footprint = estimate_footprint(render_skeleton(parts), bundle.op_counts())
+        logger.info("Footprint", footprint=footprint)
+
+        out_path = os.path.join(output_dir, f"{bundle_name}.h")
+        ensure_dir(out_path)
+        with timer.stage("write"), open(out_path, "w", encoding="utf-8") as f:
+            timer.bytes_emitted = write_parts(parts, f)
+        logger.info("Saved bundle header: %s (%d bytes)", out_path, timer.bytes_emitted)
+
+        c_code = render(parts) if validate_c else None
+        for member in bundle.members:
+            converter = member.converter
+            if validate:
+                with timer.stage("validate"):
+                    report = _validate_python(converter, member.export_options, validation_options)
+                logger.info("Validation passed.", member=member.name, report=report)
+            if validate_c:
+                accessor, func = bundle.accessor_c(member.name)
+                inner = getattr(converter, "inner", converter)
+                lossy = (getattr(inner, "quantized", None) is not None
+                         or member.export_options.get("weight_dtype", "float32") != "float32"
+                         or (isinstance(inner, MLPConverter)
+                             and member.export_options.get("exp_impl", "libm") != "libm"))
+                with timer.stage("validate_c"):
+                    report = differential_validate(converter.model, converter.scaler, c_code + "\n" + accessor,
+                                                   func_name=func, strict=not lossy,
+                                                   output="label" if member.return_type == "int" else None)
+                logger.info("Compiled-C validation passed.", member=member.name, report=report)
+        logger.info("Conversion profile", bundle=bundle_name, profile=timer.report())
+        return out_path
+
+    except Exception as e:
+        logger.exception("Bundle conversion failed")
+        raise CustomException(f"Bundle conversion failed: {e}", sys)
+
+
 def cli_entry(argv: Optional[list] = None) -> None:
-    parser = argparse.ArgumentParser(prog="model2c", description="Convert sklearn linear/pipeline .pkl into C header (.h)")
-    parser.add_argument("--model", "-m", required=True, help="Path to model .pkl")
+    parser = argparse.ArgumentParser(prog="model2c", description="Convert sklearn linear/tree/MLP/pipeline .pkl into C header (.h)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--model", "-m", help="Path to model .pkl (or parameter-only .npz, see src.params)")
+    source.add_argument("--model-dir", help="Convert every model in this directory (see --pattern) in parallel")
+    parser.add_argument("--pattern", default="*.pkl", help="Glob for --model-dir (default: *.pkl)")
+    parser.add_argument("--recursive", action="store_true", help="Search --model-dir recursively")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --model-dir (default: CPU count; half the cores, at most 4, with --watch)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate the header of every model in --model-dir that changes")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="--watch: seconds a model file must stay unchanged before it is converted")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="--watch: rescan interval when inotify is unavailable or disabled")
+    parser.add_argument("--no-inotify", action="store_true", help="--watch: always poll the directory")
+    parser.add_argument("--bundle", default=None, metavar="NAME",
+                        help="With --model-dir: emit every model into one NAME.h with namespaced symbols and shared tables")
+    parser.add_argument("--manifest", default=None, help="Manifest path for --model-dir (default: <out>/manifest.json)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Memory-map the NumPy arrays of joblib pickles instead of reading them into memory")
     parser.add_argument("--out", "-o", default="./generated", help="Output directory")
     parser.add_argument("--no-validate", action="store_true", help="Skip python-side validation")
+    parser.add_argument("--validate-c", action="store_true",
+                        help="Compile the header with the local C compiler and compare it against sklearn")
+    parser.add_argument("--validate-float32", action="store_true",
+                        help="Replay the header constants in float32 NumPy and compare against sklearn (linear models)")
+    parser.add_argument("--validation-data", default=None,
+                        help="Real input rows (.npy, memory-mapped) to validate on instead of synthetic rows")
+    parser.add_argument("--validation-samples", type=int, default=4096,
+                        help="Synthetic validation rows when --validation-data is not given")
+    parser.add_argument("--validation-chunk", type=int, default=65536, help="Rows per validation chunk")
+    parser.add_argument("--batch", action="store_true", help="Also emit predict_model_batch() for row-major input windows")
+    parser.add_argument("--keep-scaler", action="store_true",
+                        help="Emit raw SCALER_* arrays and scale at run time instead of folding into the weights")
+    parser.add_argument("--quantize", choices=["int8", "int16"], default=None,
+                        help="Emit fixed-point weights with int32 accumulators (requires --calibration)")
+    parser.add_argument("--quant-granularity", choices=["tensor", "class"], default="tensor",
+                        help="One weight scale for the whole model or one per class")
+    parser.add_argument("--calibration", default=None, help="Path to .npy of raw input rows used to calibrate --quantize")
+    parser.add_argument("--weight-dtype", choices=["float32", "float16"], default="float32",
+                        help="Storage type of float weight tables (float16 halves flash)")
+    parser.add_argument("--sparse", choices=["auto", "on", "off"], default="auto",
+                        help="Store only nonzero weights (index/value, CSR for multiclass); auto uses --sparse-threshold")
+    parser.add_argument("--sparse-threshold", type=float, default=None,
+                        help="auto: go sparse when at most this fraction of weights is nonzero (default: 0.25)")
+    parser.add_argument("--proba", action="store_true",
+                        help="Multiclass: also emit predict_model_proba() with softmax probabilities")
+    parser.add_argument("--top-k", type=int, default=0, help="Multiclass: also emit predict_model_topk() for the K best classes")
+    parser.add_argument("--exp", choices=["libm", "poly", "lut"], default="libm",
+                        help="expf used for softmax/sigmoid: libm, or a cheaper libm-free polynomial / lookup table")
+    parser.add_argument("--flash-budget", type=int, default=None,
+                        help="Bytes of const tables allowed; picks float32/float16/int8 and folding to fit")
+    parser.add_argument("--stack-budget", type=int, default=None, help="Bytes of stack allowed per inference")
+    parser.add_argument("--merge-thresholds", action="store_true",
+                        help="Tree ensembles: store each distinct split threshold once to cut flash size")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse headers of unchanged models from this content-addressed cache directory")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Evict least-recently-used cached headers beyond this size")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="DIR",
+                        help="Dump cProfile (.prof) and tracemalloc (.alloc.txt) data per model to DIR (default: --out)")
+    parser.add_argument("--log-level", default=None, help="DEBUG, INFO, WARNING or ERROR (default: $AUTOEDGE_LOG_LEVEL or INFO)")
+    parser.add_argument("--no-log-file", action="store_true", help="Log to the console only; do not create logs/")
+    parser.add_argument("--log-queue", action="store_true",
+                        help="Write log records from a background thread so conversion never waits on log I/O")
     args = parser.parse_args(argv)
 
+    configure_logging(level=args.log_level, log_file=False if args.no_log_file else None,
+                      use_queue=True if args.log_queue else None)
+
+    validation_options = {"X": args.validation_data, "n_samples": args.validation_samples,
+                          "chunk_size": args.validation_chunk}
+
+    cache = None
+    if args.cache_dir:
+        cache = ConversionCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+    export_options = {"batch": args.batch, "fold_scaler": not args.keep_scaler}
+    if args.merge_thresholds:
+        export_options["merge_thresholds"] = True
+    if args.weight_dtype != "float32":
+        export_options["weight_dtype"] = args.weight_dtype
+    if args.sparse != "auto":
+        export_options["sparse"] = args.sparse == "on"
+    if args.sparse_threshold is not None:
+        export_options["sparse_threshold"] = args.sparse_threshold
+    if args.proba:
+        export_options["proba"] = True
+    if args.top_k:
+        export_options["top_k"] = args.top_k
+    if args.exp != "libm" or args.proba or args.top_k:
+        # also turns on the probability error report of the validator
+        export_options["exp_impl"] = args.exp
+    mmap_mode = "r" if args.mmap else None
+    profile_dir = None
+    if args.profile is not None:
+        profile_dir = args.profile or args.out
+    budget = None
+    if args.flash_budget is not None or args.stack_budget is not None:
+        budget = {"flash_bytes": args.flash_budget, "stack_bytes": args.stack_budget}
+    if args.quantize:
+        export_options.update(quantize=args.quantize, quant_granularity=args.quant_granularity,
+                              calibration_data=np.load(args.calibration) if args.calibration else None)
+
+    if args.watch and (not args.model_dir or args.bundle):
+        parser.error("--watch requires --model-dir and does not support --bundle")
+
+    if args.bundle:
+        if not args.model_dir:
+            parser.error("--bundle requires --model-dir")
+        if budget or args.quantize:
+            parser.error("--bundle does not support budgets or --quantize")
+        try:
+            paths = collect_model_paths(args.model_dir, args.pattern, recursive=args.recursive)
+            with profile_session(profile_dir, args.bundle) if profile_dir is not None else contextlib.nullcontext():
+                output_file = convert_bundle(paths, args.out, bundle_name=args.bundle,
+                                             validate=not args.no_validate, export_options=export_options,
+                                             validate_c=args.validate_c, validation_options=validation_options,
+                                             mmap_mode=mmap_mode)
+            print(f"Bundle successful → {output_file}")
+        except Exception as e:
+            logger.exception("Bundle conversion failed")
+            print(f"Bundle conversion failed: {e}")
+        return
+
+    if args.watch:
+        try:
+            watcher = ModelWatcher(args.model_dir, args.out, pattern=args.pattern, recursive=args.recursive,
+                                   debounce=args.debounce, poll_interval=args.poll_interval,
+                                   max_workers=args.workers, use_inotify=not args.no_inotify, cache=cache,
+                                   validate=not args.no_validate, export_options=export_options,
+                                   validate_c=args.validate_c, validation_options=validation_options,
+                                   budget=budget, validate_reference=args.validate_float32,
+                                   profile_dir=profile_dir, mmap_mode=mmap_mode)
+            print(f"Watching {args.model_dir} → {args.out} (Ctrl+C to stop)")
+            watcher.run()
+        except Exception as e:
+            logger.exception("Watch mode failed")
+            print(f"Watch mode failed: {e}")
+        return
+
+    if args.model_dir:
+        try:
+            paths = collect_model_paths(args.model_dir, args.pattern, recursive=args.recursive)
+            manifest = convert_many(paths, args.out, validate=not args.no_validate, export_options=export_options,
+                                    max_workers=args.workers, manifest_path=args.manifest, cache=cache,
+                                    validate_c=args.validate_c, validation_options=validation_options,
+                                    budget=budget, validate_reference=args.validate_float32,
+                                    profile_dir=profile_dir, mmap_mode=mmap_mode)
+            print(f"Converted {len(manifest['outputs'])}/{manifest['total']} models "
+                  f"({len(manifest['failures'])} failed)")
+        except Exception as e:
+            logger.exception("Bulk conversion failed")
+            print(f"Bulk conversion failed: {e}")
+        return
+
     try:
-        output_file = convert_model(args.model, args.out, validate=not args.no_validate)
+        output_file = convert_model(args.model, args.out, validate=not args.no_validate,
+                                    export_options=export_options, cache=cache, validate_c=args.validate_c,
+                                    validation_options=validation_options, budget=budget,
+                                    validate_reference=args.validate_float32, profile_dir=profile_dir,
+                                    mmap_mode=mmap_mode)
         print(f"Conversion successful → {output_file}")
     except Exception as e:
         logger.exception("Conversion failed")
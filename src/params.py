@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import struct
+import zipfile
+import argparse
+import importlib
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from logger.custom_logger import CustomLogger, configure_logging
+from exception.custom_exception import CustomException
+
+logger = CustomLogger().get_logger(__name__)
+
+PARAMS_FORMAT = "autoedge-params/1"
+META_KEY = "__meta__"
+
+# the only classes a parameter file may name: nothing else is ever imported or instantiated
+SAFE_CLASSES = {
+    "sklearn.linear_model": ("LinearRegression", "Ridge", "Lasso", "ElasticNet", "LogisticRegression"),
+    "sklearn.preprocessing": ("StandardScaler", "MinMaxScaler"),
+}
+
+# zip local file header: fixed 30 bytes, then the name and extra field
+_LOCAL_HEADER = 30
+
+
+def _class_path(obj: Any) -> str:
+    cls = type(obj)
+    module = cls.__module__
+    # sklearn classes live in private submodules (sklearn.linear_model._ridge); record the public package
+    for public, names in SAFE_CLASSES.items():
+        if module.startswith(public + ".") and cls.__name__ in names:
+            return f"{public}.{cls.__name__}"
+    raise CustomException(f"{cls.__name__} cannot be stored as parameters (supported: "
+                          f"{', '.join(n for names in SAFE_CLASSES.values() for n in names)})", None)
+
+
+def _resolve_class(path: str) -> type:
+    module, _, name = path.rpartition(".")
+    if name not in SAFE_CLASSES.get(module, ()):
+        raise CustomException(f"Parameter file names a class that is not allowed: {path}", None)
+    return getattr(importlib.import_module(module), name)
+
+
+def _json_params(obj: Any) -> Dict[str, Any]:
+    params = {}
+    for key, value in obj.get_params(deep=False).items():
+        try:
+            json.dumps(value)
+        except TypeError:
+            # e.g. a RandomState: only affects fitting, never prediction
+            continue
+        params[key] = value
+    return params
+
+
+def _fitted_arrays(obj: Any) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Fitted attributes (trailing ``_``) as plain arrays, plus the names that were Python scalars."""
+    arrays, scalars = {}, []
+    for key, value in vars(obj).items():
+        if not key.endswith("_") or key.startswith("_"):
+            continue
+        if isinstance(value, (bool, int, float, np.generic)):
+            scalars.append(key)
+        arr = np.asarray(value)
+        if arr.dtype == object:
+            # class labels / feature names: keep them only if they are all strings
+            if not all(isinstance(v, str) for v in arr.ravel()):
+                raise CustomException(f"Fitted attribute {key} of {type(obj).__name__} is not numeric or text", None)
+            arr = arr.astype(str)
+        arrays[key] = arr
+    return arrays, scalars
+
+
+def _components(obj: Any) -> List[Tuple[str, Any]]:
+    from src.utils import instance_of
+
+    if isinstance(obj, dict):
+        if "model" not in obj:
+            raise CustomException("Saved dict must contain key 'model'", None)
+        steps = [("scaler", obj.get("scaler")), ("model", obj["model"])]
+        return [(name, step) for name, step in steps if step is not None]
+    if instance_of(obj, "sklearn.pipeline", "Pipeline"):
+        # every step is kept: _class_path rejects the ones a parameter file cannot describe
+        return [(name, step) for name, step in obj.steps if step is not None and step != "passthrough"]
+    return [("model", obj)]
+
+
+def _is_bare_model(obj: Any) -> bool:
+    from src.utils import instance_of
+
+    return not isinstance(obj, dict) and not instance_of(obj, "sklearn.pipeline", "Pipeline")
+
+
+def save_params(obj: Any, path: str) -> str:
+    """Write the fitted parameters of a model (or scaler + model pipeline) as an uncompressed ``.npz``.
+
+    Each array is stored as ``<step>.<attribute>`` and the class names,
+    constructor parameters and step order as JSON under ``__meta__``. No
+    pickles are involved, and every array can later be memory-mapped in place.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    steps = []
+    for name, step in _components(obj):
+        class_path = _class_path(step)
+        fitted, scalars = _fitted_arrays(step)
+        steps.append({"name": name, "class": class_path, "params": _json_params(step), "scalars": scalars})
+        for key, arr in fitted.items():
+            arrays[f"{name}.{key}"] = arr
+    meta = {"format": PARAMS_FORMAT, "pipeline": not _is_bare_model(obj), "steps": steps}
+    arrays[META_KEY] = np.array(json.dumps(meta))
+
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    logger.info("Saved parameters: %s (%d arrays)", path, len(arrays) - 1)
+    return path
+
+
+def _read_members(path: str, mmap: bool) -> Dict[str, np.ndarray]:
+    """Arrays of an ``.npz``; stored (uncompressed) numeric members are memory-mapped, not copied."""
+    members = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    members[key] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            f.seek(info.header_offset)
+            header = f.read(_LOCAL_HEADER)
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + _LOCAL_HEADER + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise CustomException(f"{path}: member {key} holds Python objects", None)
+            if mmap and len(shape) > 0 and int(np.prod(shape)) > 0 and dtype.kind != "U":
+                members[key] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran else "C")
+            else:
+                count = int(np.prod(shape)) if shape else 1
+                data = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype, count=count)
+                members[key] = data.reshape(shape, order="F" if fortran else "C")
+    return members
+
+
+def load_params(path: str, mmap: bool = True) -> Any:
+    """Rebuild the estimator (or ``Pipeline``) saved by ``save_params`` without unpickling anything.
+
+    Only the classes in ``SAFE_CLASSES`` can be instantiated. With ``mmap``
+    the arrays stay in the file's page cache (read-only ``np.memmap``) instead
+    of being copied onto the heap.
+    """
+    try:
+        members = _read_members(path, mmap)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        raise CustomException(f"Cannot read parameter file {path}: {e}", sys)
+    if META_KEY not in members:
+        raise CustomException(f"{path} is not a parameter file (no {META_KEY})", None)
+    meta = json.loads(str(members[META_KEY]))
+    if meta.get("format") != PARAMS_FORMAT:
+        raise CustomException(f"Unsupported parameter format {meta.get('format')!r} in {path}", None)
+
+    steps = []
+    for spec in meta["steps"]:
+        step = _resolve_class(spec["class"])(**spec["params"])
+        prefix = spec["name"] + "."
+        for key, arr in members.items():
+            if key.startswith(prefix):
+                attr = key[len(prefix):]
+                setattr(step, attr, arr.item() if attr in spec["scalars"] else arr)
+        steps.append((spec["name"], step))
+    logger.info("Loaded parameters: %s (%s)", path, ", ".join(s["class"].rsplit(".", 1)[1] for s in meta["steps"]))
+
+    if not meta["pipeline"]:
+        return steps[0][1]
+    from sklearn.pipeline import Pipeline
+    return Pipeline(steps)
+
+
+def cli_entry(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="model2c-params",
+                                     description="Convert a pickled model to a parameter-only .npz (no pickle on load)")
+    parser.add_argument("model", help="Path to model .pkl (unpickled here: only run on trusted files)")
+    parser.add_argument("--out", "-o", default=None, help="Output .npz (default: next to the model)")
+    args = parser.parse_args(argv)
+    configure_logging(level="WARNING", log_file=False)
+
+    from src.utils import load_model
+    out = args.out or os.path.splitext(args.model)[0] + ".npz"
+    try:
+        print(f"Saved parameters → {save_params(load_model(args.model), out)}")
+    except Exception as e:
+        logger.exception("Parameter export failed")
+        print(f"Parameter export failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli_entry()
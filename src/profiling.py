@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import contextlib
+from typing import Any, Dict, Iterator, Optional
+from logger.custom_logger import CustomLogger
+
+logger = CustomLogger().get_logger(__name__)
+
+# allocation sites listed in the tracemalloc dump
+TOP_ALLOCATIONS = 25
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water resident set size of this process (``None`` where ``resource`` is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class StageTimer:
+    """Wall time per conversion stage, plus bytes emitted and peak memory.
+
+    ``with timer.stage("emit"): ...`` adds the block's duration to that
+    stage (a stage entered twice accumulates). When ``tracemalloc`` is
+    tracing, the peak of Python allocations made inside each stage (above
+    what was allocated when it started) is recorded too.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.alloc_peaks: Dict[str, int] = {}
+        self.bytes_emitted: Optional[int] = None
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        import tracemalloc
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                self.alloc_peaks[name] = max(self.alloc_peaks.get(name, 0), peak)
+
+    def report(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "bytes_emitted": self.bytes_emitted,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+        if self.alloc_peaks:
+            report["alloc_peak_bytes"] = dict(self.alloc_peaks)
+        return report
+
+
+def stage(timer: Optional[StageTimer], name: str):
+    """``timer.stage(name)``, or a no-op context when there is no timer."""
+    return timer.stage(name) if timer is not None else contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def profile_session(profile_dir: str, name: str) -> Iterator[None]:
+    """Run the block under cProfile and tracemalloc and dump both to ``profile_dir``.
+
+    Writes ``<name>.prof`` (load with ``pstats`` or snakeviz) and
+    ``<name>.alloc.txt`` (the largest allocation sites still alive at the
+    end; per-stage allocation peaks go to the stage report). Both tools slow
+    the conversion down, so stage timings taken under a profile are only
+    comparable with each other.
+    """
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(profile_dir, exist_ok=True)
+    prof_path = os.path.join(profile_dir, f"{name}.prof")
+    alloc_path = os.path.join(profile_dir, f"{name}.alloc.txt")
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(prof_path)
+        snapshot = tracemalloc.take_snapshot()
+        current = tracemalloc.get_traced_memory()[0]
+        if started_tracing:
+            tracemalloc.stop()
+        with open(alloc_path, "w", encoding="utf-8") as f:
+            f.write(f"traced memory still allocated: {current} bytes\n")
+            for entry in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                f.write(f"{entry}\n")
+        logger.info("Profile written", cprofile=prof_path, tracemalloc=alloc_path)
@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from logger.custom_logger import CustomLogger
+from src.utils import fingerprint, file_sha256, generate_clean_header_name
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_MAX_MODELS = 64
+
+
+class RegistryEntry:
+    """One loaded model and the headers already emitted from it, keyed by export options."""
+
+    def __init__(self, content_key: str, model_path: str, converter: Any):
+        self.content_key = content_key
+        self.model_path = model_path
+        self.converter = converter
+        self.headers: Dict[str, Dict[str, Any]] = {}
+        # converters keep per-emit state (e.g. ``quantized``): one emission per model at a time
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """In-memory LRU of parsed models for the conversion service.
+
+    Entries are keyed by the sha256 of the model file. A ``(path, mtime_ns,
+    size)`` index in front of it means an untouched file is never re-read or
+    re-hashed; a touched but byte-identical file re-hashes once and hits the
+    same entry. At most ``max_models`` models stay loaded.
+    """
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS):
+        self.max_models = max_models
+        self._entries: "OrderedDict[str, RegistryEntry]" = OrderedDict()
+        self._stat_index: Dict[str, Tuple[int, int, str]] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def content_key(self, model_path: str) -> str:
+        path = os.path.realpath(model_path)
+        st = os.stat(path)
+        known = self._stat_index.get(path)
+        if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+            return known[2]
+        key = file_sha256(path)
+        self._stat_index[path] = (st.st_mtime_ns, st.st_size, key)
+        return key
+
+    def get(self, model_path: str) -> Tuple[RegistryEntry, bool]:
+        """(entry, hit) for ``model_path``, loading and inserting it on a miss."""
+        from src.converter.factory import load_converter
+
+        key = self.content_key(model_path)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry, True
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        # load outside the registry lock so other models keep being served; concurrent
+        # requests for the same file wait on its load lock and reuse the result
+        with load_lock:
+            with self._lock:
+                entry = self._lookup(key)
+            if entry is not None:
+                return entry, True
+            entry = RegistryEntry(key, model_path, load_converter(model_path))
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self._loading.pop(key, None)
+                while len(self._entries) > self.max_models:
+                    evicted_key, evicted = self._entries.popitem(last=False)
+                    logger.info("ModelRegistry: evicted %s", evicted.model_path)
+                    for path, (_, _, k) in list(self._stat_index.items()):
+                        if k == evicted_key:
+                            del self._stat_index[path]
+        return entry, False
+
+    def _lookup(self, key: str) -> Optional[RegistryEntry]:
+        # caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def header(self, entry: RegistryEntry, export_options: Optional[Dict[str, Any]] = None,
+               func_name: str = "predict_model", validate: bool = True) -> Tuple[Dict[str, Any], bool]:
+        """(header record, hit): emit, footprint and validate once per model and export options."""
+        from src.footprint import estimate_footprint
+
+        export_options = dict(export_options or {})
+        options_key = fingerprint(func_name, export_options, validate)
+        with entry.lock:
+            record = entry.headers.get(options_key)
+            if record is not None:
+                return record, True
+
+            start = time.perf_counter()
+            converter = entry.converter
+            c_code = converter.convert_to_c(func_name=func_name, **export_options)
+            if validate:
+                _validate(converter, export_options)
+            record = {
+                "file_name": generate_clean_header_name(converter.model, converter.raw_model, entry.model_path),
+                "c_code": c_code,
+                "footprint": estimate_footprint(c_code, converter.op_counts()),
+                "emit_seconds": round(time.perf_counter() - start, 4),
+            }
+            entry.headers[options_key] = record
+            return record, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"models": len(self._entries), "max_models": self.max_models,
+                    "hits": self.hits, "misses": self.misses,
+                    "headers": sum(len(e.headers) for e in self._entries.values())}
+
+
+def _validate(converter: Any, export_options: Dict[str, Any]) -> None:
+    # same dispatch (linear, tree, MLP, compiled pipeline) as the CLI
+    from src.main import _validate_python
+
+    _validate_python(converter, export_options, {})
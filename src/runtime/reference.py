@@ -0,0 +1,212 @@
+import re
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Union
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.converter.quantization import INPUT_QMIN, INPUT_QMAX, REQUANT_SHIFT, clamp_rounded_input
+from src.converter.approx import approx_exp
+from src.validators.linear_validation import iter_validation_chunks
+
+logger = CustomLogger().get_logger(__name__)
+
+_TABLE = re.compile(r"^static const (\w+) (\w+)(?:\[(\d+)\])? = \{?\s*([^;{}]*?)\s*\}?;", re.MULTILINE)
+_EXP_CALL = re.compile(r"\b(expf|autoedge_expf_(\w+))\((?:-s|proba\[k\] - m)\)")
+_INT_TYPES = {"int8_t", "uint8_t", "int16_t", "uint16_t", "int32_t", "uint32_t", "int64_t", "uint64_t", "int"}
+
+
+def parse_tables(c_code: str) -> Dict[str, np.ndarray]:
+    """``static const`` tables/scalars of a generated header, typed like the device sees them.
+
+    float literals become float32, integer tables int64, and ``uint16_t``
+    tables marked ``float16 bits`` are decoded to float32.
+    """
+    tables: Dict[str, np.ndarray] = {}
+    for match in _TABLE.finditer(c_code):
+        ctype, name, _, body = match.groups()
+        items = [v.strip() for v in body.split(",") if v.strip()]
+        line_end = c_code.find("\n", match.end())
+        is_half = "float16 bits" in c_code[match.end():line_end if line_end >= 0 else None]
+        if ctype in _INT_TYPES:
+            values = np.array([int(v, 0) for v in items], dtype=np.int64)
+            if is_half:
+                values = values.astype(np.uint16).view(np.float16).astype(np.float32)
+        else:
+            values = np.array([float(v.rstrip("fF")) for v in items], dtype=np.float64).astype(np.float32)
+        tables[name] = values
+    return tables
+
+
+class HeaderRuntime:
+    """Vectorized NumPy executor of a ``LinearConverter`` header.
+
+    The constants are read back from the header text, and ``predict`` replays
+    the emitted C in float32 and in the same order: per-feature scaling (raw
+    ``SCALER_*`` mode), sequential ``s += w[i] * x[i]`` from the bias,
+    ``1 / (1 + expf(-s))`` for logistic models (with the header's exp
+    approximation, if any) and a first-max argmax for multiclass;
+    ``predict_proba`` replays the softmax of ``<func_name>_proba``. Quantized headers are replayed with exact int32 arithmetic.
+    Rows are vectorized; features are looped, which is what keeps the float32
+    summation order identical to the device.
+    """
+
+    def __init__(self, c_code: str, func_name: str = "predict_model"):
+        self.tables = parse_tables(c_code)
+        signature = re.search(rf"^static inline (\w+) {re.escape(func_name)}\(const float", c_code, re.MULTILINE)
+        if signature is None:
+            raise CustomException(f"Entry point {func_name}() not found in header", None)
+        self.returns_label = signature.group(1) == "int"
+        exp_call = _EXP_CALL.search(c_code)
+        self.exp_impl = (exp_call.group(2) or "libm") if exp_call else "libm"
+        self.logistic = exp_call is not None and exp_call.group(0).endswith("(-s)")
+        self.quantized = "INPUT_INV_SCALE" in self.tables
+        self.half_weights = "float16 bits" in c_code
+
+        t = self.tables
+        if self.quantized:
+            w = t["W_Q"] if "W_Q" in t else t["WEIGHTS_Q"]
+            b = t["B_Q"] if "B_Q" in t else t["BIAS_Q"]
+            self.n_features = int(t["INPUT_INV_SCALE"].shape[0])
+            self.weights = w.reshape(-1, self.n_features)
+            self.bias = b
+        elif "WEIGHTS" in t:
+            self.weights = t["WEIGHTS"][None, :]
+            self.bias = t["BIAS"]
+            self.n_features = int(self.weights.shape[1])
+        elif "W_0" in t:
+            n_classes = sum(1 for name in t if re.fullmatch(r"W_\d+", name))
+            self.weights = np.vstack([t[f"W_{c}"] for c in range(n_classes)])
+            self.bias = np.concatenate([t[f"B_{c}"] for c in range(n_classes)])
+            self.n_features = int(self.weights.shape[1])
+        elif "W_MATRIX" in t:
+            # row-major [C][F] weights shared by the single-row and batch entry points
+            self.bias = t["B_VECTOR"]
+            self.weights = t["W_MATRIX"].reshape(self.bias.shape[0], -1)
+            self.n_features = int(self.weights.shape[1])
+        elif "WEIGHT_INDEX" in t or "W_ROW_PTR" in t:
+            # sparse export: keep the (index, value) pairs so the replay skips zeros exactly like the C loop
+            if "W_ROW_PTR" in t:
+                ptr, cols, vals, self.bias = t["W_ROW_PTR"], t["W_COL_INDEX"], t["W_VALUE"], t["B_VECTOR"]
+            else:
+                cols, vals, self.bias = t["WEIGHT_INDEX"], t["WEIGHT_VALUE"], t["BIAS"]
+                ptr = np.array([0, cols.shape[0]])
+            self.rows = [(cols[ptr[c]:ptr[c + 1]], vals[ptr[c]:ptr[c + 1]]) for c in range(ptr.shape[0] - 1)]
+            scaler_table = t.get("SCALER_MEAN", t.get("SCALER_MIN"))
+            self.n_features = int(scaler_table.shape[0]) if scaler_table is not None else int(cols.max()) + 1
+            return
+        else:
+            raise CustomException("Header has no linear weight tables "
+                                  "(WEIGHTS, W_c, W_MATRIX, W_Q or sparse tables)", None)
+        self.rows = [(np.arange(self.n_features), w) for w in self.weights]
+
+    @classmethod
+    def from_file(cls, path: str, func_name: str = "predict_model") -> "HeaderRuntime":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f.read(), func_name=func_name)
+
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        t = self.tables
+        if "SCALER_MEAN" in t:
+            return (X - t["SCALER_MEAN"]) / t["SCALER_SCALE"]
+        if "SCALER_MIN" in t:
+            return X * t["SCALER_SCALE"] + t["SCALER_MIN"]
+        return X
+
+    def _float_scores(self, X: np.ndarray) -> np.ndarray:
+        xs = self._scale(X)
+        scores = np.empty((X.shape[0], len(self.rows)), dtype=np.float32)
+        for c, (cols, w) in enumerate(self.rows):
+            s = np.full(X.shape[0], self.bias[c], dtype=np.float32)
+            for i, w_i in zip(cols.tolist(), w):
+                s += w_i * xs[:, i]
+            scores[:, c] = s
+        return scores
+
+    def _int_scores(self, X: np.ndarray) -> np.ndarray:
+        t = self.tables
+        with np.errstate(over="ignore"):
+            v = clamp_rounded_input(np.floor(X * t["INPUT_INV_SCALE"] + np.float32(0.5))) + t["INPUT_ZERO_POINT"]
+        xq = np.clip(v, INPUT_QMIN, INPUT_QMAX)
+        acc = xq.dot(self.weights.T) + self.bias
+        if "REQUANT_MULT" in t:
+            acc = (acc * t["REQUANT_MULT"]) >> REQUANT_SHIFT
+        return acc
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if not self.quantized:
+            return self._float_scores(X)
+        acc = self._int_scores(X)
+        if self.returns_label:
+            return acc
+        return (np.float32(self.tables["OUTPUT_SCALE"][0]) * acc.astype(np.float32)).astype(np.float32)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """What ``predict_model`` returns for each row: a class index, a probability or a value."""
+        scores = self.decision_function(X)
+        if self.returns_label:
+            return np.argmax(scores, axis=1)
+        s = scores[:, 0]
+        if self.logistic:
+            # libm: float64 exp rounded once, within 1 ulp of expf (bit-exact for the scores themselves)
+            e = approx_exp(self.exp_impl, -s)
+            return np.float32(1) / (np.float32(1) + e)
+        return s
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """(n, C) softmax probabilities as ``<func_name>_proba`` computes them (multiclass headers)."""
+        if not self.returns_label:
+            raise CustomException("predict_proba replays multiclass headers only", None)
+        scores = self.decision_function(X)
+        e = approx_exp(self.exp_impl, scores - scores.max(axis=1, keepdims=True))
+        total = np.zeros(e.shape[0], dtype=np.float32)
+        for k in range(e.shape[1]):
+            total += e[:, k]
+        return e * (np.float32(1) / total)[:, None]
+
+
+def compare_with_sklearn(runtime: HeaderRuntime, estimator: Any, scaler: Optional[Any] = None,
+                         X: Optional[Union[str, np.ndarray]] = None, n_samples: int = 1_000_000,
+                         chunk_size: int = 262_144) -> Dict[str, Any]:
+    """Stream rows through the float32 header runtime and float64 sklearn; report the drift.
+
+    ``max_abs_error``/``max_rel_error`` compare the returned value (regression
+    output or binary probability); ``label_mismatches`` count rows whose
+    predicted class differs from sklearn.
+    """
+    report: Dict[str, Any] = {"n_samples": 0, "max_abs_error": 0.0, "max_rel_error": 0.0,
+                              "label_mismatches": 0, "chunks": 0}
+    start = time.perf_counter()
+    n_features = int(np.asarray(estimator.coef_).shape[-1])
+    for X_chunk in iter_validation_chunks(scaler, n_features, X, n_samples=n_samples, chunk_size=chunk_size):
+        X_chunk = X_chunk.astype(np.float32).astype(np.float64)
+        X_ref = scaler.transform(X_chunk) if scaler is not None else X_chunk
+        try:
+            y_ref = estimator.predict(X_ref)
+        except Exception as e:
+            logger.exception("Estimator.predict failed: %s", e)
+            raise CustomException("Estimator.predict failed during reference comparison", sys)
+        y_dev = runtime.predict(X_chunk)
+
+        if runtime.returns_label:
+            report["label_mismatches"] += int(np.sum(estimator.classes_[y_dev] != y_ref))
+        else:
+            if runtime.logistic:
+                ref = estimator.predict_proba(X_ref)[:, 1]
+                report["label_mismatches"] += int(np.sum(estimator.classes_[(y_dev >= 0.5).astype(int)] != y_ref))
+            else:
+                ref = y_ref
+            err = np.abs(y_dev.astype(np.float64) - ref)
+            denom = np.maximum(np.abs(ref), max(1e-3 * float(np.abs(ref).max()), 1e-6))
+            report["max_abs_error"] = max(report["max_abs_error"], float(err.max()))
+            report["max_rel_error"] = max(report["max_rel_error"], float(np.max(err / denom)))
+        report["n_samples"] += int(X_chunk.shape[0])
+        report["chunks"] += 1
+
+    elapsed = time.perf_counter() - start
+    report["mismatch_rate"] = report["label_mismatches"] / max(report["n_samples"], 1)
+    report["seconds"] = round(elapsed, 4)
+    report["rows_per_second"] = report["n_samples"] / elapsed if elapsed > 0 else float("inf")
+    logger.info("Reference float32 runtime vs sklearn: %s", report)
+    return report
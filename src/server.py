@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from logger.custom_logger import CustomLogger, configure_logging
+from exception.custom_exception import CustomException
+from src._version import __version__
+from src.cache import materialize_header
+from src.registry import ModelRegistry, DEFAULT_MAX_MODELS
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ConversionService:
+    """Long-running conversion daemon: asyncio HTTP front end, thread pool for emission.
+
+    ``POST /convert`` takes JSON ``{"model_path": ..., "export_options": {...},
+    "func_name": "predict_model", "validate": true, "output_dir": null}`` and
+    answers ``{"file_name", "c_code", "footprint", "registry_hit",
+    "header_hit", "seconds"}``. ``GET /health`` and ``GET /stats`` report the
+    registry. Parsed models stay in a ``ModelRegistry``, so repeat requests
+    skip interpreter start-up, unpickling and, for known export options,
+    emission too.
+
+    Emission runs in threads rather than processes because the loaded models
+    live in this process; the event loop itself only parses requests.
+    """
+
+    def __init__(self, registry: Optional[ModelRegistry] = None, max_workers: Optional[int] = None,
+                 validate: bool = True):
+        self.registry = registry or ModelRegistry()
+        self.validate = validate
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="autoedge-convert")
+        self.started = time.time()
+        self.requests = 0
+
+    # conversion
+    def convert_sync(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        model_path = request.get("model_path")
+        if not model_path or not os.path.isfile(model_path):
+            raise CustomException(f"model_path not found: {model_path}", None)
+        export_options = dict(request.get("export_options") or {})
+        if isinstance(export_options.get("calibration_data"), str):
+            import numpy as np
+            export_options["calibration_data"] = np.load(export_options["calibration_data"])
+
+        start = time.perf_counter()
+        entry, registry_hit = self.registry.get(model_path)
+        record, header_hit = self.registry.header(entry, export_options,
+                                                  func_name=request.get("func_name", "predict_model"),
+                                                  validate=bool(request.get("validate", self.validate)))
+        response = dict(record, registry_hit=registry_hit, header_hit=header_hit,
+                        seconds=round(time.perf_counter() - start, 4))
+        if request.get("output_dir"):
+            response["output"] = materialize_header(request["output_dir"], record["file_name"], record["c_code"])
+        return response
+
+    async def convert(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, self.convert_sync, request)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.registry.stats(), version=__version__, requests=self.requests,
+                    uptime_seconds=round(time.time() - self.started, 1))
+
+    # HTTP
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path in ("/health", "/stats"):
+            if method != "GET":
+                return 405, {"error": f"{method} not allowed on {path}"}
+            return 200, dict(self.stats(), status="ok") if path == "/health" else self.stats()
+        if path == "/convert":
+            if method != "POST":
+                return 405, {"error": f"{method} not allowed on {path}"}
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as e:
+                return 400, {"error": f"invalid JSON: {e}"}
+            if not isinstance(request, dict) or "model_path" not in request:
+                return 400, {"error": "expected a JSON object with 'model_path'"}
+            try:
+                return 200, await self.convert(request)
+            except Exception as e:
+                logger.exception("Conversion request failed: %s", request.get("model_path"))
+                message = e.error_message if isinstance(e, CustomException) else str(e)
+                return 500, {"error": message, "model_path": request.get("model_path")}
+        return 404, {"error": f"unknown path {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection (keep-alive) until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                status, payload = await self.route(method.upper(), target.split("?", 1)[0], body)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                    unix_socket: Optional[str] = None) -> asyncio.AbstractServer:
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+            logger.info("Conversion service listening on unix:%s", unix_socket)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            logger.info("Conversion service listening on http://%s:%d", host, server.sockets[0].getsockname()[1])
+        return server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                            unix_socket: Optional[str] = None) -> None:
+        server = await self.start(host, port, unix_socket)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def cli_entry(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="model2c-server", description="Conversion daemon with an in-memory model registry")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-models", type=int, default=DEFAULT_MAX_MODELS, help="Parsed models kept in memory")
+    parser.add_argument("--workers", type=int, default=None, help="Emission threads (default: Python's pool default)")
+    parser.add_argument("--no-validate", action="store_true", help="Skip python-side validation of new headers")
+    parser.add_argument("--log-level", default=None, help="DEBUG, INFO, WARNING or ERROR")
+    parser.add_argument("--log-file", action="store_true", help="Also log to logs/ (console only by default)")
+    args = parser.parse_args(argv)
+
+    configure_logging(level=args.log_level, log_file=None if args.log_file else False, use_queue=True)
+    service = ConversionService(ModelRegistry(args.max_models), max_workers=args.workers,
+                                validate=not args.no_validate)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.exception("Conversion service stopped")
+        raise CustomException(f"Conversion service failed: {e}", sys)
+
+
+if __name__ == "__main__":
+    cli_entry()
@@ -1,53 +1,138 @@
 import os
 import re
+import sys
 import hashlib
 import datetime
 from typing import Any, Tuple, Optional
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.base import RegressorMixin, ClassifierMixin
-from sklearn.linear_model import LinearRegression,Ridge,Lasso,ElasticNet,LogisticRegression
+
+# no sklearn imports here: unpickling a model loads the sklearn modules it needs, and
+# ``instance_of`` only looks at those, keeping CLI startup free of sklearn/scipy
+
+
+def instance_of(obj: Any, module: str, *names: str) -> bool:
+    """``isinstance(obj, module.<name>)`` without importing ``module``.
+
+    An object can only be an instance of a class from ``module`` if that
+    module has already been imported, so an unloaded module means ``False``.
+    """
+    mod = sys.modules.get(module)
+    if mod is None:
+        return False
+    return isinstance(obj, tuple(getattr(mod, name) for name in names))
+
 
 def detect_linear_model_kind(model: Any) -> str:
-    if isinstance(model, LogisticRegression):
+    if instance_of(model, "sklearn.linear_model", "LogisticRegression"):
         n_classes = getattr(model, "classes_", None)
         if n_classes is not None and getattr(n_classes, "shape", (1,))[0] > 2:
             return "multiclass"
         return "classification"
 
-    if isinstance(model, (LinearRegression, Ridge, Lasso, ElasticNet)):
+    if instance_of(model, "sklearn.linear_model", "LinearRegression", "Ridge", "Lasso", "ElasticNet"):
         return "regression"
 
-    if isinstance(model, RegressorMixin):
+    if instance_of(model, "sklearn.base", "RegressorMixin"):
         return "regression"
-    if isinstance(model, ClassifierMixin):
+    if instance_of(model, "sklearn.base", "ClassifierMixin"):
         return "classification"
 
     raise TypeError(f"Unsupported linear model type: {type(model)}")
 
 
 def extract_pipeline_components(obj: Any) -> Tuple[Optional[Any], Any]:
-    if isinstance(obj, Pipeline):
-        scaler = None
-        estimator = None
-        for name, step in obj.steps:
-            if isinstance(step, (StandardScaler, MinMaxScaler)):
-                scaler = step
-            else:
-                estimator = step
-        if estimator is None:
+    """``(scaler, estimator)`` of a model, pipeline or not.
+
+    The estimator is a pipeline's last step. A single StandardScaler/MinMaxScaler
+    before it is returned as the scaler; any other preprocessing comes back
+    as a ``Pipeline`` of all steps before the estimator, which
+    ``src.converter.preprocess`` compiles (no step is ever dropped).
+    """
+    if instance_of(obj, "sklearn.pipeline", "Pipeline"):
+        steps = [(name, step) for name, step in obj.steps if step is not None and step != "passthrough"]
+        if not steps or instance_of(steps[-1][1], "sklearn.preprocessing", "StandardScaler", "MinMaxScaler"):
             raise ValueError("Pipeline does not contain an estimator at the end.")
-        return scaler, estimator
+        estimator = steps[-1][1]
+        preprocessing = steps[:-1]
+        if not preprocessing:
+            return None, estimator
+        if len(preprocessing) == 1 and instance_of(preprocessing[0][1], "sklearn.preprocessing",
+                                                   "StandardScaler", "MinMaxScaler"):
+            return preprocessing[0][1], estimator
+        from sklearn.pipeline import Pipeline
+        return Pipeline(preprocessing), estimator
     return None, obj
 
 unwrap_pipeline = extract_pipeline_components
 
 
 def is_standard_scaler(obj: Any) -> bool:
-    return isinstance(obj, StandardScaler)
+    return instance_of(obj, "sklearn.preprocessing", "StandardScaler")
 
 def is_minmax_scaler(obj: Any) -> bool:
-    return isinstance(obj, MinMaxScaler)
+    return instance_of(obj, "sklearn.preprocessing", "MinMaxScaler")
+
+
+def _hash_update(h: "hashlib._Hash", obj: Any) -> None:
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        h.update(repr(obj).encode("utf-8"))
+    elif hasattr(obj, "dtype") and hasattr(obj, "tobytes"):
+        arr = obj
+        h.update(f"ndarray:{arr.dtype.str}:{arr.shape}".encode("utf-8"))
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode("utf-8"))
+    elif isinstance(obj, dict):
+        h.update(b"dict:")
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode("utf-8"))
+            _hash_update(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"seq:{len(obj)}".encode("utf-8"))
+        for item in obj:
+            _hash_update(h, item)
+    else:
+        # fitted estimator/transformer: class name + fitted attributes (trailing "_")
+        state = obj.__getstate__() if hasattr(obj, "__getstate__") else None
+        if not isinstance(state, dict):
+            h.update(repr(obj).encode("utf-8"))
+            return
+        h.update(f"{type(obj).__module__}.{type(obj).__qualname__}".encode("utf-8"))
+        fitted = {k: v for k, v in state.items() if k.endswith("_") and not k.startswith("_")}
+        _hash_update(h, fitted or state)
+
+
+def fingerprint(*objs: Any) -> str:
+    """Stable sha256 over numbers, strings, arrays, containers and fitted sklearn objects."""
+    h = hashlib.sha256()
+    for obj in objs:
+        _hash_update(h, obj)
+    return h.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_model(path: str, mmap_mode: Optional[str] = None) -> Any:
+    """Load a model file: a joblib pickle, or a parameter-only ``.npz`` (see ``src.params``).
+
+    ``mmap_mode`` (e.g. ``"r"``) memory-maps the NumPy arrays of an
+    uncompressed joblib pickle instead of reading them onto the heap; the
+    pickle itself is still executed, so only load trusted files. ``.npz``
+    parameter files are never unpickled and are always memory-mapped.
+    """
+    if path.lower().endswith(".npz"):
+        from src.params import load_params
+        return load_params(path)
+
+    import joblib
+    import warnings
+    from sklearn.exceptions import InconsistentVersionWarning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", InconsistentVersionWarning)
+        return joblib.load(path, mmap_mode=mmap_mode)
 
 
 def ensure_dir(path: str) -> None:
@@ -59,32 +144,48 @@ def ensure_dir(path: str) -> None:
 def detect_scaler_in_pipeline(pipeline):
     if hasattr(pipeline, "named_steps"):
         for name, step in pipeline.named_steps.items():
-            if isinstance(step, StandardScaler):
+            if is_standard_scaler(step):
                 return "stdscaler"
-            if isinstance(step, MinMaxScaler):
+            if is_minmax_scaler(step):
                 return "minmax"
     return "none"
 
 
 def determine_model_type(model):
-    if isinstance(model, LogisticRegression):
-        if model.multi_class == "multinomial" or model.classes_.shape[0] > 2:
+    if instance_of(model, "sklearn.linear_model", "LogisticRegression"):
+        if getattr(model, "multi_class", None) == "multinomial" or model.classes_.shape[0] > 2:
             return "classification_multiclass"
         
         return "classification_binary"
 
-    if isinstance(model, RegressorMixin):
+    if instance_of(model, "sklearn.base", "RegressorMixin"):
         return "regression"
 
-    if isinstance(model, ClassifierMixin):
+    if instance_of(model, "sklearn.base", "ClassifierMixin"):
+        classes = getattr(model, "classes_", None)
+        if classes is not None and len(classes) > 2:
+            return "classification_multiclass"
         return "classification_binary"
 
     return "other"
 
 
-def generate_clean_header_name(model, raw_model_obj, model_path):
-    base_name = os.path.splitext(os.path.basename(model_path))[0]
-    base_name = re.sub(r"[^a-zA-Z0-9_]", "_", base_name).lower()
+def header_base_name(model_path: str, root: Optional[str] = None) -> str:
+    """Header name stem of a model file: its path relative to ``root`` (default: its
+    own directory) without the extension, lower-cased, other characters as ``_``."""
+    rel = os.path.relpath(model_path, root) if root else os.path.basename(model_path)
+    return re.sub(r"[^a-zA-Z0-9_]", "_", os.path.splitext(rel)[0]).lower()
+
+
+def generate_clean_header_name(model, raw_model_obj, model_path, timestamp=True, base_name=None):
+    """``{base}__{model_type}__{scaler}__{timestamp}.h``, or just ``{base}.h`` with
+    ``timestamp=False``: then the name depends on the model path only, so a
+    retrained model always overwrites its own header, even when its type or
+    scaler changed. ``base_name`` replaces the stem taken from ``model_path``
+    (see ``header_base_name``)."""
+    base_name = base_name or header_base_name(model_path)
+    if not timestamp:
+        return f"{base_name}.h"
 
     model_type = determine_model_type(model)
     scaler_flag = detect_scaler_in_pipeline(raw_model_obj)
@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import shutil
+import ctypes
+import tempfile
+import subprocess
+import numpy as np
+from typing import Any, Dict, Optional
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.utils import detect_linear_model_kind
+from src.validators.linear_validation import synthetic_inputs
+
+logger = CustomLogger().get_logger(__name__)
+
+SHIM_SYMBOL = "autoedge_predict_rows"
+
+_SHIM_TEMPLATE = """#include "model.h"
+
+/* exported, non-inline wrapper so ctypes can drive the static inline entry point */
+void {symbol}(const float *X, int n_rows, int n_features, double *out) {{
+    for (int r = 0; r < n_rows; ++r) {{
+        out[r] = (double){func_name}(X + (long)r * n_features, n_features);
+    }}
+}}
+"""
+
+
+def find_c_compiler() -> Optional[str]:
+    """``$CC`` if set, else the first of cc/gcc/clang on PATH."""
+    candidates = [os.environ["CC"]] if os.environ.get("CC") else ["cc", "gcc", "clang"]
+    for cc in candidates:
+        path = shutil.which(cc)
+        if path:
+            return path
+    return None
+
+
+def compile_header(c_code: str, func_name: str = "predict_model", opt_level: str = "-O2",
+                   compiler: Optional[str] = None) -> ctypes.CDLL:
+    """Compile ``c_code`` (a generated header) into a shared library exposing ``SHIM_SYMBOL``."""
+    compiler = compiler or find_c_compiler()
+    if compiler is None:
+        raise CustomException("No C compiler found (set $CC or install cc)", None)
+
+    workdir = tempfile.mkdtemp(prefix="autoedge_c_")
+    try:
+        with open(os.path.join(workdir, "model.h"), "w", encoding="utf-8") as f:
+            f.write(c_code)
+        shim = os.path.join(workdir, "shim.c")
+        with open(shim, "w", encoding="utf-8") as f:
+            f.write(_SHIM_TEMPLATE.format(symbol=SHIM_SYMBOL, func_name=func_name))
+        lib_path = os.path.join(workdir, "model.so")
+        cmd = [compiler, opt_level, "-shared", "-fPIC", "-o", lib_path, shim, "-lm"]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise CustomException(f"Compiling generated header failed:\n{proc.stderr.strip()}", None)
+
+        lib = ctypes.CDLL(lib_path)
+        fn = getattr(lib, SHIM_SYMBOL)
+        fn.restype = None
+        fn.argtypes = [
+            np.ctypeslib.ndpointer(dtype=np.float32, flags="C_CONTIGUOUS"),
+            ctypes.c_int,
+            ctypes.c_int,
+            np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS"),
+        ]
+        return lib
+    finally:
+        # the loaded library stays mapped after its file is removed
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_compiled(lib: ctypes.CDLL, X: np.ndarray, batch_size: int = 4096) -> np.ndarray:
+    """Evaluate the compiled entry point over ``X`` (raw inputs) in batches."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_rows, n_features = X.shape
+    out = np.empty(n_rows, dtype=np.float64)
+    fn = getattr(lib, SHIM_SYMBOL)
+    for start in range(0, n_rows, batch_size):
+        chunk = np.ascontiguousarray(X[start:start + batch_size])
+        chunk_out = np.empty(chunk.shape[0], dtype=np.float64)
+        fn(chunk, chunk.shape[0], n_features, chunk_out)
+        out[start:start + chunk.shape[0]] = chunk_out
+    return out
+
+
+def differential_validate(estimator: Any, scaler: Optional[Any], c_code: str, func_name: str = "predict_model",
+                          X: Optional[np.ndarray] = None, n_samples: int = 8192, batch_size: int = 4096,
+                          rtol: float = 1e-3, max_mismatch_rate: float = 1e-3, strict: bool = True,
+                          output: Optional[str] = None) -> Dict[str, Any]:
+    """Compile ``c_code``, run it through ctypes and compare against sklearn.
+
+    Reports max abs/rel error of the C outputs (regression value or binary
+    probability) and label mismatches. With ``strict`` a relative error above
+    ``rtol`` or a mismatch rate above ``max_mismatch_rate`` raises.
+    ``output="label"`` marks entry points that return a class index (multiclass
+    models always do).
+    """
+    if hasattr(estimator, "coef_"):
+        n_features = int(np.asarray(estimator.coef_).shape[-1])
+    else:
+        n_features = int(estimator.n_features_in_)
+    if X is None:
+        X = synthetic_inputs(scaler, n_features, n_samples)
+    X = np.asarray(X, dtype=np.float64)
+    # sklearn sees the same float32-representable inputs the C code sees
+    X = X.astype(np.float32).astype(np.float64)
+    X_scaled = scaler.transform(X) if scaler is not None else X
+
+    t0 = time.perf_counter()
+    lib = compile_header(c_code, func_name=func_name)
+    t1 = time.perf_counter()
+    y_c = run_compiled(lib, X, batch_size=batch_size)
+    t2 = time.perf_counter()
+
+    model_type = detect_linear_model_kind(estimator)
+    report: Dict[str, Any] = {"model_type": model_type, "n_samples": int(X.shape[0]),
+                              "compile_seconds": round(t1 - t0, 4), "run_seconds": round(t2 - t1, 4)}
+
+    if model_type == "multiclass" or output == "label":
+        y_ref = estimator.predict(X_scaled)
+        mismatches = int(np.sum(estimator.classes_[y_c.astype(int)] != y_ref))
+    else:
+        if model_type == "classification":
+            ref = estimator.predict_proba(X_scaled)[:, 1]
+            y_ref = estimator.predict(X_scaled)
+            mismatches = int(np.sum(estimator.classes_[(y_c >= 0.5).astype(int)] != y_ref))
+        else:
+            ref = estimator.predict(X_scaled)
+            mismatches = 0
+        abs_err = np.abs(y_c - ref)
+        report["max_abs_error"] = float(abs_err.max())
+        # floor the denominator so outputs that cancel to ~0 don't dominate the relative error
+        denom = np.maximum(np.abs(ref), max(1e-3 * float(np.abs(ref).max()), 1e-6))
+        report["max_rel_error"] = float(np.max(abs_err / denom))
+
+    report["label_mismatches"] = mismatches
+    report["mismatch_rate"] = mismatches / max(int(X.shape[0]), 1)
+    logger.info("C differential validation: %s", report)
+
+    if strict:
+        if report.get("max_rel_error", 0.0) > rtol:
+            raise CustomException(f"Compiled header deviates from sklearn: max rel error "
+                                  f"{report['max_rel_error']:.3g} > {rtol:g}", sys)
+        if report["mismatch_rate"] > max_mismatch_rate:
+            raise CustomException(f"Compiled header label mismatches {mismatches}/{X.shape[0]}", sys)
+    return report
@@ -1,60 +1,179 @@
 import sys
+import time
 import numpy as np
-from typing import Any, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 from logger.custom_logger import CustomLogger
 from exception.custom_exception import CustomException
-from src.utils import detect_linear_model_kind
+from src.utils import detect_linear_model_kind, is_standard_scaler, is_minmax_scaler
+from src.converter.approx import approx_exp
 
 logger = CustomLogger().get_logger(__name__)
 
+# a replayed float32 header may differ from float64 sklearn by rounding only: relative output error
+# (probabilities: absolute) and label mismatch rate; float16 weight tables round more
+HEADER_TOLERANCE = 1e-3
+HALF_HEADER_TOLERANCE = 1e-2
+
 def softmax(z: np.ndarray) -> np.ndarray:
     z = z - np.max(z, axis=1, keepdims=True)
     e = np.exp(z)
     return e / np.sum(e, axis=1, keepdims=True)
 
 
-def validate_linear_model_exported(estimator: Any, scaler: Optional[Any] = None, tolerance: float = 1e-6, n_samples: int = 32) -> None:
-    if estimator is None:
-        raise CustomException("Validator received None estimator", sys)
+def quantization_report(estimator: Any, scaler: Optional[Any], quantized: Any, X: np.ndarray,
+                        y: Optional[np.ndarray] = None, runtime: Optional[Any] = None) -> Dict[str, Any]:
+    """Compare a ``QuantizedLinear`` against the float model on raw inputs ``X``.
 
-    try:
-        if hasattr(estimator, "coef_"):
-            if estimator.coef_.ndim == 1:
-                n_features = int(estimator.coef_.shape[0])
-            else:
-                n_features = int(estimator.coef_.shape[1])
+    Classifiers report how often the quantized and float labels disagree;
+    with ground-truth labels ``y`` also both accuracies and ``accuracy_drop``
+    (float accuracy minus quantized accuracy). With ``runtime`` (a
+    ``HeaderRuntime`` of the quantized header) the emitted tables are
+    measured instead of ``quantized``.
+    """
+    X = np.asarray(X, dtype=float)
+    X_scaled = scaler.transform(X) if scaler is not None else X
+    model_type = detect_linear_model_kind(estimator)
+    report: Dict[str, Any] = {"dtype": quantized.dtype, "granularity": quantized.granularity, "n_samples": int(X.shape[0])}
+
+    if model_type in ("classification", "multiclass"):
+        y_float = estimator.predict(X_scaled)
+        if runtime is None:
+            labels = quantized.predict_labels(X)
+        elif runtime.returns_label:
+            labels = runtime.predict(X)
         else:
-            raise AttributeError("Estimator has no coef_ attribute")
-    except Exception as e:
-        logger.exception("Failed to determine number of features: %s", e)
-        raise CustomException("Failed to determine model input shape", sys)
+            labels = (runtime.decision_function(X)[:, 0] >= 0).astype(int)
+        y_quant = estimator.classes_[labels]
+        agreement = float(np.mean(y_quant == y_float))
+        report["label_agreement"] = agreement
+        report["label_disagreement"] = 1.0 - agreement
+        logger.info("Quantized %s label agreement vs float: %.4f", quantized.dtype, agreement)
+        if y is not None:
+            y = np.asarray(y)
+            report["accuracy_float"] = float(np.mean(y_float == y))
+            report["accuracy_quantized"] = float(np.mean(y_quant == y))
+            report["accuracy_drop"] = report["accuracy_float"] - report["accuracy_quantized"]
+            logger.info("Quantized %s accuracy %.4f vs float %.4f (drop %.4f)", quantized.dtype,
+                        report["accuracy_quantized"], report["accuracy_float"], report["accuracy_drop"])
+    else:
+        y_float = estimator.predict(X_scaled)
+        y_quant = (quantized if runtime is None else runtime).decision_function(X)[:, 0]
+        err = np.abs(y_quant - y_float)
+        spread = float(np.std(y_float)) or 1.0
+        report["max_abs_error"] = float(err.max())
+        report["rel_rmse"] = float(np.sqrt(np.mean(err ** 2)) / spread)
+        logger.info("Quantized %s regression max abs err %g, rmse/std %g",
+                    quantized.dtype, report["max_abs_error"], report["rel_rmse"])
+    return report
+
+
+def probability_report(estimator: Any, X_scaled: np.ndarray, exp_impl: str = "libm",
+                       scores: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Error of the on-device probabilities against ``predict_proba``.
+
+    Replays the emitted softmax (multiclass) or sigmoid (binary) in float32
+    with the header's ``exp_impl``, operation for operation, on float32
+    scores. ``exp_max_rel_error`` is the error of the exp itself over the
+    arguments it saw, so the cost of a cheaper exp is visible on its own.
+    """
+    model_type = detect_linear_model_kind(estimator)
+    if scores is None:
+        scores = X_scaled.dot(np.atleast_2d(estimator.coef_).T) + estimator.intercept_
+    s = np.asarray(scores, dtype=np.float32)
+    if model_type == "multiclass":
+        args = s - s.max(axis=1, keepdims=True)
+        e = approx_exp(exp_impl, args)
+        total = np.zeros(e.shape[0], dtype=np.float32)
+        for k in range(e.shape[1]):
+            total += e[:, k]
+        probs = e * (np.float32(1.0) / total)[:, None]
+        probs_sklearn = estimator.predict_proba(X_scaled)
+        labels = np.argmax(probs, axis=1)
+    else:
+        args = -s[:, 0]
+        e = approx_exp(exp_impl, args)
+        probs = np.float32(1.0) / (np.float32(1.0) + e)
+        probs_sklearn = estimator.predict_proba(X_scaled)[:, 1]
+        labels = (probs >= 0.5).astype(int)
+
+    exact = np.exp(args.astype(np.float64))
+    abs_err = np.abs(probs.astype(np.float64) - probs_sklearn)
+    report = {
+        "exp_impl": exp_impl,
+        "n_samples": int(X_scaled.shape[0]),
+        "max_abs_error": float(abs_err.max()),
+        "mean_abs_error": float(abs_err.mean()),
+        "exp_max_rel_error": float(np.max(np.abs(e - exact) / np.maximum(exact, np.finfo(np.float32).tiny))),
+        "label_mismatches": int(np.sum(estimator.classes_[labels] != estimator.predict(X_scaled))),
+    }
+    logger.info("Probability output (%s exp): max abs err %.3g vs predict_proba", exp_impl, report["max_abs_error"])
+    return report
 
-    rng = np.random.RandomState(0)
-    X = rng.randn(n_samples, n_features).astype(float)
 
-    # apply scaler if provided
-    if scaler is not None:
+def synthetic_inputs(scaler: Optional[Any], n_features: int, n_samples: int, seed: int = 0) -> np.ndarray:
+    """Raw-space rows near the training distribution when a scaler tells us where that is."""
+    if scaler is not None and hasattr(scaler, "sample_inputs"):
+        # compiled preprocessing chains know their raw width and categorical columns
+        return scaler.sample_inputs(n_samples, seed)
+    rng = np.random.RandomState(seed)
+    if scaler is not None and is_standard_scaler(scaler):
+        mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n_features)
+        scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n_features)
+        return mean + scale * rng.randn(n_samples, n_features)
+    if scaler is not None and is_minmax_scaler(scaler):
+        span = scaler.data_max_ - scaler.data_min_
+        return scaler.data_min_ + span * rng.uniform(-0.1, 1.1, size=(n_samples, n_features))
+    return rng.randn(n_samples, n_features)
+
+
+def load_validation_data(X: Union[str, np.ndarray]) -> np.ndarray:
+    """Arrays pass through; ``.npy`` paths are memory-mapped so only touched chunks are read."""
+    if isinstance(X, str):
         try:
-            X_scaled = scaler.transform(X)
+            return np.load(X, mmap_mode="r")
         except Exception as e:
-            logger.exception("Failed to apply scaler in validator: %s", e)
-            raise CustomException("Scaler transform failed", sys)
-    else:
-        X_scaled = X
+            logger.exception("Failed to load validation data %s: %s", X, e)
+            raise CustomException(f"Cannot load validation data: {X}", sys)
+    return X
+
 
+def iter_validation_chunks(scaler: Optional[Any], n_features: int, X: Optional[Union[str, np.ndarray]] = None,
+                           n_samples: int = 4096, chunk_size: int = 65536) -> Iterator[np.ndarray]:
+    """Yield float64 chunks of raw inputs: slices of ``X``, or synthetic rows generated chunk by chunk."""
+    if X is not None:
+        X = load_validation_data(X)
+        if X.ndim != 2 or X.shape[1] != n_features:
+            raise CustomException(f"Validation data must have shape (n, {n_features}), got {X.shape}", None)
+        for start in range(0, X.shape[0], chunk_size):
+            yield np.asarray(X[start:start + chunk_size], dtype=np.float64)
+        return
+
+    for i, start in enumerate(range(0, n_samples, chunk_size)):
+        yield synthetic_inputs(scaler, n_features, min(chunk_size, n_samples - start), seed=i)
+
+
+def _check_chunk(estimator: Any, model_type: str, X_scaled: np.ndarray, tolerance: float,
+                 scores: Optional[np.ndarray] = None, relative: bool = False) -> Tuple[float, int]:
+    """Max output diff and label mismatches of the exported math against sklearn for one chunk.
+
+    ``scores`` (n, C) replaces the dense ``X.W^T + b`` when the header uses
+    another weight layout (e.g. sparse CSR tables) or is replayed. With
+    ``relative`` regression diffs are divided by the output range (at least 1).
+    """
     try:
         y_sklearn = estimator.predict(X_scaled)
     except Exception as e:
         logger.exception("Estimator.predict failed: %s", e)
         raise CustomException("Estimator.predict failed during validation", sys)
 
-    model_type = detect_linear_model_kind(estimator)
-
     # multiclass
     if model_type == "multiclass":
-        W = estimator.coef_ 
-        b = estimator.intercept_
-        logits = X_scaled.dot(W.T) + b
+        if scores is not None:
+            logits = scores
+        else:
+            W = estimator.coef_
+            b = estimator.intercept_
+            logits = X_scaled.dot(W.T) + b
         probs_manual = softmax(logits)
         try:
             probs_sklearn = estimator.predict_proba(X_scaled)
@@ -62,21 +181,19 @@ def validate_linear_model_exported(estimator: Any, scaler: Optional[Any] = None,
             logger.exception("predict_proba failed: %s", e)
             raise CustomException("predict_proba missing during multiclass validation", sys)
         max_diff = float(np.max(np.abs(probs_sklearn - probs_manual)))
-        logger.info("Multiclass softmax max prob diff: %g", max_diff)
         if max_diff > tolerance:
             raise CustomException(f"Softmax probability mismatch: max diff {max_diff:.6g}", sys)
-        y_manual = np.argmax(probs_manual, axis=1)
-        mismatches = int((y_manual != y_sklearn).sum())
-        if mismatches > 0:
-            raise CustomException(f"Multiclass label mismatches {mismatches}/{n_samples}", sys)
-        logger.info("Multiclass validation PASSED")
-        return
+        y_manual = estimator.classes_[np.argmax(probs_manual, axis=1)]
+        return max_diff, int((y_manual != y_sklearn).sum())
 
     # binary logistic
     if model_type == "classification":
-        coef = estimator.coef_.ravel()
-        intercept = float(estimator.intercept_.ravel()[0])
-        logits = X_scaled.dot(coef) + intercept
+        if scores is not None:
+            logits = scores[:, 0]
+        else:
+            coef = estimator.coef_.ravel()
+            intercept = float(estimator.intercept_.ravel()[0])
+            logits = X_scaled.dot(coef) + intercept
         probs_manual = 1.0 / (1.0 + np.exp(-logits))
         try:
             probs_sklearn = estimator.predict_proba(X_scaled)[:, 1]
@@ -84,26 +201,143 @@ def validate_linear_model_exported(estimator: Any, scaler: Optional[Any] = None,
             logger.exception("predict_proba missing: %s", e)
             raise CustomException("predict_proba required for binary logistic validation", sys)
         max_diff = float(np.max(np.abs(probs_sklearn - probs_manual)))
-        logger.info("Binary logistic max prob diff: %g", max_diff)
         if max_diff > tolerance:
             raise CustomException(f"Binary logistic probability mismatch max diff {max_diff:.6g}", sys)
-        y_manual = (probs_manual >= 0.5).astype(int)
-        mismatches = int((y_manual != y_sklearn).sum())
-        if mismatches > 0:
-            raise CustomException(f"Binary label mismatches {mismatches}/{n_samples}", sys)
-        logger.info("Binary logistic validation PASSED")
-        return
+        y_manual = estimator.classes_[(probs_manual >= 0.5).astype(int)]
+        return max_diff, int((y_manual != y_sklearn).sum())
 
     # regression
     if model_type == "regression":
-        coef = estimator.coef_.ravel()
-        intercept = float(estimator.intercept_.ravel()[0])
-        y_manual = X_scaled.dot(coef) + intercept
+        if scores is not None:
+            y_manual = scores[:, 0]
+        else:
+            coef = estimator.coef_.ravel()
+            intercept = float(np.ravel(estimator.intercept_)[0])
+            y_manual = X_scaled.dot(coef) + intercept
         max_diff = float(np.max(np.abs(y_manual - y_sklearn)))
-        logger.info("Regression max diff: %g", max_diff)
+        if relative:
+            max_diff /= max(float(np.max(np.abs(y_sklearn))), 1.0)
         if max_diff > tolerance:
             raise CustomException(f"Regression outputs mismatch: max diff {max_diff:.6g}", sys)
-        logger.info("Regression validation PASSED")
-        return
+        return max_diff, 0
 
     raise CustomException("Unhandled model type in validator", sys)
+
+
+def validate_linear_model_exported(estimator: Any, scaler: Optional[Any] = None, tolerance: float = 1e-6, n_samples: int = 4096,
+                                   quantized: Optional[Any] = None, quant_samples: Optional[np.ndarray] = None,
+                                   quant_labels: Optional[np.ndarray] = None, X: Optional[Union[str, np.ndarray]] = None, chunk_size: int = 65536,
+                                   sparse: Optional[Any] = None, exp_impl: Optional[str] = None,
+                                   header: Optional[str] = None, func_name: str = "predict_model",
+                                   max_mismatch_rate: float = HEADER_TOLERANCE) -> Dict[str, Any]:
+    """Check the exported math against sklearn and return a small report.
+
+    Inputs are ``X`` (an array or a ``.npy`` path, memory-mapped) or
+    ``n_samples`` synthetic rows near the scaler's training distribution. They
+    are streamed ``chunk_size`` rows at a time through ``scaler.transform`` and
+    ``predict``/``predict_proba`` so memory stays bounded; the report carries
+    per-chunk timings.
+
+    When ``quantized`` (a ``QuantizedLinear``) is given, the report also has a
+    ``"quantization"`` entry with the label disagreement against the float
+    model, measured on ``quant_samples`` (e.g. the calibration set) or the
+    first chunk; with ``quant_labels`` (ground truth for ``quant_samples``)
+    also the accuracy drop (see ``quantization_report``).
+
+    When ``sparse`` (a ``SparseLinear``) is given, scores are computed from its
+    CSR tables instead of ``coef_``, so the sparse layout itself is checked;
+    the report gets ``"nnz"`` and ``"density"``.
+
+    With ``exp_impl`` a classifier's report gets a ``"probability"`` entry
+    (see ``probability_report``) measured on the first chunk.
+
+    With ``header`` (the generated C) the emitted constant tables are replayed
+    in float32 by ``HeaderRuntime`` instead, so folding and table-emission
+    bugs fail validation. Replayed outputs must match within
+    ``HEADER_TOLERANCE`` (``HALF_HEADER_TOLERANCE`` for float16 weights;
+    regression relative to the output range) and labels may differ on at
+    most ``max_mismatch_rate`` of rows (near-ties). A quantized header's
+    tables feed the ``"quantization"`` entry.
+    """
+    if estimator is None:
+        raise CustomException("Validator received None estimator", sys)
+
+    try:
+        if hasattr(estimator, "coef_"):
+            if estimator.coef_.ndim == 1:
+                n_features = int(estimator.coef_.shape[0])
+            else:
+                n_features = int(estimator.coef_.shape[1])
+        else:
+            raise AttributeError("Estimator has no coef_ attribute")
+    except Exception as e:
+        logger.exception("Failed to determine number of features: %s", e)
+        raise CustomException("Failed to determine model input shape", sys)
+
+    runtime = None
+    if header is not None:
+        # imported here: the reference runtime itself builds on this module
+        from src.runtime.reference import HeaderRuntime
+        runtime = HeaderRuntime(header, func_name=func_name)
+    replay = runtime is not None and not runtime.quantized
+    if replay:
+        header_tolerance = HALF_HEADER_TOLERANCE if runtime.half_weights else HEADER_TOLERANCE
+        tolerance = max(tolerance, header_tolerance)
+        max_mismatch_rate = max(max_mismatch_rate, header_tolerance)
+
+    model_type = detect_linear_model_kind(estimator)
+    report: Dict[str, Any] = {"model_type": model_type, "n_samples": 0, "max_diff": 0.0,
+                              "label_mismatches": 0, "chunks": [], "header_replayed": runtime is not None}
+    start = time.perf_counter()
+
+    for X_chunk in iter_validation_chunks(scaler, n_features, X, n_samples=n_samples, chunk_size=chunk_size):
+        t0 = time.perf_counter()
+        if runtime is not None:
+            # the header sees float32 inputs, so validate on float32-representable rows
+            X_chunk = X_chunk.astype(np.float32).astype(np.float64)
+        # apply scaler if provided
+        if scaler is not None:
+            try:
+                X_scaled = scaler.transform(X_chunk)
+            except Exception as e:
+                logger.exception("Failed to apply scaler in validator: %s", e)
+                raise CustomException("Scaler transform failed", sys)
+        else:
+            X_scaled = X_chunk
+
+        scores = None
+        if replay:
+            scores = runtime.decision_function(X_chunk).astype(np.float64)
+        elif sparse is not None:
+            scores = sparse.decision_function(X_chunk if sparse.folded else X_scaled)
+        max_diff, mismatches = _check_chunk(estimator, model_type, X_scaled, tolerance, scores, relative=replay)
+        report["n_samples"] += int(X_chunk.shape[0])
+        report["max_diff"] = max(report["max_diff"], max_diff)
+        report["label_mismatches"] += mismatches
+        report["chunks"].append({"rows": int(X_chunk.shape[0]), "max_diff": max_diff,
+                                 "seconds": round(time.perf_counter() - t0, 6)})
+
+        if exp_impl is not None and model_type != "regression" and "probability" not in report:
+            report["probability"] = probability_report(estimator, X_scaled, exp_impl, scores)
+
+        if quantized is not None and "quantization" not in report:
+            report["quantization"] = quantization_report(
+                estimator, scaler, quantized, quant_samples if quant_samples is not None else X_chunk,
+                quant_labels if quant_samples is not None else None,
+                runtime=runtime if runtime is not None and runtime.quantized else None)
+
+    # sklearn against its own parameters agrees exactly; a float32 replay may flip near-ties
+    allowed = max_mismatch_rate * report["n_samples"] if replay else 0
+    if report["label_mismatches"] > allowed:
+        raise CustomException(f"{model_type} label mismatches {report['label_mismatches']}/{report['n_samples']}", sys)
+
+    if sparse is not None:
+        report["nnz"] = sparse.nnz
+        report["density"] = sparse.density
+
+    elapsed = time.perf_counter() - start
+    report["seconds"] = round(elapsed, 6)
+    report["rows_per_second"] = report["n_samples"] / elapsed if elapsed > 0 else float("inf")
+    logger.info("%s validation PASSED: %d rows in %d chunks, max diff %g",
+                model_type, report["n_samples"], len(report["chunks"]), report["max_diff"])
+    return report
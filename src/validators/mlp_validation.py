@@ -0,0 +1,68 @@
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, Optional, Union
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.validators.linear_validation import iter_validation_chunks
+
+logger = CustomLogger().get_logger(__name__)
+
+
+def validate_mlp_model_exported(estimator: Any, net: Any, scaler: Optional[Any] = None, tolerance: float = 1e-4,
+                                max_mismatch_rate: float = 1e-3, n_samples: int = 4096,
+                                X: Optional[Union[str, np.ndarray]] = None, chunk_size: int = 65536) -> Dict[str, Any]:
+    """Re-execute the exported layers (``DenseNetwork``) in float32 and compare against sklearn.
+
+    Regression outputs must agree within ``tolerance`` relative to the output
+    range and class probabilities (``predict_proba``) within ``tolerance``
+    absolute; class labels may differ on at most ``max_mismatch_rate`` of rows
+    (near-ties). Inputs are streamed in chunks like
+    ``validate_linear_model_exported``.
+    """
+    if estimator is None or net is None:
+        raise CustomException("Validator received no estimator or exported network", sys)
+
+    report: Dict[str, Any] = {"model_type": type(estimator).__name__, "n_samples": 0, "max_diff": 0.0,
+                              "label_mismatches": 0, "chunks": []}
+    start = time.perf_counter()
+
+    for X_chunk in iter_validation_chunks(scaler, net.n_features, X, n_samples=n_samples, chunk_size=chunk_size):
+        t0 = time.perf_counter()
+        # the header sees float32 inputs, so validate on float32-representable rows
+        X_chunk = X_chunk.astype(np.float32).astype(np.float64)
+        X_in = scaler.transform(X_chunk) if scaler is not None else X_chunk
+        try:
+            y_sklearn = estimator.predict(X_in)
+            regression = net.output in ("identity", "exp")
+            p_sklearn = None if regression else estimator.predict_proba(X_in)
+        except Exception as e:
+            logger.exception("Estimator.predict failed: %s", e)
+            raise CustomException("Estimator.predict failed during validation", sys)
+
+        if regression:
+            y_net = net.predict(X_chunk)
+            scale = max(float(np.max(np.abs(y_sklearn))), 1.0)
+            max_diff = float(np.max(np.abs(y_net - y_sklearn))) / scale
+            mismatches = 0
+        else:
+            max_diff = float(np.max(np.abs(net.predict_proba(X_chunk) - p_sklearn)))
+            mismatches = int(np.sum(estimator.classes_[net.predict(X_chunk)] != y_sklearn))
+
+        report["n_samples"] += int(X_chunk.shape[0])
+        report["max_diff"] = max(report["max_diff"], max_diff)
+        report["label_mismatches"] += mismatches
+        report["chunks"].append({"rows": int(X_chunk.shape[0]), "max_diff": max_diff,
+                                 "seconds": round(time.perf_counter() - t0, 6)})
+
+    if report["max_diff"] > tolerance:
+        raise CustomException(f"MLP outputs mismatch: max diff {report['max_diff']:.6g}", sys)
+    if report["label_mismatches"] > max_mismatch_rate * report["n_samples"]:
+        raise CustomException(f"MLP label mismatches {report['label_mismatches']}/{report['n_samples']}", sys)
+
+    elapsed = time.perf_counter() - start
+    report["seconds"] = round(elapsed, 6)
+    report["rows_per_second"] = report["n_samples"] / elapsed if elapsed > 0 else float("inf")
+    logger.info("MLP validation PASSED: %d rows, max diff %g, %d label mismatches",
+                report["n_samples"], report["max_diff"], report["label_mismatches"])
+    return report
@@ -0,0 +1,98 @@
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, Iterator, Optional, Union
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.validators.linear_validation import load_validation_data
+
+logger = CustomLogger().get_logger(__name__)
+
+
+def iter_raw_chunks(preprocessing: Any, X: Optional[Union[str, np.ndarray]] = None, n_samples: int = 4096,
+                    chunk_size: int = 65536) -> Iterator[np.ndarray]:
+    """Float32-representable raw rows: slices of ``X`` or ``preprocessing.sample_inputs`` rows, chunk by chunk."""
+    n_inputs = preprocessing.program.n_inputs
+    if X is not None:
+        X = load_validation_data(X)
+        if X.ndim != 2 or X.shape[1] != n_inputs:
+            raise CustomException(f"Validation data must have shape (n, {n_inputs}), got {X.shape}", None)
+        chunks = (X[start:start + chunk_size] for start in range(0, X.shape[0], chunk_size))
+    else:
+        chunks = (preprocessing.sample_inputs(min(chunk_size, n_samples - start), seed=i)
+                  for i, start in enumerate(range(0, n_samples, chunk_size)))
+    for chunk in chunks:
+        # the header sees float32 inputs
+        yield np.asarray(chunk, dtype=np.float32).astype(np.float64)
+
+
+def validate_preprocess_exported(preprocessing: Any, tolerance: float = 1e-4, n_samples: int = 4096,
+                                 X: Optional[Union[str, np.ndarray]] = None,
+                                 chunk_size: int = 65536) -> Dict[str, Any]:
+    """Compare the compiled preprocessing (float32 replay) against sklearn's ``transform``.
+
+    ``preprocessing`` is a ``CompiledPreprocessing``. Each output may differ by
+    ``tolerance`` relative to its magnitude (floored at 1); one-hot
+    indicators must match exactly, which this implies.
+    """
+    program = preprocessing.program
+    report: Dict[str, Any] = {"stages": len(program.stages), "n_inputs": program.n_inputs,
+                              "n_outputs": program.n_outputs, "n_samples": 0, "max_diff": 0.0}
+    start = time.perf_counter()
+    for X_chunk in iter_raw_chunks(preprocessing, X, n_samples, chunk_size):
+        try:
+            ref = preprocessing.transform(X_chunk)
+        except Exception as e:
+            logger.exception("Preprocessing transform failed: %s", e)
+            raise CustomException("Preprocessing transform failed during validation", sys)
+        diff = np.abs(program.transform(X_chunk).astype(np.float64) - ref) / np.maximum(np.abs(ref), 1.0)
+        report["n_samples"] += int(X_chunk.shape[0])
+        report["max_diff"] = max(report["max_diff"], float(diff.max()) if diff.size else 0.0)
+
+    if report["max_diff"] > tolerance:
+        raise CustomException(f"Compiled preprocessing mismatch: max rel diff {report['max_diff']:.6g}", sys)
+    report["seconds"] = round(time.perf_counter() - start, 6)
+    logger.info("Preprocessing validation PASSED: %d rows, %d -> %d values, max rel diff %g",
+                report["n_samples"], program.n_inputs, program.n_outputs, report["max_diff"])
+    return report
+
+
+def validate_quadratic_exported(estimator: Any, preprocessing: Any, qform: Any, tolerance: float = 1e-4,
+                                max_mismatch_rate: float = 1e-3, n_samples: int = 4096,
+                                X: Optional[Union[str, np.ndarray]] = None,
+                                chunk_size: int = 65536) -> Dict[str, Any]:
+    """Compare a linear model folded into a ``QuadraticForm`` against the sklearn pipeline.
+
+    Scores (``decision_function`` for classifiers, ``predict`` for
+    regressors) must agree within ``tolerance`` relative to the score range;
+    labels may differ on at most ``max_mismatch_rate`` of rows (near-ties).
+    """
+    report: Dict[str, Any] = {"model_type": type(estimator).__name__, "n_samples": 0, "max_diff": 0.0,
+                              "label_mismatches": 0}
+    classifier = hasattr(estimator, "classes_")
+    start = time.perf_counter()
+    for X_chunk in iter_raw_chunks(preprocessing, X, n_samples, chunk_size):
+        features = preprocessing.transform(X_chunk)
+        try:
+            ref = estimator.decision_function(features) if classifier else estimator.predict(features)
+        except Exception as e:
+            logger.exception("Estimator scoring failed: %s", e)
+            raise CustomException("Estimator scoring failed during validation", sys)
+        ref = np.asarray(ref, dtype=np.float64).reshape(X_chunk.shape[0], -1)
+        scores = qform.scores(X_chunk).astype(np.float64)
+        scale = max(float(np.max(np.abs(ref))), 1.0)
+        report["max_diff"] = max(report["max_diff"], float(np.max(np.abs(scores - ref))) / scale)
+        if classifier:
+            labels = np.argmax(scores, axis=1) if scores.shape[1] > 1 else (scores[:, 0] > 0).astype(int)
+            report["label_mismatches"] += int(np.sum(estimator.classes_[labels] != estimator.predict(features)))
+        report["n_samples"] += int(X_chunk.shape[0])
+
+    if report["max_diff"] > tolerance:
+        raise CustomException(f"Quadratic form mismatch: max diff {report['max_diff']:.6g}", sys)
+    if report["label_mismatches"] > max_mismatch_rate * report["n_samples"]:
+        raise CustomException(f"Quadratic form label mismatches {report['label_mismatches']}/{report['n_samples']}",
+                              sys)
+    report["seconds"] = round(time.perf_counter() - start, 6)
+    logger.info("Quadratic form validation PASSED: %d rows, max diff %g, %d label mismatches",
+                report["n_samples"], report["max_diff"], report["label_mismatches"])
+    return report
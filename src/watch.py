@@ -0,0 +1,379 @@
+import os
+import sys
+import time
+import errno
+import fnmatch
+import select
+import struct
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from logger.custom_logger import CustomLogger
+from exception.custom_exception import CustomException
+from src.bulk import collect_model_paths, collision_error, header_collisions, _convert_one
+from src.cache import ConversionCache
+from src.utils import file_sha256, header_base_name
+
+logger = CustomLogger().get_logger(__name__)
+
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+# a burst of retrained models must not take every core of the host
+DEFAULT_WATCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+WORKER_NICENESS = 10
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+Snapshot = Tuple[int, int]  # (st_mtime_ns, st_size)
+
+
+def _snapshot(path: str) -> Optional[Snapshot]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PollingSource:
+    """Rescans the model directory every ``interval`` seconds and reports paths whose mtime/size changed."""
+
+    kind = "polling"
+
+    def __init__(self, model_dir: str, pattern: str = "*.pkl", recursive: bool = False,
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        self.model_dir = model_dir
+        self.pattern = pattern
+        self.recursive = recursive
+        self.interval = interval
+        self._seen = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> Dict[str, Snapshot]:
+        seen = {}
+        for path in collect_model_paths(self.model_dir, self.pattern, recursive=self.recursive):
+            snap = _snapshot(path)
+            if snap is not None:
+                seen[path] = snap
+        return seen
+
+    def changes(self, timeout: float) -> Set[str]:
+        wait = max(0.0, min(timeout, self._next_scan - time.monotonic()))
+        time.sleep(wait)
+        if time.monotonic() < self._next_scan:
+            return set()
+        self._next_scan = time.monotonic() + self.interval
+        seen = self._scan()
+        changed = {p for p, snap in seen.items() if self._seen.get(p) != snap}
+        changed |= set(self._seen) - set(seen)
+        self._seen = seen
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    """Linux inotify on the model directory (and its subdirectories with ``recursive``).
+
+    Uses libc through ctypes, so there is no extra dependency; raises
+    ``OSError`` where inotify is unavailable (see ``open_source``).
+    """
+
+    kind = "inotify"
+
+    def __init__(self, model_dir: str, pattern: str = "*.pkl", recursive: bool = False):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "libc has no inotify_init1")
+        self._libc = libc
+        self.model_dir = model_dir
+        self.pattern = pattern
+        self.recursive = recursive
+        self._dirs: Dict[int, str] = {}
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        try:
+            self._add_tree(model_dir)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            import ctypes
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch({directory}): {os.strerror(err)}")
+        self._dirs[wd] = directory
+
+    def _add_tree(self, directory: str) -> Set[str]:
+        """Watch ``directory`` (recursively if configured); returns the model files already in it."""
+        self._add_watch(directory)
+        if not self.recursive:
+            return set()
+        found = set()
+        for root, subdirs, files in os.walk(directory):
+            for d in subdirs:
+                self._add_watch(os.path.join(root, d))
+            found.update(os.path.join(root, f) for f in fnmatch.filter(files, self.pattern))
+        return found
+
+    def changes(self, timeout: float) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[str] = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were lost: treat every model file as touched
+                logger.warning("inotify queue overflow; rescanning %s", self.model_dir)
+                changed.update(collect_model_paths(self.model_dir, self.pattern, recursive=self.recursive))
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.update(self._add_tree(path))
+                    except OSError as e:
+                        logger.warning("Cannot watch new directory %s: %s", path, e)
+                continue
+            if fnmatch.fnmatch(os.path.basename(path), self.pattern):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_source(model_dir: str, pattern: str = "*.pkl", recursive: bool = False, use_inotify: bool = True,
+                poll_interval: float = DEFAULT_POLL_INTERVAL) -> Any:
+    """An ``InotifySource``, or a ``PollingSource`` when inotify is disabled or unavailable."""
+    if use_inotify:
+        try:
+            return InotifySource(model_dir, pattern, recursive=recursive)
+        except OSError as e:
+            logger.warning("inotify unavailable (%s); polling %s every %.1fs", e, model_dir, poll_interval)
+    return PollingSource(model_dir, pattern, recursive=recursive, interval=poll_interval)
+
+
+def _lower_priority() -> None:
+    # worker initializer: conversions yield the CPU to the host's own services
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class ModelWatcher:
+    """Regenerate headers as model files in ``model_dir`` are created or replaced.
+
+    A change is acted on only once the file has stopped changing for
+    ``debounce`` seconds (a retrained model is often written in several
+    chunks). A file whose bytes are unchanged is skipped without loading it;
+    a changed file whose fitted parameters are unchanged is a param-key hit
+    in ``cache`` and its header is left untouched. Each header is named after
+    the model's path relative to ``model_dir`` only (``x/churn.pkl`` ->
+    ``x_churn.h``), so a regenerated header replaces the previous one even
+    when the model's type or scaler changed. Models whose names collide
+    (``x/churn.pkl`` and ``x_churn.pkl``) are reported as failures instead of
+    overwriting each other's header, as in ``convert_many``; once one of them
+    is removed the other is converted.
+
+    At most ``max_workers`` conversions run at once, in niced worker
+    processes (``max_workers=1`` converts in-process). A file that changes
+    again while it is being converted is converted once more afterwards.
+    ``convert_kwargs`` are passed to ``convert_model``.
+    """
+
+    def __init__(self, model_dir: str, output_dir: str = "./generated", pattern: str = "*.pkl",
+                 recursive: bool = False, debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, max_workers: Optional[int] = None,
+                 use_inotify: bool = True, cache: Optional[ConversionCache] = None, **convert_kwargs: Any):
+        if not os.path.isdir(model_dir):
+            raise CustomException(f"Model directory not found: {model_dir}", None)
+        self.model_dir = model_dir
+        self.output_dir = output_dir
+        self.pattern = pattern
+        self.recursive = recursive
+        self.debounce = debounce
+        self.max_workers = max_workers or DEFAULT_WATCH_WORKERS
+        self.convert_kwargs = dict(convert_kwargs, cache=cache if cache is not None else ConversionCache(),
+                                   stable_name=True)
+        self.source = open_source(model_dir, pattern, recursive=recursive, use_inotify=use_inotify,
+                                  poll_interval=poll_interval)
+        self._pool = None
+        if self.max_workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_lower_priority)
+
+        self._pending: Dict[str, Tuple[float, Optional[Snapshot]]] = {}  # path -> (deadline, snapshot)
+        self._ready: List[str] = []
+        self._running: Dict[str, Tuple[Future, str]] = {}  # path -> (future, file digest)
+        self._digests: Dict[str, str] = {}  # last converted file contents
+        self._headers: Dict[str, str] = {}  # last header contents, to report unchanged outputs
+        self._clashes: Dict[str, List[str]] = {}  # path -> models its header name collides with
+
+        # models already in the directory are brought up to date first
+        for path in collect_model_paths(model_dir, pattern, recursive=recursive):
+            self._arm(path, now=0.0)
+        logger.info("Watching %s (%s, %s) with %d worker(s)", model_dir, pattern, self.source.kind,
+                    self.max_workers)
+
+    def _arm(self, path: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._pending[path] = (now + self.debounce, _snapshot(path))
+
+    @property
+    def idle(self) -> bool:
+        """No change is waiting for its debounce, queued or being converted."""
+        return not (self._pending or self._ready or self._running)
+
+    def step(self, timeout: float = DEFAULT_POLL_INTERVAL) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` for changes, start due conversions; returns the finished ones."""
+        now = time.monotonic()
+        if self._pending:
+            timeout = min(timeout, max(0.0, min(d for d, _ in self._pending.values()) - now))
+        if self._running:
+            timeout = min(timeout, 0.05)
+        for path in self.source.changes(timeout):
+            self._arm(path)
+
+        now = time.monotonic()
+        for path, (deadline, snap) in list(self._pending.items()):
+            if deadline > now:
+                continue
+            current = _snapshot(path)
+            if current is None:
+                del self._pending[path]
+                if path in self._digests:
+                    logger.info("Model removed: %s (its header is kept)", path)
+                self._digests.pop(path, None)
+                self._headers.pop(path, None)
+                self._clashes.pop(path, None)
+                # models refused for colliding with this one can have the name now
+                for other, clashes in list(self._clashes.items()):
+                    if os.path.abspath(path) in clashes:
+                        del self._clashes[other]
+                        self._arm(other, now=0.0)
+            elif current != snap:
+                # still being written
+                self._arm(path)
+            else:
+                del self._pending[path]
+                if path not in self._ready:
+                    self._ready.append(path)
+
+        self._submit()
+        return self._collect()
+
+    def _submit(self) -> None:
+        for path in list(self._ready):
+            if len(self._running) >= self.max_workers:
+                break
+            if path in self._running:
+                continue
+            self._ready.remove(path)
+            try:
+                digest = file_sha256(path)
+            except OSError:
+                continue
+            if self._digests.get(path) == digest:
+                logger.debug("Model file unchanged, skipping: %s", path)
+                continue
+            base = header_base_name(path, self.model_dir)
+            clashes = self._collisions(path)
+            kwargs = dict(self.convert_kwargs, header_base=base)
+            future: Future
+            if clashes:
+                self._clashes[path] = clashes
+                future = Future()
+                future.set_result({"model": path, "status": "failed", "error": collision_error(base, clashes)})
+            elif self._pool is None:
+                future = Future()
+                future.set_result(_convert_one(path, self.output_dir, kwargs))
+            else:
+                future = self._pool.submit(_convert_one, path, self.output_dir, kwargs)
+            self._running[path] = (future, digest)
+
+    def _collisions(self, path: str) -> List[str]:
+        """Absolute paths of the other models whose header name equals ``path``'s (see ``header_collisions``)."""
+        root = os.path.abspath(self.model_dir)
+        paths = {os.path.abspath(p) for p in collect_model_paths(self.model_dir, self.pattern, self.recursive)}
+        paths.add(os.path.abspath(path))
+        return sorted(header_collisions({p: header_base_name(p, root) for p in paths})[os.path.abspath(path)])
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        results = []
+        for path, (future, digest) in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[path]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.exception("Worker failed for %s", path)
+                result = {"model": path, "status": "failed", "error": f"worker error: {e}"}
+
+            if result["status"] == "ok":
+                self._digests[path] = digest
+                header = file_sha256(result["output"])
+                if self._headers.get(path) == header:
+                    result["status"] = "unchanged"
+                self._headers[path] = header
+                logger.info("Watch: %s -> %s (%s)", path, result["output"], result["status"])
+            else:
+                # not recorded: the next write of this file is converted again
+                logger.error("Watch: %s failed: %s", path, result.get("error"))
+            results.append(result)
+        return results
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Convert changes until ``stop`` is set (or Ctrl+C)."""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                self.step()
+        except KeyboardInterrupt:
+            logger.info("Watch stopped")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.source.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
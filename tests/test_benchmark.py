@@ -0,0 +1,27 @@
+import pytest
+from src.benchmark.driver import benchmark_header, generate_driver, infer_n_features
+from src.benchmark.suite import compare_results, synthetic_converter
+from src.validators.c_harness import find_c_compiler
+
+
+def test_driver_times_batch_entry_point_when_present():
+    conv = synthetic_converter(12, 3)
+    assert infer_n_features(conv.convert_to_c(batch=True)) == 12
+    assert "batch_pass" in generate_driver(conv.convert_to_c(batch=True))
+    assert "batch_pass" not in generate_driver(conv.convert_to_c(batch=False))
+
+
+def test_compare_results_flags_slowdowns():
+    base = {"results": [{"n_features": 16, "n_classes": 1, "variant": "float32", "opt_level": "-O2",
+                         "single_ns": 10.0, "batch_ns": 5.0}]}
+    cur = {"results": [dict(base["results"][0], single_ns=10.5, batch_ns=8.0)]}
+    regressions = compare_results(base, cur)
+    assert [r["metric"] for r in regressions] == ["batch_ns"]
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_benchmark_header_runs_compiled_driver():
+    code = synthetic_converter(8, 2).convert_to_c(batch=True)
+    (result,) = benchmark_header(code, opt_levels=("-O1",), rows=16, min_seconds=0.001, trials=1)
+    assert result["opt_level"] == "-O1"
+    assert result["single_ns"] > 0 and result["batch_ns"] > 0 and result["binary_bytes"] > 0
@@ -0,0 +1,56 @@
+import os
+import json
+import joblib
+from sklearn.datasets import make_classification, make_regression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.bulk import collect_model_paths, convert_many
+
+
+def test_bulk_conversion_records_failures_without_aborting(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    model_dir = tmp_path / "models"
+    model_dir.mkdir()
+    for i in range(3):
+        joblib.dump(Ridge(alpha=0.1 * (i + 1)).fit(X, y), str(model_dir / f"device_{i}.pkl"))
+    (model_dir / "broken.pkl").write_bytes(b"not a pickle")
+
+    paths = collect_model_paths(str(model_dir))
+    manifest = convert_many(paths, str(tmp_path / "out"), max_workers=2)
+
+    assert manifest["total"] == 4
+    assert len(manifest["outputs"]) == 3
+    assert [f["model"] for f in manifest["failures"]] == [str(model_dir / "broken.pkl")]
+    on_disk = json.loads((tmp_path / "out" / "manifest.json").read_text())
+    assert on_disk["failures"][0]["status"] == "failed"
+
+
+def test_recursive_same_named_models_get_distinct_headers(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    for sub in ("x", "y"):
+        (tmp_path / "models" / sub).mkdir(parents=True)
+        joblib.dump(Ridge().fit(X, y), str(tmp_path / "models" / sub / "model.pkl"))
+
+    paths = collect_model_paths(str(tmp_path / "models"), recursive=True)
+    manifest = convert_many(paths, str(tmp_path / "out"), max_workers=1)
+
+    outputs = sorted(os.path.basename(r["output"]) for r in manifest["outputs"])
+    assert len(outputs) == 2 and outputs[0].startswith("x_model__") and outputs[1].startswith("y_model__")
+
+
+def test_mixed_directory_drops_options_a_model_family_does_not_support(tmp_path):
+    X, y = make_classification(n_samples=200, n_features=5, n_informative=3, n_classes=3, random_state=0)
+    for name, model in (("forest", RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0)),
+                        ("mlp", MLPClassifier((8,), max_iter=2000, random_state=0)),
+                        ("logistic", LogisticRegression(max_iter=500))):
+        joblib.dump(Pipeline([("scaler", StandardScaler()), ("model", model)]).fit(X, y),
+                    str(tmp_path / f"{name}.pkl"))
+
+    options = {"batch": True, "fold_scaler": False, "weight_dtype": "float16", "proba": True,
+               "exp_impl": "poly", "merge_thresholds": True}
+    manifest = convert_many(collect_model_paths(str(tmp_path)), str(tmp_path / "out"), max_workers=1,
+                            export_options=options)
+    assert manifest["failures"] == [] and len(manifest["outputs"]) == 3
@@ -0,0 +1,84 @@
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from src.converter.bundle import ModelBundle
+from src.converter.factory import load_converter
+from src.validators.c_harness import differential_validate, find_c_compiler
+
+
+def _models():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    scaler = StandardScaler().fit(X)
+    return {
+        "value": Pipeline([("scaler", scaler), ("model", Ridge())]).fit(X, X[:, 0] * 2.0 + 1.0),
+        "segment": Pipeline([("scaler", scaler), ("model", LogisticRegression(max_iter=1000))]).fit(X, y),
+        "tree": Pipeline([("scaler", scaler), ("model", DecisionTreeClassifier(max_depth=4, random_state=0))]).fit(X, y),
+    }
+
+
+def _bundle(models, **options):
+    bundle = ModelBundle("edge")
+    for name, model in models.items():
+        member_options = {} if name.startswith("tree") else options
+        bundle.add(name, load_converter(model_obj=model), **member_options)
+    return bundle
+
+
+def test_bundle_namespaces_symbols_and_scales_once():
+    bundle = _bundle(_models(), fold_scaler=False)
+    code = bundle.convert_to_c()
+    assert code.count("#pragma once") == 1
+    assert "VALUE_WEIGHTS" in code and "SEGMENT_W_0" in code and "TREE_NODE_FEATURE" in code
+    assert code.count("_MEAN[6] = ") == 1 and code.count("xs0[i] = ") == 1
+    assert "value_predict(xs0, n_features)" in code and "tree_predict(x, n_features)" in code
+
+
+def test_identical_tables_are_stored_once():
+    models = _models()
+    models["tree_copy"] = models["tree"]
+    code = _bundle(models).convert_to_c()
+    assert "TREE_COPY_NODE_FEATURE" not in code
+    assert "TREE_NODE_FEATURE[n]" in code.split("tree_copy_predict")[1]
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_compiled_bundle_members_match_sklearn():
+    bundle = _bundle(_models(), fold_scaler=False)
+    code = bundle.convert_to_c(batch=True)
+    for member in bundle.members:
+        accessor, func = bundle.accessor_c(member.name)
+        report = differential_validate(member.converter.model, member.converter.scaler, code + "\n" + accessor,
+                                       func_name=func, n_samples=2000,
+                                       output="label" if member.return_type == "int" else None)
+        assert report["label_mismatches"] == 0
+
+
+def test_scalers_that_transform_differently_are_not_shared():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, random_state=0)
+    bundle = _bundle({"centered": Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X, y),
+                      "uncentered": Pipeline([("scaler", StandardScaler(with_mean=False)), ("model", Ridge())]).fit(X, y),
+                      "unit": Pipeline([("scaler", MinMaxScaler()), ("model", Ridge())]).fit(X, y),
+                      "signed": Pipeline([("scaler", MinMaxScaler((-1, 1))), ("model", Ridge())]).fit(X, y)},
+                     fold_scaler=False)
+    bundle.convert_to_c()
+    assert [names for _, names in bundle.scalers] == [["centered"], ["uncentered"], ["unit"], ["signed"]]
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_compiled_bundle_shares_minmax_scaling_with_feature_range():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, random_state=0)
+    X = X + [20, -10, 15, 5, -12, 8]
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(X)
+    bundle = _bundle({"value": Pipeline([("scaler", scaler), ("model", Ridge())]).fit(X, X[:, 0] * 2.0 + 1.0),
+                      "label": Pipeline([("scaler", scaler), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)},
+                     fold_scaler=False)
+    code = bundle.convert_to_c()
+    assert len(bundle.scalers) == 1
+    for member in bundle.members:
+        accessor, func = bundle.accessor_c(member.name)
+        report = differential_validate(member.converter.model, member.converter.scaler, code + "\n" + accessor,
+                                       func_name=func, n_samples=2000)
+        assert report["max_rel_error"] < 1e-3 and report["label_mismatches"] == 0
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from src.converter.linear import LinearConverter
+from src.runtime.reference import HeaderRuntime
+from src.validators.c_harness import compile_header, differential_validate, find_c_compiler, run_compiled
+
+pytestmark = pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+
+
+def _convert(model, **options):
+    conv = LinearConverter()
+    conv.load(model)
+    return conv, conv.convert_to_c(**options)
+
+
+@pytest.mark.parametrize("fold_scaler", [True, False])
+def test_compiled_regression_matches_sklearn(fold_scaler):
+    X, y = make_regression(n_samples=200, n_features=6, noise=0.1, random_state=0)
+    pipe = Pipeline([("scaler", MinMaxScaler()), ("model", Ridge())]).fit(X, y)
+    conv, code = _convert(pipe, fold_scaler=fold_scaler)
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+    assert report["max_rel_error"] < 1e-3
+
+
+def test_compiled_binary_logistic_returns_probability():
+    X, y = make_classification(n_samples=300, n_features=5, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression())]).fit(X, y)
+    conv, code = _convert(pipe)
+    assert "static inline float predict_model" in code
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+    assert report["label_mismatches"] == 0
+
+
+def test_compiled_multiclass_labels_match():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    conv, code = _convert(LogisticRegression(max_iter=1000).fit(X, y))
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=4000)
+    assert report["mismatch_rate"] <= 1e-3
+
+
+@pytest.mark.parametrize("options", [{}, {"sparse": True}, {"fold_scaler": False}])
+def test_compiled_minmax_feature_range_scaled_at_run_time(options):
+    rng = np.random.RandomState(0)
+    X = rng.randn(400, 5) + [40, -20, 30, 15, -25]
+    y = (X - X.mean(axis=0)).dot([1, -2, 3, 0.5, 2]) + 0.1 * rng.randn(400)
+    pipe = Pipeline([("scaler", MinMaxScaler(feature_range=(-1, 1))), ("model", Ridge())]).fit(X, y)
+    conv, code = _convert(pipe, **options)
+    # offset features: the default export falls back to runtime scaling too
+    assert conv._runtime_scaling and "SCALER_MIN[5]" in code
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+    assert report["max_rel_error"] < 1e-3
+
+
+@pytest.mark.parametrize("fold_scaler", [True, False])
+@pytest.mark.parametrize("kwargs", [{"with_mean": False}, {"with_std": False}])
+def test_compiled_standard_scaler_without_mean_or_std(kwargs, fold_scaler):
+    X, y = make_regression(n_samples=300, n_features=5, noise=0.1, random_state=0)
+    X = X + [20, -10, 15, 5, -12]
+    pipe = Pipeline([("scaler", StandardScaler(**kwargs)), ("model", Ridge())]).fit(X, y)
+    conv, code = _convert(pipe, fold_scaler=fold_scaler)
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+    assert report["max_rel_error"] < 1e-3
+
+
+@pytest.mark.parametrize("weight_dtype", ["float32", "float16"])
+def test_compiled_multiclass_batch_header_shares_row_major_matrix(weight_dtype):
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    conv, code = _convert(pipe, batch=True, proba=True, weight_dtype=weight_dtype)
+    assert code.count("W_MATRIX[18] = {") == 1 and "W_0" not in code
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=4000)
+    assert report["mismatch_rate"] <= 1e-3
+
+
+def test_compiled_quantized_input_saturates_out_of_range_rows():
+    X, y = make_regression(n_samples=300, n_features=4, noise=0.1, random_state=0)
+    conv, code = _convert(Ridge().fit(X, y), quantize="int8", calibration_data=X)
+    rows = np.array([[1e6, -1e6, 1e6, -1e6], [1e12, -1e12, 3e38, -3e38], [1e12, -1e12, np.inf, -np.inf]])
+    out = run_compiled(compile_header(code), rows)
+    # every feature saturates to the int8 range instead of overflowing the integer cast
+    assert out[1] == out[0] and out[2] == out[0]
+    np.testing.assert_allclose(out, HeaderRuntime(code).predict(rows), rtol=1e-6)
+    np.testing.assert_allclose(out, conv.quantized.decision_function(rows)[:, 0], rtol=1e-6)
@@ -0,0 +1,89 @@
+import os
+import threading
+import joblib
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from src.cache import ConversionCache
+from src.main import convert_model
+
+
+def test_unchanged_model_reuses_header(tmp_path, monkeypatch):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    m = Ridge().fit(X, y)
+    p = tmp_path / "reg.pkl"
+    joblib.dump(m, str(p))
+    cache = ConversionCache(str(tmp_path / "cache"))
+    out_dir = str(tmp_path / "out")
+
+    first = convert_model(str(p), out_dir, cache=cache)
+    mtime = os.stat(first).st_mtime_ns
+
+    # re-pickled identical model: different file bytes are fine, params match
+    joblib.dump(m, str(p), compress=3)
+    monkeypatch.setattr("src.main.validate_linear_model_exported",
+                        lambda *a, **k: (_ for _ in ()).throw(AssertionError("validation should be skipped")))
+    second = convert_model(str(p), out_dir, cache=cache)
+
+    assert second == first
+    assert os.stat(second).st_mtime_ns == mtime
+    assert os.listdir(out_dir) == [os.path.basename(first)]
+
+
+def test_eviction_keeps_cache_under_budget(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=250)
+    for i in range(5):
+        cache.store(f"f{i}", f"p{i}", "x" * 100)
+    assert cache.lookup_params("p4") is not None
+    assert cache.lookup_params("p0") is None
+    assert sum(os.path.getsize(os.path.join(cache.headers_dir, n))
+               for n in os.listdir(cache.headers_dir) if n.endswith(".h")) <= 250
+
+
+def test_identical_models_share_code_but_keep_their_own_header(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    cache = ConversionCache(str(tmp_path / "cache"))
+    out_dir = str(tmp_path / "out")
+    for name in ("a", "b"):
+        joblib.dump(Ridge().fit(X, y), str(tmp_path / f"{name}.pkl"))
+
+    a = convert_model(str(tmp_path / "a.pkl"), out_dir, cache=cache, stable_name=True)
+    b = convert_model(str(tmp_path / "b.pkl"), out_dir, cache=cache, stable_name=True)
+    assert os.path.basename(a) == "a.h" and os.path.basename(b) == "b.h"
+
+    # retraining a rewrites a's header only; b keeps the original parameters
+    b_code = open(b).read()
+    joblib.dump(Ridge(alpha=50.0).fit(X, y), str(tmp_path / "a.pkl"))
+    assert convert_model(str(tmp_path / "a.pkl"), out_dir, cache=cache, stable_name=True) == a
+    assert open(a).read() != b_code and open(b).read() == b_code
+
+
+def test_emitter_change_invalidates_cached_headers(tmp_path, monkeypatch):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    m = Ridge().fit(X, y)
+    cache = ConversionCache(str(tmp_path / "cache"))
+    key = cache.param_key(m, None)
+    monkeypatch.setattr("src.cache.emitter_version", lambda: "0.1.0+patched")
+    assert cache.param_key(m, None) != key
+
+
+def test_concurrent_stores_of_one_key_from_threads(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def store(i):
+        barrier.wait()
+        try:
+            for _ in range(20):
+                cache.store("f", "p", f"// {i}\n" * 200)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert cache.lookup_params("p") in {f"// {i}\n" * 200 for i in range(8)}
+    assert not [n for n in os.listdir(cache.headers_dir) if n.endswith(".tmp")]
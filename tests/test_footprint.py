@@ -0,0 +1,43 @@
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from exception.custom_exception import CustomException
+from src.converter.linear import LinearConverter
+from src.footprint import estimate_footprint, fit_to_budget
+
+
+def _converter(n_features=200, n_classes=4):
+    X, y = make_classification(n_samples=600, n_features=n_features, n_informative=10,
+                               n_classes=n_classes, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=300))]).fit(X, y)
+    conv = LinearConverter()
+    conv.load(pipe)
+    return conv, X
+
+
+def test_footprint_counts_tables_stack_and_macs():
+    conv, _ = _converter()
+    report = estimate_footprint(conv.convert_to_c(fold_scaler=False), conv.op_counts())
+    # 4 x W_c[200] + 4 x B_c + SCALER_MEAN/SCALE[200]
+    assert report["const_bytes"] == 4 * 200 * 4 + 4 * 4 + 2 * 200 * 4
+    assert report["stack_bytes"] >= 200 * 4 + 4 * 4  # x_scaled + scores
+    assert report["macs"] == 800 and report["divisions"] == 200
+
+
+def test_budget_picks_most_precise_variant_that_fits():
+    conv, X = _converter()
+    _, options, report = fit_to_budget(conv, {"fold_scaler": False}, flash_bytes=4096)
+    assert options["fold_scaler"] and "weight_dtype" not in options and report["const_bytes"] <= 4096
+
+    _, options, report = fit_to_budget(conv, {"fold_scaler": False}, flash_bytes=3000)
+    assert options["weight_dtype"] == "float16" and report["const_bytes"] <= 3000
+
+    # int8 carries per-feature input scales, so it only beats float16 with many classes
+    conv, X = _converter(n_classes=10)
+    _, options, report = fit_to_budget(conv, {"calibration_data": X}, flash_bytes=3800, stack_bytes=1024)
+    assert options["quantize"] == "int8" and report["const_bytes"] <= 3800
+
+    with pytest.raises(CustomException):
+        fit_to_budget(conv, {}, flash_bytes=64)
@@ -0,0 +1,82 @@
+import io
+import numpy as np
+from sklearn.datasets import make_regression, make_classification
+from sklearn.linear_model import Ridge, LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from src.converter.linear import LinearConverter
+from src.runtime.reference import HeaderRuntime, compare_with_sklearn
+
+
+def _converter(model):
+    conv = LinearConverter()
+    conv.load(model)
+    return conv
+
+
+def test_batch_entry_point_folds_standard_scaler():
+    X, y = make_regression(n_samples=200, n_features=5, noise=0.1, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X, y)
+    conv = _converter(pipe)
+
+    w, b = conv._folded_params(conv.model.coef_, conv.model.intercept_)
+    np.testing.assert_allclose(X.dot(w) + b, pipe.predict(X), rtol=1e-9, atol=1e-6)
+
+    code = conv.convert_to_c(batch=True, fold_scaler=False)
+    assert "predict_model_batch(const float *X, int n_rows, float *out)" in code
+    assert "WEIGHTS_FOLDED[5]" in code
+
+
+def test_batch_entry_point_multiclass_minmax_row_major():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", MinMaxScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    conv = _converter(pipe)
+
+    W, b = conv._folded_params(conv.model.coef_, conv.model.intercept_)
+    np.testing.assert_array_equal(np.argmax(X.dot(W.T) + b, axis=1), pipe.predict(X))
+
+    code = conv.convert_to_c(batch=True)
+    # one folded row-major W_MATRIX serves both entry points: the weights are stored once
+    assert code.count("W_MATRIX[18] = {") == 1 and "W_0" not in code
+    assert "predict_model_batch(const float *X, int n_rows, int *out)" in code
+    np.testing.assert_array_equal(conv.model.classes_[HeaderRuntime(code).predict(X)], pipe.predict(X))
+    assert "W_MATRIX[18]" in conv.convert_to_c(batch=True, fold_scaler=False)
+
+
+def test_scaler_folded_by_default_and_kept_on_request():
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=1)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X, y)
+    conv = _converter(pipe)
+
+    folded = conv.convert_to_c()
+    assert "SCALER_MEAN" not in folded and "x_scaled" not in folded
+
+    raw = conv.convert_to_c(fold_scaler=False)
+    assert "SCALER_MEAN[3]" in raw and "x_scaled" in raw
+
+
+def test_scaler_kept_at_run_time_when_folding_loses_float32_precision():
+    rng = np.random.RandomState(0)
+    X = rng.randn(500, 5) * [1, 2, 0.5, 3, 1] + [30, -60, 90, 15, 30]
+    y = (X - X.mean(axis=0)).dot([1, -2, 3, 0.5, 2]) + 0.1 * rng.randn(500)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X, y)
+    conv = _converter(pipe)
+
+    code = conv.convert_to_c(batch=True)
+    assert "SCALER_MEAN[5]" in code and "WEIGHTS_FOLDED" not in code
+    report = compare_with_sklearn(HeaderRuntime(code), conv.model, conv.scaler, n_samples=20000)
+    assert report["max_rel_error"] < 1e-3
+
+
+def test_streamed_header_matches_string_header():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    conv = _converter(pipe)
+
+    for options in ({"batch": True, "fold_scaler": False}, {"weight_dtype": "float16"}):
+        buf = io.StringIO()
+        # chunks smaller than a table exercise the chunk separators
+        n = conv.write_c(buf, chunk_size=4, **options)
+        assert buf.getvalue() == conv.convert_to_c(**options)
+        assert n == len(buf.getvalue())
+    assert "W_0[6] = { " in conv.convert_to_c()
@@ -0,0 +1,38 @@
+import logging
+import pytest
+from logger import custom_logger
+from logger.custom_logger import CustomLogger, configure_logging, ENV_FILE, ENV_LEVEL, ENV_QUEUE
+
+
+@pytest.fixture(autouse=True)
+def _restore_logging(monkeypatch):
+    for var in (ENV_FILE, ENV_LEVEL, ENV_QUEUE):
+        monkeypatch.delenv(var, raising=False)
+    previous = custom_logger._state["options"]
+    yield
+    if previous is not None:
+        level, log_file, use_queue = previous
+        configure_logging(level, log_file or False, use_queue, force=True)
+
+
+def test_configure_logging_is_idempotent(tmp_path):
+    log_file = str(tmp_path / "logs" / "run.log")
+    configure_logging("INFO", log_file)
+    handlers = list(logging.getLogger().handlers)
+    configure_logging("INFO", log_file)
+    for _ in range(20):
+        CustomLogger().get_logger("some_module.py")
+    assert logging.getLogger().handlers == handlers
+    assert not (tmp_path / "logs").exists()
+
+    configure_logging("WARNING", False)
+    assert len(logging.getLogger().handlers) == len(handlers) - 1
+    assert logging.getLogger().level == logging.WARNING
+
+
+def test_queue_mode_writes_from_listener_thread(tmp_path):
+    log_file = tmp_path / "q.log"
+    configure_logging("INFO", str(log_file), use_queue=True)
+    CustomLogger().get_logger("queued.py").info("queued record", n=1)
+    configure_logging("INFO", False)  # stops the listener, which drains the queue first
+    assert "queued record" in log_file.read_text()
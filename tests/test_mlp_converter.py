@@ -0,0 +1,73 @@
+import warnings
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from src.converter.factory import load_converter
+from src.converter.mlp import MLPConverter
+from src.footprint import estimate_footprint
+from src.validators.c_harness import differential_validate, find_c_compiler
+from src.validators.mlp_validation import validate_mlp_model_exported
+
+
+def _fit(model, X, y):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        return model.fit(X, y)
+
+
+def test_mlp_header_reuses_two_buffers_sized_to_widest_layer():
+    X, y = make_classification(n_samples=300, n_features=10, n_informative=6, n_classes=3, random_state=0)
+    pipe = _fit(Pipeline([("scaler", StandardScaler()),
+                          ("model", MLPClassifier(hidden_layer_sizes=(32, 16, 8), max_iter=200, random_state=0))]), X, y)
+    conv = load_converter(model_obj=pipe)
+    assert isinstance(conv, MLPConverter)
+    code = conv.convert_to_c(proba=True)
+
+    assert "static float predict_model_act_a[32];" in code and "static float predict_model_act_b[32];" in code
+    assert code.count("static float ") == 2
+    assert "static const float L0_WEIGHTS[320]" in code  # [32][10] row-major
+    assert estimate_footprint(code)["static_bytes"] == 2 * 32 * 4
+    report = validate_mlp_model_exported(conv.model, conv.net, scaler=conv.scaler)
+    assert report["max_diff"] < 1e-5 and report["label_mismatches"] == 0
+
+
+@pytest.mark.parametrize("activation", ["relu", "tanh", "logistic", "identity"])
+def test_mlp_python_replay_matches_predict(activation):
+    X, y = make_regression(n_samples=300, n_features=6, noise=0.1, random_state=0)
+    pipe = _fit(Pipeline([("scaler", MinMaxScaler()),
+                          ("model", MLPRegressor(hidden_layer_sizes=(12, 6), activation=activation, max_iter=300,
+                                                 random_state=0))]), X, y)
+    conv = load_converter(model_obj=pipe)
+    conv.convert_to_c()
+    validate_mlp_model_exported(conv.model, conv.net, scaler=conv.scaler)
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+@pytest.mark.parametrize("n_classes", [2, 4])
+def test_compiled_mlp_matches_sklearn(n_classes):
+    X, y = make_classification(n_samples=300, n_features=8, n_informative=6, n_classes=n_classes, random_state=0)
+    pipe = _fit(Pipeline([("scaler", StandardScaler()),
+                          ("model", MLPClassifier(hidden_layer_sizes=(16,), activation="tanh", max_iter=200,
+                                                  random_state=0))]), X, y)
+    conv = load_converter(model_obj=pipe)
+    code = conv.convert_to_c(batch=True)
+    report = differential_validate(conv.model, conv.scaler, code, n_samples=2000,
+                                   output="label" if n_classes > 2 else None)
+    assert report["mismatch_rate"] < 1e-3
+    if n_classes == 2:
+        assert np.isfinite(report["max_rel_error"]) and report["max_rel_error"] < 1e-3
+
+
+def test_mlp_folds_standard_scaler_without_mean():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    X = X + [20, -10, 15, 5, -12, 8]
+    pipe = _fit(Pipeline([("scaler", StandardScaler(with_mean=False)),
+                          ("model", MLPClassifier(hidden_layer_sizes=(8,), max_iter=300, random_state=0))]), X, y)
+    conv = load_converter(model_obj=pipe)
+    conv.convert_to_c()
+    report = validate_mlp_model_exported(conv.model, conv.net, scaler=conv.scaler)
+    assert report["max_diff"] < 1e-5
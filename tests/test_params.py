@@ -0,0 +1,37 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.decomposition import PCA
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from exception.custom_exception import CustomException
+from src.converter.factory import load_converter
+from src.params import load_params, save_params
+from src.utils import load_model
+
+
+def test_param_file_converts_like_the_pickle(tmp_path):
+    X, y = make_classification(n_samples=300, n_features=8, n_informative=5, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=500))]).fit(X, y)
+    joblib.dump(pipe, str(tmp_path / "m.pkl"))
+    save_params(pipe, str(tmp_path / "m.npz"))
+
+    restored = load_params(str(tmp_path / "m.npz"))
+    assert isinstance(restored.named_steps["model"].coef_, np.memmap)
+    np.testing.assert_allclose(restored.predict_proba(X), pipe.predict_proba(X))
+    assert (load_converter(str(tmp_path / "m.npz")).convert_to_c()
+            == load_converter(str(tmp_path / "m.pkl")).convert_to_c())
+
+
+def test_mmap_mode_maps_pickled_arrays(tmp_path):
+    X, y = make_classification(n_samples=200, n_features=6, random_state=0)
+    joblib.dump(LogisticRegression().fit(X, y), str(tmp_path / "m.pkl"))
+    assert isinstance(load_model(str(tmp_path / "m.pkl"), mmap_mode="r").coef_, np.memmap)
+
+
+def test_param_file_rejects_unsupported_classes(tmp_path):
+    X, _ = make_classification(n_samples=50, n_features=4, random_state=0)
+    with pytest.raises(CustomException):
+        save_params(PCA(2).fit(X), str(tmp_path / "pca.npz"))
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import (FunctionTransformer, MaxAbsScaler, OneHotEncoder, PolynomialFeatures,
+                                   RobustScaler, StandardScaler)
+from exception.custom_exception import CustomException
+from src.converter.factory import load_converter
+from src.converter.pipeline import PipelineConverter
+from src.validators.c_harness import differential_validate, find_c_compiler
+from src.validators.pipeline_validation import validate_preprocess_exported, validate_quadratic_exported
+
+
+def _data(n=400, seed=0):
+    rng = np.random.RandomState(seed)
+    num = rng.randn(n, 3) * [1.0, 5.0, 0.5] + [0.0, 3.0, 1.0]
+    cat = rng.randint(0, 4, size=(n, 1)).astype(float) * 2.5
+    y = num[:, 0] * num[:, 1] + cat[:, 0] + 0.1 * rng.randn(n)
+    return np.column_stack([num, cat]), y
+
+
+def test_column_transformer_pipeline_compiles_every_step():
+    X, y = _data()
+    labels = np.digitize(y, np.percentile(y, [33, 66]))
+    pipe = Pipeline([
+        ("ct", ColumnTransformer([("num", Pipeline([("s", RobustScaler()), ("p", PolynomialFeatures(2))]), [0, 1, 2]),
+                                  ("cat", OneHotEncoder(handle_unknown="ignore", drop="first"), [3])])),
+        ("model", LogisticRegression(max_iter=3000)),
+    ]).fit(X, labels)
+    conv = load_converter(model_obj=pipe)
+    assert isinstance(conv, PipelineConverter)
+    code = conv.convert_to_c(batch=True, proba=True)
+
+    # 3 scaled + 3 indicators, then 10 monomials + 3 indicators; nothing is dropped
+    assert conv.program.widths == [6, 13]
+    assert "predict_model_preprocess(x, z);" in code and "int predict_model_proba(const float *x" in code
+    assert validate_preprocess_exported(conv.scaler)["max_diff"] < 1e-5
+    if find_c_compiler() is not None:
+        report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+        assert report["mismatch_rate"] < 1e-3
+
+    bad = Pipeline([("log", FunctionTransformer(np.log1p)), ("model", Ridge())]).fit(np.abs(X), y)
+    with pytest.raises(CustomException, match="FunctionTransformer"):
+        load_converter(model_obj=bad)
+
+
+def test_consecutive_affine_steps_collapse_into_the_weights():
+    X, y = _data()
+    pipe = Pipeline([("r", RobustScaler()), ("m", MaxAbsScaler()), ("s", StandardScaler()),
+                     ("model", Ridge())]).fit(X, y)
+    conv = load_converter(model_obj=pipe)
+    code = conv.convert_to_c()
+
+    assert conv.program.widths == [4]
+    # one affine stage folded into the linear model: no per-row preprocessing pass is left
+    assert "predict_model_preprocess" not in code and "static const float QUAD_L[4]" in code
+    report = validate_quadratic_exported(conv.model, conv.scaler, conv.quadratic)
+    assert report["max_diff"] < 1e-5
+
+
+def test_standard_scaler_without_mean_is_not_centered():
+    X, y = _data()
+    X = X + [20.0, -10.0, 15.0, 0.0]
+    pipe = Pipeline([("s", StandardScaler(with_mean=False)), ("r", RobustScaler()), ("model", Ridge())]).fit(X, y)
+    conv = load_converter(model_obj=pipe)
+    conv.convert_to_c()
+    assert validate_preprocess_exported(conv.scaler)["max_diff"] < 1e-5
+    report = validate_quadratic_exported(conv.model, conv.scaler, conv.quadratic)
+    assert report["max_diff"] < 1e-5
+
+
+def test_degree2_polynomial_is_never_materialized_for_linear_models():
+    X, y = _data()
+    pipe = Pipeline([("s", StandardScaler()), ("p", PolynomialFeatures(2)), ("s2", StandardScaler()),
+                     ("model", Ridge())]).fit(X, y)
+    conv = load_converter(model_obj=pipe)
+    code = conv.convert_to_c(batch=True)
+
+    assert conv.quadratic is not None
+    assert "static const float QUAD_Q[10]" in code and "float v[4];" in code
+    assert "[15]" not in code  # the 15 expanded features have no array
+    assert conv.op_counts()["macs"] == 4 + 10
+    if find_c_compiler() is not None:
+        report = differential_validate(conv.model, conv.scaler, code, n_samples=2000)
+        assert report["max_rel_error"] < 1e-3
+
+    # float16 weights have no quadratic equivalent: the expanded path is used instead
+    code16 = conv.convert_to_c(weight_dtype="float16")
+    assert conv.quadratic is None and "float z[15];" in code16
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.converter.approx import approx_exp
+from src.converter.linear import LinearConverter
+from src.runtime.reference import HeaderRuntime
+from src.validators.c_harness import compile_header, find_c_compiler, run_compiled
+from src.validators.linear_validation import validate_linear_model_exported
+
+
+def _multiclass():
+    X, y = make_classification(n_samples=400, n_features=8, n_informative=5, n_classes=4, random_state=0)
+    return Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=2000))]).fit(X, y)
+
+
+@pytest.mark.parametrize("impl,bound", [("poly", 5e-6), ("lut", 1e-4)])
+def test_exp_approximations_stay_within_their_error_bound(impl, bound):
+    x = np.linspace(-80.0, 80.0, 200001).astype(np.float32)
+    exact = np.exp(x.astype(np.float64))
+    assert np.max(np.abs(approx_exp(impl, x) - exact) / exact) < bound
+
+
+@pytest.mark.parametrize("impl", ["libm", "lut"])
+def test_probability_report_against_predict_proba(impl):
+    conv = LinearConverter()
+    conv.load(_multiclass())
+    conv.convert_to_c(proba=True, exp_impl=impl)
+    report = validate_linear_model_exported(conv.model, conv.scaler, exp_impl=impl)["probability"]
+    assert report["label_mismatches"] == 0
+    assert report["max_abs_error"] < (1e-6 if impl == "libm" else 1e-4)
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_compiled_proba_and_topk_match_reference_runtime():
+    conv = LinearConverter()
+    conv.load(_multiclass())
+    code = conv.convert_to_c(top_k=2, exp_impl="poly", fold_scaler=False)
+    X = np.random.default_rng(0).normal(size=(2000, 8)).astype(np.float32)
+    expected = HeaderRuntime(code).predict_proba(X)
+    for k in range(4):
+        probe = (f"static inline float probe(const float *x, int n) {{ float p[4]; "
+                 f"predict_model_proba(x, n, p); return p[{k}]; }}\n")
+        np.testing.assert_array_equal(run_compiled(compile_header(code + probe, "probe"), X), expected[:, k])
+    probe = ("static inline float probe(const float *x, int n) { int l[2]; float p[2]; "
+             "predict_model_topk(x, n, l, p); return (float)l[1]; }\n")
+    second = np.argsort(-expected, axis=1, kind="stable")[:, 1]
+    np.testing.assert_array_equal(run_compiled(compile_header(code + probe, "probe"), X), second)
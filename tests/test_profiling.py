@@ -0,0 +1,31 @@
+import os
+import pstats
+import joblib
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from src.main import convert_model
+from src.profiling import StageTimer
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage("validate"):
+            pass
+    timer.bytes_emitted = 123
+    report = timer.report()
+    assert list(report["stages_ms"]) == ["validate"]
+    assert report["bytes_emitted"] == 123 and report["total_ms"] >= report["stages_ms"]["validate"]
+
+
+def test_convert_model_dumps_cprofile_and_tracemalloc(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=4, noise=0.1, random_state=0)
+    model_path = str(tmp_path / "ridge.pkl")
+    joblib.dump(Ridge().fit(X, y), model_path)
+
+    out_path = convert_model(model_path, str(tmp_path / "out"), profile_dir=str(tmp_path / "prof"))
+
+    assert os.path.isfile(out_path)
+    stats = pstats.Stats(str(tmp_path / "prof" / "ridge.prof"))
+    assert any(func[2] == "emit_parts" for func in stats.stats)
+    assert (tmp_path / "prof" / "ridge.alloc.txt").read_text().startswith("traced memory")
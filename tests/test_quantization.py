@@ -0,0 +1,45 @@
+import numpy as np
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.converter.linear import LinearConverter
+from src.validators.linear_validation import validate_linear_model_exported
+
+
+def test_int8_multiclass_per_class_scale_reports_label_disagreement_and_accuracy_drop():
+    X, y = make_classification(n_samples=400, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    conv = LinearConverter()
+    conv.load(pipe)
+
+    code = conv.convert_to_c(quantize="int8", quant_granularity="class", calibration_data=X)
+    assert "static const int8_t W_Q[18]" in code
+    assert "REQUANT_MULT[3]" in code
+
+    report = validate_linear_model_exported(conv.model, conv.scaler, quantized=conv.quantized, quant_samples=X)
+    quant = report["quantization"]
+    assert quant["label_disagreement"] < 0.05
+    assert quant["label_agreement"] + quant["label_disagreement"] == 1.0
+    assert "accuracy_drop" not in quant  # needs ground truth
+    # replaying the emitted integer tables measures the same thing
+    replayed = validate_linear_model_exported(conv.model, conv.scaler, quantized=conv.quantized, quant_samples=X,
+                                              header=code)["quantization"]
+    assert replayed["label_disagreement"] == quant["label_disagreement"]
+
+    quant = validate_linear_model_exported(conv.model, conv.scaler, quantized=conv.quantized, quant_samples=X,
+                                           quant_labels=y)["quantization"]
+    assert quant["accuracy_float"] == np.mean(pipe.predict(X) == y)
+    assert quant["accuracy_drop"] == quant["accuracy_float"] - quant["accuracy_quantized"]
+
+
+def test_int16_regression_close_to_float():
+    X, y = make_regression(n_samples=300, n_features=4, noise=0.1, random_state=0)
+    m = Ridge().fit(X, y)
+    conv = LinearConverter()
+    conv.load(m)
+
+    code = conv.convert_to_c(quantize="int16", calibration_data=X)
+    assert "static const int16_t WEIGHTS_Q[4]" in code
+    np.testing.assert_allclose(conv.quantized.decision_function(X)[:, 0], m.predict(X),
+                               atol=0.02 * np.ptp(m.predict(X)))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from src.converter.linear import LinearConverter
+from src.runtime.reference import HeaderRuntime, compare_with_sklearn
+from src.validators.c_harness import compile_header, find_c_compiler, run_compiled
+
+
+def _convert(model, **options):
+    conv = LinearConverter()
+    conv.load(model)
+    return conv, conv.convert_to_c(**options)
+
+
+@pytest.mark.parametrize("fold_scaler", [True, False])
+def test_reference_runtime_matches_sklearn(fold_scaler):
+    X, y = make_regression(n_samples=200, n_features=6, noise=0.1, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X, y)
+    conv, code = _convert(pipe, fold_scaler=fold_scaler)
+    report = compare_with_sklearn(HeaderRuntime(code), conv.model, conv.scaler, n_samples=50_000, chunk_size=8192)
+    assert report["n_samples"] == 50_000 and report["chunks"] == 7
+    assert report["max_rel_error"] < 1e-4
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+@pytest.mark.parametrize("options", [{}, {"quantize": "int8", "quant_granularity": "class"}])
+def test_reference_runtime_is_bit_exact_with_compiled_multiclass(options):
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", MinMaxScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    if options:
+        options = dict(options, calibration_data=X)
+    conv, code = _convert(pipe, fold_scaler=False, **options)
+    X_test = np.random.default_rng(0).normal(size=(5000, 6)).astype(np.float32)
+    np.testing.assert_array_equal(HeaderRuntime(code).predict(X_test), run_compiled(compile_header(code), X_test))
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import joblib
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from src.registry import ModelRegistry
+from src.server import ConversionService
+
+
+async def _post(port, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(b"POST /convert HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+                 + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_service_serves_repeat_requests_from_registry(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    path = str(tmp_path / "reg.pkl")
+    joblib.dump(Ridge().fit(X, y), path)
+
+    async def scenario():
+        service = ConversionService(ModelRegistry(max_models=2), max_workers=2)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            first, second = await asyncio.gather(_post(port, {"model_path": path}),
+                                                 _post(port, {"model_path": path}))
+            third = await _post(port, {"model_path": path, "export_options": {"batch": True}})
+            missing = await _post(port, {"model_path": str(tmp_path / "nope.pkl")})
+        service.pool.shutdown()
+        return service, first, second, third, missing
+
+    service, first, second, third, missing = asyncio.run(scenario())
+    assert first[0] == second[0] == 200 and first[1]["c_code"] == second[1]["c_code"]
+    assert third[1]["registry_hit"] and not third[1]["header_hit"] and "predict_model_batch" in third[1]["c_code"]
+    assert missing[0] == 500
+    assert service.registry.stats()["misses"] == 1
+
+
+def test_registry_reloads_changed_file_and_evicts_lru(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    registry = ModelRegistry(max_models=1)
+    a, b = str(tmp_path / "a.pkl"), str(tmp_path / "b.pkl")
+    joblib.dump(Ridge(alpha=1.0).fit(X, y), a)
+    joblib.dump(Ridge(alpha=5.0).fit(X, y), b)
+
+    entry, hit = registry.get(a)
+    assert not hit and registry.get(a)[1]
+    joblib.dump(Ridge(alpha=2.0).fit(X, y), a)
+    os.utime(a, ns=(1, 1))
+    assert registry.get(a)[0] is not entry
+    registry.get(b)
+    assert len(registry) == 1 and registry.stats()["misses"] == 3
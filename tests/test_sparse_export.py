@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import Lasso, LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.converter.linear import LinearConverter
+from src.runtime.reference import HeaderRuntime
+from src.validators.c_harness import compile_header, find_c_compiler, run_compiled
+from src.validators.linear_validation import validate_linear_model_exported
+
+
+def _convert(model, **options):
+    conv = LinearConverter()
+    conv.load(model)
+    return conv, conv.convert_to_c(**options)
+
+
+def _l1_multiclass():
+    X, y = make_classification(n_samples=400, n_features=40, n_informative=4, n_redundant=0,
+                               n_classes=3, random_state=0)
+    model = LogisticRegression(l1_ratio=1.0, solver="saga", C=0.05, max_iter=5000)
+    return Pipeline([("scaler", StandardScaler()), ("model", model)]).fit(X, y)
+
+
+def test_auto_mode_picks_sparse_only_for_sparse_weights():
+    X, y = make_regression(n_samples=300, n_features=50, n_informative=3, noise=0.1, random_state=0)
+    conv, code = _convert(Lasso(alpha=1.0).fit(X, y))
+    assert conv.sparse is not None and conv.sparse.density <= 0.25
+    assert "WEIGHT_INDEX" in code and "WEIGHTS[" not in code
+
+    conv, code = _convert(Lasso(alpha=1.0).fit(X, y), sparse=False)
+    assert conv.sparse is None and "WEIGHT_INDEX" not in code
+
+
+@pytest.mark.parametrize("fold_scaler", [True, False])
+def test_multiclass_csr_tables_validate(fold_scaler):
+    conv, code = _convert(_l1_multiclass(), fold_scaler=fold_scaler)
+    assert "W_ROW_PTR" in code and "W_COL_INDEX" in code
+    report = validate_linear_model_exported(estimator=conv.model, scaler=conv.scaler, sparse=conv.sparse)
+    assert report["nnz"] == conv.sparse.nnz and report["label_mismatches"] == 0
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_compiled_sparse_header_matches_reference_runtime():
+    conv, code = _convert(_l1_multiclass(), fold_scaler=False)
+    X = np.random.default_rng(0).normal(size=(2000, 40)).astype(np.float32)
+    labels = run_compiled(compile_header(code), X)
+    np.testing.assert_array_equal(labels, HeaderRuntime(code, "predict_model").predict(X))
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_help_skips_heavy_imports_and_log_files(tmp_path):
+    code = ("import sys; sys.argv = ['model2c', '--help']\n"
+            "from src.main import cli_entry\n"
+            "try:\n    cli_entry()\nexcept SystemExit:\n    pass\n"
+            "print('HEAVY:' + ','.join(sorted(m for m in sys.modules if m.split('.')[0] in "
+            "('sklearn', 'scipy', 'joblib', 'structlog'))))")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=str(tmp_path), env=env)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.rsplit("HEAVY:", 1)[-1].strip() == ""
+    assert not (tmp_path / "logs").exists()
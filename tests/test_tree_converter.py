@@ -0,0 +1,56 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.converter.factory import load_converter
+from src.converter.tree import TreeEnsembleConverter
+from src.main import convert_model
+from src.validators.c_harness import find_c_compiler
+
+
+def test_flattened_forest_with_folded_scaler_matches_sklearn():
+    X, y = make_classification(n_samples=400, n_features=8, n_informative=5, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()),
+                     ("model", RandomForestClassifier(n_estimators=20, random_state=0))]).fit(X, y)
+    conv = load_converter(model_obj=pipe)
+    assert isinstance(conv, TreeEnsembleConverter)
+
+    code = conv.convert_to_c()
+    assert "static const uint8_t NODE_FEATURE" in code
+    assert "while (n >= 0)" in code
+    Xt = np.random.RandomState(1).randn(2000, 8) * 2
+    np.testing.assert_array_equal(conv.model.classes_[conv.flat.predict(Xt)], pipe.predict(Xt))
+
+
+def test_merge_thresholds_shrinks_threshold_table():
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 10, size=(500, 4)).astype(float)
+    y = X[:, 0] * 2 + X[:, 1]
+    conv = load_converter(model_obj=RandomForestRegressor(n_estimators=30, random_state=0).fit(X, y))
+
+    merged = conv.convert_to_c(merge_thresholds=True)
+    assert "THRESHOLD_VALUE[" in merged and "uint8_t NODE_THRESHOLD_IDX" in merged
+    assert len(merged) < len(conv.convert_to_c())
+
+
+@pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+def test_gradient_boosting_end_to_end_compiled(tmp_path):
+    X, y = make_classification(n_samples=300, n_features=5, random_state=0)
+    p = tmp_path / "gbc.pkl"
+    joblib.dump(GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, y), str(p))
+    header = convert_model(str(p), str(tmp_path / "out"), validate=True, validate_c=True)
+    assert "__classification_binary__" in header
+
+
+def test_folded_thresholds_honor_standard_scaler_without_mean():
+    X, y = make_classification(n_samples=400, n_features=6, n_informative=4, random_state=0)
+    X = X + [20, -10, 15, 5, -12, 8]
+    pipe = Pipeline([("scaler", StandardScaler(with_mean=False)),
+                     ("model", RandomForestClassifier(n_estimators=10, random_state=0))]).fit(X, y)
+    conv = load_converter(model_obj=pipe)
+    conv.convert_to_c()
+    Xt = X + np.random.RandomState(1).randn(*X.shape)
+    np.testing.assert_array_equal(conv.model.classes_[conv.flat.predict(Xt)], pipe.predict(Xt))
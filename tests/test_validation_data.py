@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from exception.custom_exception import CustomException
+from src.converter.linear import LinearConverter
+from src.validators.linear_validation import validate_linear_model_exported
+
+
+def test_validation_streams_memory_mapped_npy_in_chunks(tmp_path):
+    X, y = make_classification(n_samples=300, n_features=5, n_informative=3, n_classes=3, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", LogisticRegression(max_iter=1000))]).fit(X, y)
+    conv = LinearConverter()
+    conv.load(pipe)
+
+    rows = np.random.RandomState(1).randn(50_000, 5) * 3
+    path = tmp_path / "rows.npy"
+    np.save(str(path), rows)
+
+    report = validate_linear_model_exported(conv.model, conv.scaler, X=str(path), chunk_size=16_384)
+    assert report["n_samples"] == 50_000
+    assert [c["rows"] for c in report["chunks"]] == [16_384, 16_384, 16_384, 848]
+    assert all(c["seconds"] >= 0 for c in report["chunks"])
+    assert report["label_mismatches"] == 0
+
+
+def test_synthetic_validation_size_is_configurable():
+    X, y = make_classification(n_samples=200, n_features=4, random_state=0)
+    m = LogisticRegression().fit(X, y)
+    report = validate_linear_model_exported(m, n_samples=10_000, chunk_size=4_000)
+    assert report["n_samples"] == 10_000
+    assert len(report["chunks"]) == 3
+
+
+@pytest.mark.parametrize("options", [{}, {"fold_scaler": False}, {"sparse": True}, {"weight_dtype": "float16"}])
+def test_validation_replays_the_emitted_header(options):
+    X, y = make_regression(n_samples=300, n_features=5, noise=0.1, random_state=0)
+    pipe = Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X + 10.0, y)
+    conv = LinearConverter()
+    conv.load(pipe)
+    code = conv.convert_to_c(**options)
+
+    report = validate_linear_model_exported(conv.model, conv.scaler, header=code)
+    assert report["header_replayed"] and report["max_diff"] < 1e-3
+
+    # tables that do not match the model fail, although coef_ itself is fine
+    other = LinearConverter()
+    other.load(Pipeline([("scaler", StandardScaler()), ("model", Ridge())]).fit(X + 12.0, y))
+    with pytest.raises(CustomException):
+        validate_linear_model_exported(conv.model, conv.scaler, header=other.convert_to_c(**options))
@@ -0,0 +1,77 @@
+import os
+import time
+import joblib
+import pytest
+from sklearn.datasets import make_regression
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.cache import ConversionCache
+from src.watch import InotifySource, ModelWatcher
+
+
+def _drain(watcher, settle=0.3, timeout=30.0):
+    results = []
+    start = time.monotonic()
+    while time.monotonic() < start + timeout:
+        results += watcher.step(timeout=0.05)
+        if watcher.idle and time.monotonic() > start + settle:
+            return results
+    raise AssertionError("watcher did not settle")
+
+
+@pytest.mark.parametrize("use_inotify", [False, True])
+def test_watch_regenerates_only_changed_models_under_stable_names(tmp_path, use_inotify):
+    if use_inotify:
+        try:
+            InotifySource(str(tmp_path)).close()
+        except OSError:
+            pytest.skip("inotify unavailable")
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    model_dir = tmp_path / "models"
+    model_dir.mkdir()
+    for name in ("a", "b"):
+        joblib.dump(Ridge(alpha=0.1).fit(X, y), str(model_dir / f"{name}.pkl"))
+
+    watcher = ModelWatcher(str(model_dir), str(tmp_path / "out"), debounce=0.1, poll_interval=0.05,
+                           max_workers=2, use_inotify=use_inotify, cache=ConversionCache(str(tmp_path / "cache")))
+    try:
+        first = _drain(watcher)
+        assert sorted(r["status"] for r in first) == ["ok", "ok"]
+        assert sorted(os.listdir(tmp_path / "out")) == ["a.h", "b.h"]
+        b_code = (tmp_path / "out" / "b.h").read_text()
+
+        # a retrained with a scaler (new parameters, new scaler flag); b re-pickled with identical parameters
+        joblib.dump(Pipeline([("scaler", StandardScaler()), ("model", Ridge(alpha=5.0))]).fit(X, y),
+                    str(model_dir / "a.pkl"))
+        joblib.dump(Pipeline([("model", Ridge(alpha=0.1).fit(X, y))]), str(model_dir / "b.pkl"))
+        second = {os.path.basename(r["model"]): r["status"] for r in _drain(watcher)}
+        assert second == {"a.pkl": "ok", "b.pkl": "unchanged"}
+        assert sorted(os.listdir(tmp_path / "out")) == ["a.h", "b.h"]
+        assert (tmp_path / "out" / "b.h").read_text() == b_code != (tmp_path / "out" / "a.h").read_text()
+    finally:
+        watcher.close()
+
+
+def test_watch_refuses_models_whose_header_names_collide(tmp_path):
+    X, y = make_regression(n_samples=100, n_features=3, noise=0.1, random_state=0)
+    model_dir = tmp_path / "models"
+    (model_dir / "x").mkdir(parents=True)
+    joblib.dump(Ridge(alpha=0.1).fit(X, y), str(model_dir / "x" / "churn.pkl"))
+    joblib.dump(Ridge(alpha=5.0).fit(X, y), str(model_dir / "x_churn.pkl"))
+
+    watcher = ModelWatcher(str(model_dir), str(tmp_path / "out"), recursive=True, debounce=0.1, poll_interval=0.05,
+                           max_workers=1, use_inotify=False, cache=ConversionCache(str(tmp_path / "cache")))
+    try:
+        first = _drain(watcher)
+        assert [r["status"] for r in first] == ["failed", "failed"]
+        assert all("x_churn" in r["error"] for r in first)
+        assert not (tmp_path / "out").exists()
+
+        # once the name is free again, the remaining model gets it
+        os.remove(str(model_dir / "x_churn.pkl"))
+        second = _drain(watcher)
+        assert [(os.path.basename(r["model"]), r["status"]) for r in second] == [("churn.pkl", "ok")]
+        assert os.listdir(tmp_path / "out") == ["x_churn.h"]
+    finally:
+        watcher.close()